@@ -19,9 +19,40 @@ class Settings(BaseSettings):
     twitter_bearer_token: str = Field(..., env="TWITTER_BEARER_TOKEN")
     twitter_access_token: str = Field(..., env="TWITTER_ACCESS_TOKEN")
     twitter_access_token_secret: str = Field(..., env="TWITTER_ACCESS_TOKEN_SECRET")
+    twitter_timeout_seconds: float = Field(default=15.0, env="TWITTER_TIMEOUT_SECONDS")
+    twitter_connect_timeout_seconds: float = Field(default=5.0, env="TWITTER_CONNECT_TIMEOUT_SECONDS")
+    twitter_max_connections: int = Field(default=50, env="TWITTER_MAX_CONNECTIONS")
+    twitter_keepalive_seconds: float = Field(default=30.0, env="TWITTER_KEEPALIVE_SECONDS")
+    twitter_user_id_cache_ttl_hours: int = Field(default=24, env="TWITTER_USER_ID_CACHE_TTL_HOURS")
+    twitter_rate_limit_policy: str = Field(default="wait", env="TWITTER_RATE_LIMIT_POLICY")
+    twitter_rate_limit_max_wait_seconds: float = Field(default=60.0, env="TWITTER_RATE_LIMIT_MAX_WAIT_SECONDS")
+    twitter_client_pool_size: int = Field(default=1000, env="TWITTER_CLIENT_POOL_SIZE")
+    twitter_token_refresh_margin_seconds: int = Field(default=600, env="TWITTER_TOKEN_REFRESH_MARGIN_SECONDS")
+    twitter_token_refresh_interval_seconds: float = Field(default=60.0, env="TWITTER_TOKEN_REFRESH_INTERVAL_SECONDS")
     
     # Claude AI Configuration
     claude_api_key: str = Field(..., env="CLAUDE_API_KEY")
+    claude_base_url: Optional[str] = Field(default=None, env="CLAUDE_BASE_URL")
+    claude_timeout_seconds: float = Field(default=30.0, env="CLAUDE_TIMEOUT_SECONDS")
+    claude_max_retries: int = Field(default=2, env="CLAUDE_MAX_RETRIES")
+    claude_max_connections: int = Field(default=20, env="CLAUDE_MAX_CONNECTIONS")
+    claude_max_keepalive_connections: int = Field(default=10, env="CLAUDE_MAX_KEEPALIVE_CONNECTIONS")
+    claude_keepalive_expiry_seconds: float = Field(default=30.0, env="CLAUDE_KEEPALIVE_EXPIRY_SECONDS")
+    claude_max_concurrency: int = Field(default=8, env="CLAUDE_MAX_CONCURRENCY")
+    claude_triage_max_input_tokens: int = Field(default=3000, env="CLAUDE_TRIAGE_MAX_INPUT_TOKENS")
+    claude_triage_max_items: int = Field(default=25, env="CLAUDE_TRIAGE_MAX_ITEMS")
+    claude_requests_per_minute: int = Field(default=50, env="CLAUDE_REQUESTS_PER_MINUTE")
+    claude_tokens_per_minute: int = Field(default=40000, env="CLAUDE_TOKENS_PER_MINUTE")
+    claude_requests_per_day: int = Field(default=0, env="CLAUDE_REQUESTS_PER_DAY")  # 0 disables the ceiling
+    claude_tokens_per_day: int = Field(default=0, env="CLAUDE_TOKENS_PER_DAY")  # 0 disables the ceiling
+    claude_scheduled_reserve_fraction: float = Field(default=0.3, env="CLAUDE_SCHEDULED_RESERVE_FRACTION")
+    claude_budget_max_wait_seconds: float = Field(default=120.0, env="CLAUDE_BUDGET_MAX_WAIT_SECONDS")
+    generation_cache_max_entries: int = Field(default=1000, env="GENERATION_CACHE_MAX_ENTRIES")
+    generation_cache_ttl_seconds: int = Field(default=3600, env="GENERATION_CACHE_TTL_SECONDS")
+    generation_cache_sqlite_path: Optional[str] = Field(default=None, env="GENERATION_CACHE_SQLITE_PATH")
+    generation_cache_sqlite_max_entries: int = Field(default=50000, env="GENERATION_CACHE_SQLITE_MAX_ENTRIES")
+    generation_batch_max_items: int = Field(default=100, env="GENERATION_BATCH_MAX_ITEMS")
+    generation_batch_concurrency: int = Field(default=8, env="GENERATION_BATCH_CONCURRENCY")
     
     # Application Configuration
     secret_key: str = Field(..., env="SECRET_KEY")
@@ -31,10 +62,60 @@ class Settings(BaseSettings):
     
     # Database Configuration
     database_url: str = Field(default="sqlite:///./twitter_bot.db", env="DATABASE_URL")
+    database_pool_size: int = Field(default=10, env="DATABASE_POOL_SIZE")
+    database_max_overflow: int = Field(default=20, env="DATABASE_MAX_OVERFLOW")
+    database_pool_timeout_seconds: int = Field(default=30, env="DATABASE_POOL_TIMEOUT_SECONDS")
+    database_pool_recycle_seconds: int = Field(default=1800, env="DATABASE_POOL_RECYCLE_SECONDS")
+    sqlite_busy_timeout_ms: int = Field(default=5000, env="SQLITE_BUSY_TIMEOUT_MS")
+    sqlite_cache_size_kb: int = Field(default=20000, env="SQLITE_CACHE_SIZE_KB")
     
     # Scheduling Configuration
     timezone: str = Field(default="UTC", env="TIMEZONE")
     default_post_interval_hours: int = Field(default=2, env="DEFAULT_POST_INTERVAL_HOURS")
+    scheduler_dispatch_mode: str = Field(default="jobs", env="SCHEDULER_DISPATCH_MODE")  # 'jobs' or 'dispatcher'
+    dispatcher_workers: int = Field(default=8, env="DISPATCHER_WORKERS")
+    dispatcher_queue_size: int = Field(default=100, env="DISPATCHER_QUEUE_SIZE")
+    scheduler_role: str = Field(default="all", env="SCHEDULER_ROLE")  # 'all' or 'api' (never runs jobs)
+    scheduler_coordination: str = Field(default="none", env="SCHEDULER_COORDINATION")  # 'none' or 'lease'
+    scheduler_lease_ttl_seconds: int = Field(default=30, env="SCHEDULER_LEASE_TTL_SECONDS")
+    scheduler_lease_renew_seconds: int = Field(default=10, env="SCHEDULER_LEASE_RENEW_SECONDS")
+    scheduler_misfire_grace_seconds: int = Field(default=300, env="SCHEDULER_MISFIRE_GRACE_SECONDS")
+    scheduler_execution_mode: str = Field(default="inline", env="SCHEDULER_EXECUTION_MODE")  # 'inline' or 'worker'
+    scheduler_config_sync_seconds: float = Field(default=10.0, env="SCHEDULER_CONFIG_SYNC_SECONDS")
+    work_queue_max_depth: int = Field(default=1000, env="WORK_QUEUE_MAX_DEPTH")
+    work_item_timeout_seconds: int = Field(default=1800, env="WORK_ITEM_TIMEOUT_SECONDS")
+    work_item_heartbeat_seconds: int = Field(default=30, env="WORK_ITEM_HEARTBEAT_SECONDS")
+    work_item_lease_seconds: int = Field(default=120, env="WORK_ITEM_LEASE_SECONDS")
+    work_item_max_attempts: int = Field(default=3, env="WORK_ITEM_MAX_ATTEMPTS")
+    worker_post_processes: int = Field(default=1, env="WORKER_POST_PROCESSES")
+    worker_monitor_processes: int = Field(default=2, env="WORKER_MONITOR_PROCESSES")
+    worker_poll_interval_seconds: float = Field(default=1.0, env="WORKER_POLL_INTERVAL_SECONDS")
+    content_buffer_enabled: bool = Field(default=True, env="CONTENT_BUFFER_ENABLED")
+    content_buffer_size: int = Field(default=10, env="CONTENT_BUFFER_SIZE")
+    content_buffer_low_water: int = Field(default=3, env="CONTENT_BUFFER_LOW_WATER")
+    content_buffer_batch_size: int = Field(default=5, env="CONTENT_BUFFER_BATCH_SIZE")
+    dedup_max_distance: int = Field(default=3, env="DEDUP_MAX_DISTANCE")
+    dedup_max_attempts: int = Field(default=3, env="DEDUP_MAX_ATTEMPTS")
+    dedup_refresh_seconds: float = Field(default=30.0, env="DEDUP_REFRESH_SECONDS")
+    monitoring_bootstrap_tweets: int = Field(default=5, env="MONITORING_BOOTSTRAP_TWEETS")
+    monitoring_max_pages: int = Field(default=5, env="MONITORING_MAX_PAGES")
+    monitoring_account_concurrency: int = Field(default=10, env="MONITORING_ACCOUNT_CONCURRENCY")
+    monitoring_twitter_read_concurrency: int = Field(default=8, env="MONITORING_TWITTER_READ_CONCURRENCY")
+    monitoring_claude_concurrency: int = Field(default=4, env="MONITORING_CLAUDE_CONCURRENCY")
+    monitoring_write_concurrency: int = Field(default=2, env="MONITORING_WRITE_CONCURRENCY")
+    prefilter_enabled: bool = Field(default=True, env="PREFILTER_ENABLED")
+    prefilter_languages: str = Field(default="en", env="PREFILTER_LANGUAGES")
+    prefilter_min_chars: int = Field(default=20, env="PREFILTER_MIN_CHARS")
+    prefilter_relevance_threshold: float = Field(default=0.01, env="PREFILTER_RELEVANCE_THRESHOLD")  # Any keyword hit passes
+    prefilter_scorer: Optional[str] = Field(default=None, env="PREFILTER_SCORER")
+    
+    # Bot Config Store Configuration
+    config_cache_ttl_seconds: float = Field(default=5.0, env="CONFIG_CACHE_TTL_SECONDS")
+    
+    # Activity Log Configuration
+    activity_queue_size: int = Field(default=10000, env="ACTIVITY_QUEUE_SIZE")
+    activity_batch_size: int = Field(default=200, env="ACTIVITY_BATCH_SIZE")
+    activity_flush_interval_seconds: float = Field(default=2.0, env="ACTIVITY_FLUSH_INTERVAL_SECONDS")
     
     # Logging Configuration
     log_level: str = Field(default="INFO", env="LOG_LEVEL")
@@ -42,6 +123,12 @@ class Settings(BaseSettings):
     
     # Security Configuration
     token_expire_hours: int = Field(default=24, env="TOKEN_EXPIRE_HOURS")
+    token_encryption_key: Optional[str] = Field(default=None, env="TOKEN_ENCRYPTION_KEY")  # Fernet key for stored OAuth tokens
+    oauth_state_backend: str = Field(default="memory", env="OAUTH_STATE_BACKEND")  # 'memory' or 'sqlite'
+    oauth_state_sqlite_path: str = Field(default="oauth_states.db", env="OAUTH_STATE_SQLITE_PATH")
+    oauth_state_ttl_seconds: int = Field(default=600, env="OAUTH_STATE_TTL_SECONDS")
+    oauth_state_max_entries: int = Field(default=10000, env="OAUTH_STATE_MAX_ENTRIES")
+    oauth_state_sweep_interval_seconds: float = Field(default=60.0, env="OAUTH_STATE_SWEEP_INTERVAL_SECONDS")
     
     model_config = {
         "env_file": ".env",
@@ -16,8 +16,15 @@ from config.settings import get_settings
 from src.api.auth import router as auth_router
 from src.api.tweets import router as tweets_router
 from src.api.config import router as config_router
+from src.api.activity import router as activity_router
 from src.services.scheduler_service import get_scheduler
+from src.services.claude_service import close_claude_client
+from src.services.twitter_service import close_http_session
 from src.database.models import create_tables
+from src.database.session import close_async_engine
+from src.services.activity_recorder import get_activity_recorder
+from src.services.oauth_states import get_oauth_state_store
+from src.services.twitter_client_pool import get_twitter_client_pool
 
 # Configure logging
 logging.basicConfig(
@@ -36,6 +43,18 @@ async def lifespan(app: FastAPI):
     create_tables()
     logger.info("Database tables created/verified")
     
+    # Start buffered activity logging
+    activity_recorder = get_activity_recorder()
+    activity_recorder.start()
+    
+    # Expire abandoned OAuth logins in the background
+    oauth_states = get_oauth_state_store()
+    oauth_states.start()
+    
+    # Refresh pooled user tokens before they expire
+    twitter_clients = get_twitter_client_pool()
+    twitter_clients.start()
+    
     # Start scheduler
     scheduler = get_scheduler()
     await scheduler.start()
@@ -46,6 +65,12 @@ async def lifespan(app: FastAPI):
     # Cleanup
     await scheduler.stop()
     logger.info("Scheduler stopped")
+    await activity_recorder.stop()
+    await oauth_states.stop()
+    await twitter_clients.stop()
+    await close_claude_client()
+    await close_http_session()
+    await close_async_engine()
     logger.info("Shutting down Twitter Bot application...")
 
 
@@ -95,6 +120,7 @@ async def health_check():
 app.include_router(auth_router, prefix="/auth", tags=["authentication"])
 app.include_router(tweets_router, prefix="/tweets", tags=["tweets"])
 app.include_router(config_router, prefix="/config", tags=["configuration"])
+app.include_router(activity_router, prefix="/activity", tags=["activity"])
 
 
 if __name__ == "__main__":
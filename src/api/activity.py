@@ -0,0 +1,134 @@
+"""
+Activity log query API routes
+"""
+
+from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlalchemy import select, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import Optional
+import base64
+
+from src.database.models import ActivityLog, ActivityRollup, user_pk
+from src.database.session import get_async_db
+from src.services.activity_rollups import GRANULARITIES
+
+router = APIRouter()
+
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(created_at: datetime, activity_id: int) -> str:
+    """Encode the last row's sort key as an opaque cursor"""
+    raw = f"{created_at.isoformat()}|{activity_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("utf-8")
+
+
+def decode_cursor(cursor: str):
+    """Decode a cursor back into (created_at, id)"""
+    try:
+        created_at, activity_id = base64.urlsafe_b64decode(cursor.encode("utf-8")).decode("utf-8").split("|")
+        return datetime.fromisoformat(created_at), int(activity_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@router.get("/")
+async def list_activity(
+    user_id: Optional[str] = None,
+    activity_type: Optional[str] = None,
+    success: Optional[bool] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = Query(default=50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """List activity newest first with keyset pagination"""
+    query = select(ActivityLog)
+    
+    if user_id is not None:
+        query = query.where(ActivityLog.user_id == user_pk(user_id))
+    if activity_type:
+        query = query.where(ActivityLog.activity_type == activity_type)
+    if success is not None:
+        query = query.where(ActivityLog.success == success)
+    if start:
+        query = query.where(ActivityLog.created_at >= start)
+    if end:
+        query = query.where(ActivityLog.created_at < end)
+    if cursor:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        query = query.where(or_(
+            ActivityLog.created_at < cursor_created_at,
+            and_(ActivityLog.created_at == cursor_created_at, ActivityLog.id < cursor_id)
+        ))
+    
+    # One extra row tells us whether another page exists
+    query = query.order_by(ActivityLog.created_at.desc(), ActivityLog.id.desc()).limit(limit + 1)
+    rows = (await db.execute(query)).scalars().all()
+    
+    page = rows[:limit]
+    next_cursor = encode_cursor(page[-1].created_at, page[-1].id) if len(rows) > limit else None
+    
+    return {
+        "data": [
+            {
+                "id": row.id,
+                "user_id": row.user_id,
+                "activity_type": row.activity_type,
+                "description": row.description,
+                "tweet_id": row.tweet_id,
+                "tweet_text": row.tweet_text,
+                "target_username": row.target_username,
+                "success": row.success,
+                "error_message": row.error_message,
+                "extra_data": row.extra_data,
+                "created_at": row.created_at.isoformat() if row.created_at else None
+            }
+            for row in page
+        ],
+        "meta": {"result_count": len(page), "next_cursor": next_cursor}
+    }
+
+
+@router.get("/rollups")
+async def get_activity_rollups(
+    granularity: str = "hour",
+    user_id: Optional[str] = None,
+    activity_type: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get precomputed hourly or daily activity counts"""
+    if granularity not in GRANULARITIES:
+        raise HTTPException(status_code=400, detail=f"granularity must be one of {', '.join(GRANULARITIES)}")
+    
+    query = select(ActivityRollup).where(ActivityRollup.granularity == granularity)
+    if user_id is not None:
+        query = query.where(ActivityRollup.user_id == user_pk(user_id))
+    if activity_type:
+        query = query.where(ActivityRollup.activity_type == activity_type)
+    if start:
+        query = query.where(ActivityRollup.bucket_start >= start)
+    if end:
+        query = query.where(ActivityRollup.bucket_start < end)
+    
+    query = query.order_by(ActivityRollup.bucket_start, ActivityRollup.activity_type)
+    rows = (await db.execute(query)).scalars().all()
+    
+    return {
+        "granularity": granularity,
+        "data": [
+            {
+                "bucket_start": row.bucket_start.isoformat(),
+                "user_id": row.user_id,
+                "activity_type": row.activity_type,
+                "total": row.total,
+                "succeeded": row.succeeded,
+                "failed": row.failed
+            }
+            for row in rows
+        ]
+    }
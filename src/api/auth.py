@@ -2,7 +2,7 @@
 Authentication API routes for Twitter OAuth 2.0 integration
 """
 
-from fastapi import APIRouter, HTTPException, Request, Query
+from fastapi import APIRouter, HTTPException, Request, Query, Depends
 from fastapi.responses import RedirectResponse
 from typing import Optional
 import secrets
@@ -13,13 +13,11 @@ from urllib.parse import urlencode
 import tweepy
 
 from config.settings import get_settings
+from src.services.oauth_states import get_oauth_state_store
 
 router = APIRouter()
 settings = get_settings()
 
-# Store for OAuth state and PKCE verifiers (use Redis in production)
-oauth_states = {}
-
 
 def generate_pkce_params():
     """Generate PKCE code verifier and challenge"""
@@ -31,18 +29,18 @@ def generate_pkce_params():
 
 
 @router.get("/login")
-async def login():
+async def login(oauth_states=Depends(get_oauth_state_store)):
     """Initiate Twitter OAuth 2.0 login with PKCE"""
     try:
         # Generate state and PKCE parameters
         state = secrets.token_urlsafe(32)
         code_verifier, code_challenge = generate_pkce_params()
         
-        # Store state and code verifier (use Redis in production)
-        oauth_states[state] = {
+        # Store state and code verifier until the callback or expiry
+        await oauth_states.put(state, {
             'code_verifier': code_verifier,
             'timestamp': int(time.time())
-        }
+        })
         
         # Build authorization URL
         auth_params = {
@@ -70,18 +68,19 @@ async def login():
 async def auth_callback(
     code: str = Query(...),
     state: str = Query(...),
-    error: Optional[str] = Query(None)
+    error: Optional[str] = Query(None),
+    oauth_states=Depends(get_oauth_state_store)
 ):
     """Handle Twitter OAuth 2.0 callback"""
     try:
         if error:
             raise HTTPException(status_code=400, detail=f"OAuth error: {error}")
         
-        # Verify state parameter
-        if state not in oauth_states:
-            raise HTTPException(status_code=400, detail="Invalid state parameter")
+        # Verify and consume state parameter
+        stored_data = await oauth_states.pop(state)
+        if stored_data is None:
+            raise HTTPException(status_code=400, detail="Invalid or expired state parameter")
         
-        stored_data = oauth_states[state]
         code_verifier = stored_data['code_verifier']
         
         # Exchange code for access token
@@ -105,15 +104,14 @@ async def auth_callback(
         # This would need to be implemented properly with tweepy
         # For now, return success message
         
-        # Clean up state
-        del oauth_states[state]
-        
         return {
             "message": "Authentication successful",
             "access_token": "TOKEN_PLACEHOLDER",  # Store securely in production
             "user_id": "USER_ID_PLACEHOLDER"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Authentication failed: {str(e)}")
 
@@ -2,13 +2,21 @@
 Configuration management API routes
 """
 
+import asyncio
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from typing import Optional, List
 from src.services.scheduler_service import get_scheduler
+from src.services.monitoring_service import get_last_cycle_stats
+from src.services.rate_limiter import get_rate_limit_governor
+from src.services.claude_budget import get_claude_budget
+from src.services.work_queue import get_work_queue
+from src.services.config_store import get_config_store
 
 router = APIRouter()
 
+USER_ID = "default"  # In production, use actual user ID
+
 
 class ScheduleConfig(BaseModel):
     """Schedule configuration model"""
@@ -42,53 +50,50 @@ class BotConfig(BaseModel):
     enabled: bool = True
 
 
-# In-memory storage (use database in production)
-bot_config = BotConfig(
-    schedule=ScheduleConfig(),
-    target_accounts=[],
-    content=ContentConfig()
-)
+def _bot_config(config: dict) -> BotConfig:
+    """Convert a stored config dict into the API model"""
+    return BotConfig(
+        schedule=ScheduleConfig(**config["schedule"]),
+        target_accounts=[TargetAccount(**account) for account in config["target_accounts"]],
+        content=ContentConfig(**config["content"]),
+        enabled=config["enabled"]
+    )
 
 
 @router.get("/", response_model=BotConfig)
-async def get_config():
+async def get_config(store=Depends(get_config_store)):
     """Get current bot configuration"""
-    return bot_config
+    return _bot_config(await store.get(USER_ID))
 
 
 @router.put("/", response_model=BotConfig)
-async def update_config(config: BotConfig, scheduler=Depends(get_scheduler)):
+async def update_config(config: BotConfig, scheduler=Depends(get_scheduler), store=Depends(get_config_store)):
     """Update bot configuration"""
     try:
-        global bot_config
-        bot_config = config
+        old, new = await store.replace(USER_ID, config.model_dump())
         
-        # Update scheduler if config changed
-        if config.enabled:
-            await _update_scheduler_jobs(scheduler)
-        else:
-            await _stop_scheduler_jobs(scheduler)
+        # Reschedule only what changed
+        scheduler.apply_config(USER_ID, old, new)
         
-        return bot_config
+        return config
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to update config: {str(e)}")
 
 
 @router.get("/schedule", response_model=ScheduleConfig)
-async def get_schedule():
+async def get_schedule(store=Depends(get_config_store)):
     """Get schedule configuration"""
-    return bot_config.schedule
+    return ScheduleConfig(**(await store.get(USER_ID))["schedule"])
 
 
 @router.put("/schedule", response_model=ScheduleConfig)
-async def update_schedule(schedule: ScheduleConfig, scheduler=Depends(get_scheduler)):
+async def update_schedule(schedule: ScheduleConfig, scheduler=Depends(get_scheduler), store=Depends(get_config_store)):
     """Update schedule configuration"""
     try:
-        bot_config.schedule = schedule
+        old, new = await store.update_schedule(USER_ID, schedule.model_dump())
         
         # Reschedule jobs with new settings
-        if bot_config.enabled and schedule.enabled:
-            await _update_scheduler_jobs(scheduler)
+        scheduler.apply_config(USER_ID, old, new)
         
         return schedule
     except Exception as e:
@@ -96,100 +101,105 @@ async def update_schedule(schedule: ScheduleConfig, scheduler=Depends(get_schedu
 
 
 @router.get("/targets", response_model=List[TargetAccount])
-async def get_target_accounts():
+async def get_target_accounts(store=Depends(get_config_store)):
     """Get target accounts for monitoring"""
-    return bot_config.target_accounts
+    return (await store.get(USER_ID))["target_accounts"]
 
 
 @router.post("/targets", response_model=TargetAccount)
-async def add_target_account(account: TargetAccount, scheduler=Depends(get_scheduler)):
+async def add_target_account(account: TargetAccount, scheduler=Depends(get_scheduler), store=Depends(get_config_store)):
     """Add a target account for monitoring"""
     try:
-        # Check if account already exists
-        for existing in bot_config.target_accounts:
-            if existing.username == account.username:
-                raise HTTPException(status_code=400, detail="Account already exists")
+        result = await store.add_target(USER_ID, account.model_dump())
         
-        bot_config.target_accounts.append(account)
+        # Check if account already exists
+        if result is None:
+            raise HTTPException(status_code=400, detail="Account already exists")
         
-        # Update monitoring schedule
-        if bot_config.enabled:
-            await _update_scheduler_jobs(scheduler)
+        # Only schedules monitoring if this is the first enabled account
+        scheduler.apply_config(USER_ID, *result)
         
         return account
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to add target account: {str(e)}")
 
 
 @router.delete("/targets/{username}")
-async def remove_target_account(username: str, scheduler=Depends(get_scheduler)):
+async def remove_target_account(username: str, scheduler=Depends(get_scheduler), store=Depends(get_config_store)):
     """Remove a target account"""
     try:
-        bot_config.target_accounts = [
-            acc for acc in bot_config.target_accounts 
-            if acc.username != username
-        ]
+        result = await store.remove_target(USER_ID, username)
+        if result is None:
+            raise HTTPException(status_code=404, detail="Account not found")
         
-        # Update monitoring schedule
-        if bot_config.enabled:
-            await _update_scheduler_jobs(scheduler)
+        # Only unschedules monitoring if no enabled accounts remain
+        scheduler.apply_config(USER_ID, *result)
         
         return {"message": f"Account {username} removed successfully"}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to remove target account: {str(e)}")
 
 
 @router.get("/content", response_model=ContentConfig)
-async def get_content_config():
+async def get_content_config(store=Depends(get_config_store)):
     """Get content configuration"""
-    return bot_config.content
+    return ContentConfig(**(await store.get(USER_ID))["content"])
 
 
 @router.put("/content", response_model=ContentConfig)
-async def update_content_config(content: ContentConfig):
+async def update_content_config(content: ContentConfig, store=Depends(get_config_store)):
     """Update content configuration"""
     try:
-        bot_config.content = content
+        # Monitoring reads themes at run time, so no jobs need touching
+        await store.update_content(USER_ID, content.model_dump())
         return content
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to update content config: {str(e)}")
 
 
 @router.post("/start")
-async def start_bot(scheduler=Depends(get_scheduler)):
+async def start_bot(scheduler=Depends(get_scheduler), store=Depends(get_config_store)):
     """Start the bot"""
     try:
-        bot_config.enabled = True
-        await _update_scheduler_jobs(scheduler)
+        old, new = await store.set_enabled(USER_ID, True)
+        scheduler.apply_config(USER_ID, old, new)
         return {"message": "Bot started successfully", "status": "running"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to start bot: {str(e)}")
 
 
 @router.post("/stop")
-async def stop_bot(scheduler=Depends(get_scheduler)):
+async def stop_bot(scheduler=Depends(get_scheduler), store=Depends(get_config_store)):
     """Stop the bot"""
     try:
-        bot_config.enabled = False
-        await _stop_scheduler_jobs(scheduler)
+        old, new = await store.set_enabled(USER_ID, False)
+        scheduler.apply_config(USER_ID, old, new)
         return {"message": "Bot stopped successfully", "status": "stopped"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to stop bot: {str(e)}")
 
 
 @router.get("/status")
-async def get_bot_status(scheduler=Depends(get_scheduler)):
+async def get_bot_status(scheduler=Depends(get_scheduler), store=Depends(get_config_store)):
     """Get bot status"""
     jobs = scheduler.get_jobs()
+    config = await store.get(USER_ID)
     
     return {
-        "enabled": bot_config.enabled,
-        "status": "running" if bot_config.enabled else "stopped",
+        "enabled": config["enabled"],
+        "status": "running" if config["enabled"] else "stopped",
+        "config_version": config["version"],
         "scheduled_jobs": len(jobs),
         "jobs": jobs,
-        "target_accounts_count": len(bot_config.target_accounts),
+        "target_accounts_count": len(config["target_accounts"]),
         "next_post": _get_next_job_time(jobs, "content_posting"),
-        "next_monitoring": _get_next_job_time(jobs, "account_monitoring")
+        "next_monitoring": _get_next_job_time(jobs, "account_monitoring"),
+        "last_monitoring_cycle": get_last_cycle_stats(USER_ID),
+        "scheduler_leader": scheduler.is_leader
     }
 
 
@@ -199,40 +209,25 @@ async def get_scheduled_jobs(scheduler=Depends(get_scheduler)):
     return {"jobs": scheduler.get_jobs()}
 
 
-async def _update_scheduler_jobs(scheduler):
-    """Update scheduler jobs based on current configuration"""
-    user_id = "default"  # In production, use actual user ID
-    
-    # Schedule content posting
-    if bot_config.schedule.enabled:
-        scheduler.schedule_content_posting(
-            interval_hours=bot_config.schedule.interval_hours,
-            interval_days=bot_config.schedule.interval_days,
-            user_id=user_id
-        )
-    
-    # Schedule account monitoring
-    if bot_config.target_accounts:
-        target_accounts_data = [
-            {"username": acc.username, "enabled": acc.enabled, "reply_enabled": acc.reply_enabled}
-            for acc in bot_config.target_accounts
-            if acc.enabled
-        ]
-        
-        if target_accounts_data:
-            scheduler.schedule_account_monitoring(
-                target_accounts=target_accounts_data,
-                check_interval_hours=2,  # Fixed for now
-                user_id=user_id
-            )
+@router.get("/rate-limits")
+async def get_rate_limits():
+    """Get current Twitter rate limit bucket state"""
+    return {"buckets": get_rate_limit_governor().snapshot()}
 
 
-async def _stop_scheduler_jobs(scheduler):
-    """Stop all scheduler jobs"""
-    user_id = "default"
-    
-    scheduler.remove_job(f"content_posting_{user_id}")
-    scheduler.remove_job(f"account_monitoring_{user_id}")
+@router.get("/claude-usage")
+async def get_claude_usage(window: str = "minute"):
+    """Get Claude token and request usage for the last minute or day"""
+    if window not in ("minute", "day"):
+        raise HTTPException(status_code=400, detail="window must be 'minute' or 'day'")
+    return get_claude_budget().usage(window)
+
+
+@router.get("/work-queue")
+async def get_work_queue_stats():
+    """Get worker queue depth per job type and status"""
+    loop = asyncio.get_running_loop()
+    return {"queues": await loop.run_in_executor(None, get_work_queue().stats)}
 
 
 def _get_next_job_time(jobs: list, job_type: str) -> Optional[str]:
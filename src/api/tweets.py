@@ -2,17 +2,27 @@
 Tweet management API routes
 """
 
-from fastapi import APIRouter, HTTPException, Depends
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 from typing import Optional, List
+import asyncio
+import json
 import tweepy
 
 from config.settings import get_settings
-from src.services.claude_service import ClaudeService
+from src.services.claude_service import ClaudeService, get_claude_service
+from src.services.generation_cache import get_generation_cache
+from src.services.activity_recorder import ActivityRecorder, get_activity_recorder
+from src.services.thread_store import ThreadStore, get_thread_store
+from src.services.twitter_client_pool import get_twitter_client_pool
+from src.services.twitter_service import TwitterService, split_into_segments
 
 router = APIRouter()
 settings = get_settings()
 
+MAX_BATCH_ITEMS = settings.generation_batch_max_items
+
 
 class TweetGenerate(BaseModel):
     """Tweet generation request model"""
@@ -20,6 +30,15 @@ class TweetGenerate(BaseModel):
     theme: Optional[str] = "general"
     personality: Optional[str] = "friendly"
     max_length: Optional[int] = 280
+    fresh: bool = False  # Skip the response cache and generate a new variant
+
+
+class TweetGenerateBatch(BaseModel):
+    """Batch generation request: explicit items, or one item repeated count times"""
+    items: List[TweetGenerate] = Field([], max_length=MAX_BATCH_ITEMS)
+    item: Optional[TweetGenerate] = None
+    count: int = Field(1, ge=1, le=MAX_BATCH_ITEMS)
+    concurrency: Optional[int] = None
 
 
 class TweetCreate(BaseModel):
@@ -29,6 +48,15 @@ class TweetCreate(BaseModel):
     media_ids: Optional[List[str]] = None
 
 
+class ThreadCreate(BaseModel):
+    """Thread creation request: explicit segments, or long text to split"""
+    segments: List[str] = []
+    text: Optional[str] = None
+    reply_to_id: Optional[str] = None
+    numbered: bool = True
+    idempotency_key: Optional[str] = None  # Repeat a request with the same key to resume it
+
+
 class TweetResponse(BaseModel):
     """Tweet response model"""
     id: str
@@ -45,32 +73,202 @@ def get_twitter_client():
     return None
 
 
+async def get_twitter_service() -> TwitterService:
+    """Get the pooled Twitter client for the bot account"""
+    return await get_twitter_client_pool().get("default")
+
+
 @router.post("/generate")
-async def generate_tweet_content(request: TweetGenerate):
+async def generate_tweet_content(
+    request: TweetGenerate,
+    claude_service: ClaudeService = Depends(get_claude_service),
+    recorder: ActivityRecorder = Depends(get_activity_recorder)
+):
     """Generate tweet content using AI"""
     try:
-        claude_service = ClaudeService()
-        
         result = await claude_service.generate_tweet_content(
             prompt=request.prompt,
             theme=request.theme,
             personality=request.personality,
-            max_length=request.max_length
+            max_length=request.max_length,
+            use_cache=True,
+            fresh=request.fresh
+        )
+        
+        await recorder.record(
+            "generate",
+            description=request.prompt,
+            success=result["success"],
+            tweet_text=result.get("content"),
+            error_message=result.get("error"),
+            extra_data={"theme": request.theme, "cached": result.get("cached", False)}
         )
         
         if result["success"]:
             return {
                 "success": True,
                 "content": result["content"],
-                "length": len(result["content"])
+                "length": len(result["content"]),
+                "cached": result["cached"]
             }
+        elif result.get("retry_after"):
+            raise HTTPException(
+                status_code=429,
+                detail=result["error"],
+                headers={"Retry-After": str(int(result["retry_after"]))}
+            )
         else:
             raise HTTPException(status_code=500, detail=result["error"])
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate content: {str(e)}")
 
 
+@router.post("/generate/batch")
+async def generate_tweet_batch(
+    batch: TweetGenerateBatch,
+    http_request: Request,
+    claude_service: ClaudeService = Depends(get_claude_service),
+    recorder: ActivityRecorder = Depends(get_activity_recorder)
+):
+    """Generate many drafts concurrently; send Accept: application/x-ndjson to stream them as they finish"""
+    # Check the size before building any copies
+    total = len(batch.items) + (batch.count if batch.item is not None else 0)
+    if not total:
+        raise HTTPException(status_code=400, detail="Provide items or an item with a count")
+    if total > MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Batch is limited to {MAX_BATCH_ITEMS} items")
+    
+    items = list(batch.items)
+    if batch.item is not None:
+        # Repeats skip the cache lookup so each copy is a new variant
+        items += [batch.item] + [batch.item.model_copy(update={"fresh": True}) for _ in range(batch.count - 1)]
+    
+    concurrency = min(batch.concurrency or settings.generation_batch_concurrency, settings.generation_batch_concurrency)
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+    
+    async def generate(index: int, request: TweetGenerate) -> dict:
+        async with semaphore:
+            result = await claude_service.generate_tweet_content(
+                prompt=request.prompt,
+                theme=request.theme,
+                personality=request.personality,
+                max_length=request.max_length,
+                use_cache=True,
+                fresh=request.fresh
+            )
+        
+        await recorder.record(
+            "generate",
+            description=request.prompt,
+            success=result["success"],
+            tweet_text=result.get("content"),
+            error_message=result.get("error"),
+            extra_data={"theme": request.theme, "cached": result.get("cached", False), "batch": True}
+        )
+        
+        if result["success"]:
+            return {
+                "index": index,
+                "success": True,
+                "content": result["content"],
+                "length": len(result["content"]),
+                "cached": result["cached"]
+            }
+        return {
+            "index": index,
+            "success": False,
+            "error": result["error"],
+            "retry_after": result.get("retry_after")
+        }
+    
+    tasks = [asyncio.ensure_future(generate(index, request)) for index, request in enumerate(items)]
+    
+    if "application/x-ndjson" in http_request.headers.get("accept", ""):
+        async def body():
+            try:
+                for task in asyncio.as_completed(tasks):
+                    yield json.dumps(await task) + "\n"
+            finally:
+                # Client went away; stop generating the rest
+                for task in tasks:
+                    task.cancel()
+        
+        return StreamingResponse(body(), media_type="application/x-ndjson")
+    
+    results = await asyncio.gather(*tasks)
+    succeeded = sum(1 for result in results if result["success"])
+    return {
+        "results": results,
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded
+    }
+
+
+def _sse(event: dict) -> str:
+    """Format one server-sent event"""
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+@router.post("/generate/stream")
+async def stream_tweet_content(
+    request: TweetGenerate,
+    claude_service: ClaudeService = Depends(get_claude_service),
+    recorder: ActivityRecorder = Depends(get_activity_recorder)
+):
+    """Generate tweet content using AI, streaming text as server-sent events"""
+    events = claude_service.stream_tweet_content(
+        prompt=request.prompt,
+        theme=request.theme,
+        personality=request.personality,
+        max_length=request.max_length
+    )
+    
+    # Pull the first event before responding so budget errors still get a 429 status
+    first = await events.__anext__()
+    if first["type"] == "error" and first.get("retry_after"):
+        await events.aclose()
+        raise HTTPException(
+            status_code=429,
+            detail=first["error"],
+            headers={"Retry-After": str(int(first["retry_after"]))}
+        )
+    
+    async def body():
+        event = first
+        try:
+            while True:
+                yield _sse(event)
+                if event["type"] in ("done", "error"):
+                    await recorder.record(
+                        "generate",
+                        description=request.prompt,
+                        success=event["success"],
+                        tweet_text=event.get("content"),
+                        error_message=event.get("error"),
+                        extra_data={"theme": request.theme, "streamed": True}
+                    )
+                    return
+                event = await events.__anext__()
+        finally:
+            # Client disconnects close the Claude stream too
+            await events.aclose()
+    
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/generate/cache")
+async def get_generation_cache_stats():
+    """Get generation cache hit/miss counters"""
+    return get_generation_cache().stats()
+
+
 @router.post("/", response_model=TweetResponse)
 async def create_tweet(tweet: TweetCreate, client=Depends(get_twitter_client)):
     """Create a new tweet"""
@@ -91,6 +289,117 @@ async def create_tweet(tweet: TweetCreate, client=Depends(get_twitter_client)):
         raise HTTPException(status_code=500, detail=f"Failed to create tweet: {str(e)}")
 
 
+@router.post("/thread")
+async def create_thread(
+    thread: ThreadCreate,
+    twitter_service: TwitterService = Depends(get_twitter_service),
+    store: ThreadStore = Depends(get_thread_store),
+    recorder: ActivityRecorder = Depends(get_activity_recorder)
+):
+    """Post segments as a reply chain, splitting long text if given"""
+    segments = [segment.strip() for segment in thread.segments if segment.strip()]
+    if thread.text:
+        segments += split_into_segments(thread.text, numbered=thread.numbered)
+    
+    if not segments:
+        raise HTTPException(status_code=400, detail="Provide segments or text")
+    too_long = [index for index, segment in enumerate(segments) if len(segment) > 280]
+    if too_long:
+        raise HTTPException(status_code=400, detail=f"Segments over 280 characters: {too_long}")
+    
+    try:
+        stored = await store.create("default", segments, thread.reply_to_id, thread.idempotency_key)
+        return await _post_thread(stored, twitter_service, store, recorder)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to post thread: {str(e)}")
+
+
+@router.post("/thread/{thread_id}/resume")
+async def resume_thread(
+    thread_id: int,
+    twitter_service: TwitterService = Depends(get_twitter_service),
+    store: ThreadStore = Depends(get_thread_store),
+    recorder: ActivityRecorder = Depends(get_activity_recorder)
+):
+    """Post the remaining segments of a partially posted thread"""
+    stored = await store.get(thread_id)
+    if stored is None:
+        raise HTTPException(status_code=404, detail="Thread not found")
+    
+    try:
+        return await _post_thread(stored, twitter_service, store, recorder)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to resume thread: {str(e)}")
+
+
+@router.get("/thread/{thread_id}")
+async def get_thread(thread_id: int, store: ThreadStore = Depends(get_thread_store)):
+    """Get a thread's segments and posting progress"""
+    stored = await store.get(thread_id)
+    if stored is None:
+        raise HTTPException(status_code=404, detail="Thread not found")
+    return stored
+
+
+async def _post_thread(stored: dict, twitter_service: TwitterService, store: ThreadStore, recorder: ActivityRecorder) -> dict:
+    """Post whatever is left of a stored thread and record the outcome"""
+    if stored["status"] == "posted":
+        return {"thread_id": stored["id"], "status": "posted", "tweet_ids": stored["posted_ids"]}
+    
+    # Only one request posts a thread at a time, or two resumes would each post the next segment
+    claimed = await store.claim(stored["id"])
+    if claimed is None:
+        raise HTTPException(status_code=409, detail="Thread is already being posted")
+    stored = claimed
+    
+    # Progress writes run in order in the background while the next segment posts
+    pending = None
+    
+    def on_posted(index: int, tweet_id: str):
+        nonlocal pending
+        previous = pending
+        
+        async def write():
+            if previous:
+                await previous
+            await store.record_posted(stored["id"], index, tweet_id)
+        
+        pending = asyncio.ensure_future(write())
+    
+    result = await twitter_service.post_thread(
+        stored["segments"],
+        reply_to_id=stored["reply_to_id"],
+        posted_ids=stored["posted_ids"],
+        on_posted=on_posted,
+        not_before=stored["created_at"]
+    )
+    if pending:
+        await pending
+    await store.finish(stored["id"], result["tweet_ids"], result.get("error"))
+    
+    await recorder.record(
+        "post",
+        description="Thread",
+        success=result["success"],
+        tweet_id=result["tweet_ids"][0] if result["tweet_ids"] else None,
+        tweet_text=stored["segments"][0],
+        error_message=result.get("error"),
+        extra_data={"thread_id": stored["id"], "segments": len(stored["segments"]), "posted": len(result["tweet_ids"])}
+    )
+    
+    return {
+        "thread_id": stored["id"],
+        "status": "posted" if result["success"] else "failed",
+        "tweet_ids": result["tweet_ids"],
+        "failed_index": result.get("failed_index"),
+        "error": result.get("error")
+    }
+
+
 @router.get("/user/{user_id}")
 async def get_user_tweets(user_id: str, max_results: int = 10):
     """Get tweets from a specific user"""
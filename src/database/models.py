@@ -2,12 +2,13 @@
 Database models for Twitter Bot
 """
 
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, JSON
+from sqlalchemy import Column, Integer, BigInteger, String, Text, Boolean, DateTime, JSON, Index, UniqueConstraint, inspect, text
+from sqlalchemy.schema import CreateColumn
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
 from datetime import datetime
 from config.settings import get_settings
+from src.database.session import create_db_engine
 
 settings = get_settings()
 
@@ -39,7 +40,9 @@ class BotConfiguration(Base):
     __tablename__ = "bot_configurations"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, index=True)  # Reference to User.id
+    user_id = Column(Integer, nullable=False, default=0)  # Reference to User.id, 0 for the default user
+    enabled = Column(Boolean, default=True)
+    version = Column(Integer, default=1)  # Bumped on every config or target change
     
     # Scheduling configuration
     posting_enabled = Column(Boolean, default=True)
@@ -59,6 +62,10 @@ class BotConfiguration(Base):
     
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        Index("uq_bot_configurations_user_id", "user_id", unique=True),
+    )
 
 
 class TargetAccount(Base):
@@ -66,7 +73,7 @@ class TargetAccount(Base):
     __tablename__ = "target_accounts"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, index=True)  # Reference to User.id
+    user_id = Column(Integer, nullable=False, default=0, index=True)  # Reference to User.id, 0 for the default user
     
     target_username = Column(String(50), index=True)
     target_user_id = Column(String(50))
@@ -86,7 +93,7 @@ class ActivityLog(Base):
     __tablename__ = "activity_logs"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, index=True)
+    user_id = Column(Integer, nullable=False, default=0, index=True)  # Reference to User.id, 0 for the default user
     
     activity_type = Column(String(50))  # 'post', 'reply', 'like', 'follow', 'error'
     description = Column(Text)
@@ -104,16 +111,172 @@ class ActivityLog(Base):
     extra_data = Column(JSON)  # Additional data as JSON
     
     created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Composite indexes for filtered, newest-first keyset pagination
+    __table_args__ = (
+        Index("ix_activity_logs_created_id", "created_at", "id"),
+        Index("ix_activity_logs_user_created_id", "user_id", "created_at", "id"),
+        Index("ix_activity_logs_type_created_id", "activity_type", "created_at", "id"),
+        Index("ix_activity_logs_user_type_created_id", "user_id", "activity_type", "created_at", "id"),
+    )
+
+
+class ActivityRollup(Base):
+    """Hourly and daily activity counts, maintained as activity is written"""
+    __tablename__ = "activity_rollups"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    granularity = Column(String(10), nullable=False)  # 'hour', 'day'
+    bucket_start = Column(DateTime, nullable=False)
+    user_id = Column(Integer, nullable=False, default=0)  # 0 for the default user
+    activity_type = Column(String(50), nullable=False)
+    
+    total = Column(Integer, default=0)
+    succeeded = Column(Integer, default=0)
+    failed = Column(Integer, default=0)
+    
+    __table_args__ = (
+        UniqueConstraint("granularity", "bucket_start", "user_id", "activity_type", name="uq_activity_rollups_bucket"),
+        Index("ix_activity_rollups_granularity_bucket", "granularity", "bucket_start"),
+    )
+
+
+class ContentDraft(Base):
+    """Pre-generated tweet drafts waiting to be posted"""
+    __tablename__ = "content_drafts"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, nullable=False, default=0, index=True)  # Reference to User.id, 0 for the default user
+    
+    content = Column(Text)
+    theme = Column(String(200))
+    # Content settings the draft was generated under
+    personality = Column(String(50))
+    max_length = Column(Integer)
+    status = Column(String(20), default="pending", index=True)  # 'pending', 'used', 'stale'
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    used_at = Column(DateTime)
+
+
+class ContentFingerprint(Base):
+    """SimHash fingerprints of posted and drafted content for near-duplicate checks"""
+    __tablename__ = "content_fingerprints"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, nullable=False, default=0, index=True)  # Reference to User.id, 0 for the default user
+    
+    fingerprint = Column(BigInteger)  # Signed 64-bit SimHash
+    source = Column(String(20))  # 'posted', 'reply', 'draft'
+    tweet_id = Column(String(50))
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class SchedulerLease(Base):
+    """Time-limited lease naming the one process allowed to run scheduled jobs"""
+    __tablename__ = "scheduler_leases"
+    
+    name = Column(String(50), primary_key=True)
+    holder = Column(String(200), nullable=False)
+    
+    acquired_at = Column(DateTime, default=datetime.utcnow)
+    renewed_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+class TweetThread(Base):
+    """Thread posted as a reply chain, tracked segment by segment so it can resume"""
+    __tablename__ = "tweet_threads"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, nullable=False, default=0, index=True)  # Reference to User.id, 0 for the default user
+    idempotency_key = Column(String(100), unique=True)
+    
+    segments = Column(JSON)  # Ordered segment texts
+    posted_ids = Column(JSON)  # Tweet ids of the segments posted so far
+    reply_to_id = Column(String(50))
+    
+    status = Column(String(20), default="pending")  # 'pending', 'posting', 'posted', 'failed'
+    error_message = Column(Text)
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class WorkItem(Base):
+    """Queued job run waiting for, or claimed by, an out-of-process worker"""
+    __tablename__ = "work_items"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    job_type = Column(String(20), nullable=False)  # 'post', 'monitor'
+    dedup_key = Column(String(200))
+    args = Column(JSON)
+    
+    status = Column(String(20), default="queued")  # 'queued', 'running', 'done', 'failed'
+    attempts = Column(Integer, default=0)
+    worker = Column(String(200))
+    error_message = Column(Text)
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    heartbeat_at = Column(DateTime)  # Renewed by the worker while the item runs
+    finished_at = Column(DateTime)
+    
+    __table_args__ = (
+        Index("ix_work_items_type_status_id", "job_type", "status", "id"),
+        Index("ix_work_items_dedup_status", "dedup_key", "status"),
+    )
 
 
 # Database setup
-engine = create_engine(settings.database_url)
+engine = create_db_engine(settings.database_url)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+# Owner stored for the bot's own account, which has no users row
+DEFAULT_USER_PK = 0
+
+
+def user_pk(user_id) -> int:
+    """Map a scheduler user id to a users.id value (DEFAULT_USER_PK for the default user)"""
+    try:
+        return int(user_id)
+    except (TypeError, ValueError):
+        return DEFAULT_USER_PK
+
+
 def create_tables():
     """Create all database tables"""
     Base.metadata.create_all(bind=engine)
+    
+    # create_all skips tables that already exist, so add columns and indexes introduced later
+    existing_columns = {
+        table.name: {column["name"] for column in inspect(engine).get_columns(table.name)}
+        for table in Base.metadata.sorted_tables
+    }
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            for column in table.columns:
+                if column.name not in existing_columns[table.name]:
+                    ddl = CreateColumn(column).compile(dialect=engine.dialect)
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {ddl}"))
+        
+        # The default user's rows used to be stored under a NULL user id
+        for table in Base.metadata.sorted_tables:
+            if table.name != "users" and "user_id" in table.columns:
+                conn.execute(text(f"UPDATE {table.name} SET user_id = {DEFAULT_USER_PK} WHERE user_id IS NULL"))
+        
+        # Several NULL-owner configurations may have piled up; keep the newest per owner
+        # so the unique index below can be built
+        conn.execute(text(
+            "DELETE FROM bot_configurations WHERE id NOT IN "
+            "(SELECT id FROM (SELECT MAX(id) AS id FROM bot_configurations GROUP BY user_id) AS newest)"
+        ))
+    
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
 
 
 def get_db():
@@ -0,0 +1,135 @@
+"""
+Database engine and session factories
+"""
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from typing import Optional, Dict, Any
+from contextlib import asynccontextmanager
+import logging
+
+from config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Async drivers used when deriving an async URL from DATABASE_URL
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+
+def is_sqlite(url: str) -> bool:
+    """Whether a database URL points at SQLite"""
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """WAL lets API reads proceed while scheduler jobs write"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute(f"PRAGMA cache_size=-{settings.sqlite_cache_size_kb}")
+    cursor.close()
+
+
+def _engine_options(url: str) -> Dict[str, Any]:
+    """Connection and pool options for the database backend"""
+    if is_sqlite(url):
+        return {
+            "connect_args": {
+                "check_same_thread": False,
+                "timeout": settings.sqlite_busy_timeout_ms / 1000
+            }
+        }
+    
+    return {
+        "pool_size": settings.database_pool_size,
+        "max_overflow": settings.database_max_overflow,
+        "pool_timeout": settings.database_pool_timeout_seconds,
+        "pool_recycle": settings.database_pool_recycle_seconds,
+        "pool_pre_ping": True
+    }
+
+
+def create_db_engine(url: str) -> Engine:
+    """Create a sync engine with SQLite pragmas or server pool tuning"""
+    engine = create_engine(url, **_engine_options(url))
+    if is_sqlite(url):
+        event.listen(engine, "connect", _apply_sqlite_pragmas)
+    return engine
+
+
+def async_database_url(url: str) -> str:
+    """Derive an async driver URL from a sync database URL"""
+    parsed = make_url(url)
+    if "+" in parsed.drivername:
+        backend = parsed.get_backend_name()
+        if parsed.drivername not in ASYNC_DRIVERS.values() and backend in ASYNC_DRIVERS:
+            parsed = parsed.set(drivername=ASYNC_DRIVERS[backend])
+    elif parsed.drivername in ASYNC_DRIVERS:
+        parsed = parsed.set(drivername=ASYNC_DRIVERS[parsed.drivername])
+    return parsed.render_as_string(hide_password=False)
+
+
+def create_async_db_engine(url: str) -> AsyncEngine:
+    """Create an async engine with the same tuning as the sync engine"""
+    async_url = async_database_url(url)
+    options = _engine_options(url)
+    if is_sqlite(url):
+        # aiosqlite runs each connection on its own thread already
+        options["connect_args"].pop("check_same_thread")
+    
+    engine = create_async_engine(async_url, **options)
+    if is_sqlite(url):
+        event.listen(engine.sync_engine, "connect", _apply_sqlite_pragmas)
+    return engine
+
+
+# Async engine and sessions, created on first use so the driver stays optional
+_async_engine: Optional[AsyncEngine] = None
+_async_sessionmaker: Optional[async_sessionmaker] = None
+
+
+def get_async_sessionmaker() -> async_sessionmaker:
+    """Get the shared async session factory"""
+    global _async_engine, _async_sessionmaker
+    if _async_sessionmaker is None:
+        _async_engine = create_async_db_engine(settings.database_url)
+        _async_sessionmaker = async_sessionmaker(_async_engine, expire_on_commit=False)
+        logger.info("Async database engine initialized")
+    return _async_sessionmaker
+
+
+@asynccontextmanager
+async def async_session_scope():
+    """Async session for background jobs, committed on success"""
+    async with get_async_sessionmaker()() as session:
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+
+
+async def get_async_db():
+    """FastAPI dependency yielding an async database session"""
+    async with get_async_sessionmaker()() as session:
+        yield session
+
+
+async def close_async_engine():
+    """Dispose of the async engine's connection pool"""
+    global _async_engine, _async_sessionmaker
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_sessionmaker = None
@@ -0,0 +1,154 @@
+"""
+Buffered bulk writer for the activity log
+"""
+
+import asyncio
+from datetime import datetime
+from typing import Optional, Dict, Any, List
+from sqlalchemy import insert
+import logging
+
+from config.settings import get_settings
+from src.database.models import ActivityLog, user_pk
+from src.database.session import async_session_scope
+from src.services.activity_rollups import apply_rollups
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Queued after the last record on shutdown so the writer knows to drain and exit
+_STOP = object()
+
+
+class ActivityRecorder:
+    """Queues activity records in memory and writes them in bulk inserts"""
+    
+    def __init__(
+        self,
+        max_queue: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None
+    ):
+        self.max_queue = max_queue or settings.activity_queue_size
+        self.batch_size = batch_size or settings.activity_batch_size
+        self.flush_interval = flush_interval or settings.activity_flush_interval_seconds
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+    
+    def start(self):
+        """Start the background writer"""
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._stopping = False
+            self._task = asyncio.get_running_loop().create_task(self._run())
+            logger.info("Activity recorder started")
+    
+    async def stop(self):
+        """Flush everything queued and stop the writer"""
+        if self._task is None:
+            return
+        
+        self._stopping = True
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+        logger.info(f"Activity recorder stopped after writing {self.written} records")
+    
+    async def record(
+        self,
+        activity_type: str,
+        user_id: str = "default",
+        description: Optional[str] = None,
+        success: bool = True,
+        tweet_id: Optional[str] = None,
+        tweet_text: Optional[str] = None,
+        target_username: Optional[str] = None,
+        error_message: Optional[str] = None,
+        extra_data: Optional[Dict[str, Any]] = None
+    ):
+        """Queue an activity, waiting for room when the queue is full"""
+        if self._stopping:
+            self.dropped += 1
+            logger.warning(f"Dropped {activity_type} activity recorded during shutdown")
+            return
+        
+        self.start()
+        await self._queue.put({
+            "user_id": user_pk(user_id),
+            "activity_type": activity_type,
+            "description": description,
+            "tweet_id": str(tweet_id) if tweet_id is not None else None,
+            "tweet_text": tweet_text,
+            "target_username": target_username,
+            "success": success,
+            "error_message": error_message,
+            "extra_data": extra_data,
+            "created_at": datetime.utcnow()
+        })
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            item = await self._queue.get()
+            if item is _STOP:
+                return
+            
+            # Collect until the batch is full or the oldest record has waited long enough
+            batch = [item]
+            stop = False
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            
+            await self._flush(batch)
+            if stop:
+                return
+    
+    async def _flush(self, batch: List[Dict[str, Any]]):
+        try:
+            await _insert_activities(batch)
+            self.written += len(batch)
+        except Exception as e:
+            self.failed += len(batch)
+            logger.error(f"Failed to write {len(batch)} activity records: {e}")
+    
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and write counters"""
+        return {
+            "queued": self._queue.qsize() if self._queue else 0,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed
+        }
+
+
+async def _insert_activities(rows: List[Dict[str, Any]]):
+    """Write a batch of activities in one executemany insert and update rollups"""
+    # The async driver keeps job writes from tying up executor threads or the loop
+    async with async_session_scope() as session:
+        await session.execute(insert(ActivityLog), rows)
+        await session.run_sync(apply_rollups, rows)
+
+
+# Global activity recorder instance
+activity_recorder = ActivityRecorder()
+
+
+def get_activity_recorder() -> ActivityRecorder:
+    """Get the shared activity recorder"""
+    return activity_recorder
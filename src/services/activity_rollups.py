@@ -0,0 +1,74 @@
+"""
+Incremental hourly and daily rollups of the activity log
+"""
+
+from datetime import datetime
+from typing import Dict, Any, List, Tuple
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from src.database.models import ActivityRollup
+
+GRANULARITIES = ("hour", "day")
+
+
+def bucket_start(timestamp: datetime, granularity: str) -> datetime:
+    """Truncate a timestamp to the start of its hour or day"""
+    if granularity == "hour":
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def rollup_deltas(rows: List[Dict[str, Any]]) -> Dict[Tuple, Dict[str, int]]:
+    """Aggregate a batch of activity rows into per-bucket count increments"""
+    deltas: Dict[Tuple, Dict[str, int]] = {}
+    for row in rows:
+        for granularity in GRANULARITIES:
+            key = (
+                granularity,
+                bucket_start(row["created_at"], granularity),
+                row["user_id"],
+                row["activity_type"]
+            )
+            delta = deltas.setdefault(key, {"total": 0, "succeeded": 0, "failed": 0})
+            delta["total"] += 1
+            delta["succeeded" if row["success"] else "failed"] += 1
+    return deltas
+
+
+def apply_rollups(db: Session, rows: List[Dict[str, Any]]):
+    """Add a batch's counts to the rollup table inside the caller's transaction"""
+    dialect = db.get_bind().dialect.name
+    
+    for (granularity, start, user_id, activity_type), delta in rollup_deltas(rows).items():
+        values = {
+            "granularity": granularity,
+            "bucket_start": start,
+            "user_id": user_id,
+            "activity_type": activity_type,
+            **delta
+        }
+        increments = {
+            "total": ActivityRollup.total + delta["total"],
+            "succeeded": ActivityRollup.succeeded + delta["succeeded"],
+            "failed": ActivityRollup.failed + delta["failed"]
+        }
+        
+        if dialect in ("sqlite", "postgresql"):
+            dialect_insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+            db.execute(
+                dialect_insert(ActivityRollup).values(**values).on_conflict_do_update(
+                    index_elements=["granularity", "bucket_start", "user_id", "activity_type"],
+                    set_=increments
+                )
+            )
+            continue
+        
+        updated = db.query(ActivityRollup).filter(
+            ActivityRollup.granularity == granularity,
+            ActivityRollup.bucket_start == start,
+            ActivityRollup.user_id == user_id,
+            ActivityRollup.activity_type == activity_type
+        ).update(increments, synchronize_session=False)
+        if not updated:
+            db.add(ActivityRollup(**values))
@@ -0,0 +1,160 @@
+"""
+Rolling-window token and request budget for Anthropic usage
+"""
+
+import asyncio
+import itertools
+import time
+from collections import deque
+from typing import Optional, Dict, Any
+import logging
+
+from config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+MINUTE = 60
+DAY = 86400
+
+# Scheduled jobs may use the whole ceiling; everything else leaves the reserve free
+PRIORITIES = ("scheduled", "interactive", "background")
+
+
+class BudgetExceeded(Exception):
+    """Raised when a Claude call would exceed its usage ceiling"""
+    
+    def __init__(self, reason: str, retry_after: float):
+        self.reason = reason
+        self.retry_after = retry_after
+        super().__init__(f"Claude budget exceeded ({reason}), retry in {retry_after:.0f}s")
+
+
+class ClaudeBudget:
+    """Tracks Claude usage per user and call type and enforces per-minute/per-day ceilings"""
+    
+    def __init__(self):
+        # Completed calls: (timestamp, user_id, call_type, input_tokens, output_tokens)
+        self._events = deque()
+        # In-flight calls: reservation id -> (timestamp, estimated tokens)
+        self._in_flight: Dict[int, tuple] = {}
+        self._ids = itertools.count(1)
+        self.limits = {
+            "requests_per_minute": settings.claude_requests_per_minute,
+            "tokens_per_minute": settings.claude_tokens_per_minute,
+            "requests_per_day": settings.claude_requests_per_day,
+            "tokens_per_day": settings.claude_tokens_per_day,
+        }
+    
+    async def reserve(self, estimated_tokens: int, priority: str = "interactive") -> int:
+        """Reserve capacity for one call, returning a reservation id
+        
+        Interactive calls fail fast when over budget; scheduled and background
+        calls wait for the window to free up, bounded by the max wait setting.
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown Claude priority: {priority}")
+        
+        share = 1.0 if priority == "scheduled" else 1.0 - settings.claude_scheduled_reserve_fraction
+        deadline = time.monotonic() + settings.claude_budget_max_wait_seconds
+        
+        while True:
+            blocked = self._check(estimated_tokens, share)
+            if blocked is None:
+                reservation_id = next(self._ids)
+                self._in_flight[reservation_id] = (time.time(), estimated_tokens)
+                return reservation_id
+            
+            reason, retry_after = blocked
+            if priority == "interactive" or time.monotonic() + retry_after > deadline:
+                raise BudgetExceeded(reason, retry_after)
+            
+            logger.info(f"Waiting {retry_after:.1f}s for Claude budget ({reason})")
+            await asyncio.sleep(retry_after)
+    
+    def commit(
+        self,
+        reservation_id: int,
+        user_id: str,
+        call_type: str,
+        input_tokens: int = 0,
+        output_tokens: int = 0
+    ):
+        """Replace a reservation with the usage Anthropic reported"""
+        self._in_flight.pop(reservation_id, None)
+        self._events.append((time.time(), user_id, call_type, input_tokens, output_tokens))
+    
+    def release(self, reservation_id: int):
+        """Drop a reservation whose call never reached the API"""
+        self._in_flight.pop(reservation_id, None)
+    
+    def usage(self, window: str = "minute") -> Dict[str, Any]:
+        """Usage totals in a rolling window, broken down by user and call type"""
+        since = time.time() - (MINUTE if window == "minute" else DAY)
+        self._prune()
+        
+        def bucket():
+            return {"requests": 0, "input_tokens": 0, "output_tokens": 0}
+        
+        total = bucket()
+        by_user: Dict[str, Dict[str, int]] = {}
+        by_call_type: Dict[str, Dict[str, int]] = {}
+        for timestamp, user_id, call_type, input_tokens, output_tokens in self._events:
+            if timestamp < since:
+                continue
+            for entry in (total, by_user.setdefault(user_id, bucket()), by_call_type.setdefault(call_type, bucket())):
+                entry["requests"] += 1
+                entry["input_tokens"] += input_tokens
+                entry["output_tokens"] += output_tokens
+        
+        return {
+            "window": window,
+            "total": total,
+            "by_user": by_user,
+            "by_call_type": by_call_type,
+            "in_flight": len(self._in_flight),
+            "limits": self.limits
+        }
+    
+    def _check(self, estimated_tokens: int, share: float) -> Optional[tuple]:
+        """Return (reason, retry_after) if the call doesn't fit, otherwise None"""
+        now = time.time()
+        self._prune()
+        
+        for window, requests_key, tokens_key in (
+            (MINUTE, "requests_per_minute", "tokens_per_minute"),
+            (DAY, "requests_per_day", "tokens_per_day"),
+        ):
+            since = now - window
+            events = [event for event in self._events if event[0] >= since]
+            requests = len(events) + len(self._in_flight)
+            tokens = sum(event[3] + event[4] for event in events)
+            tokens += sum(estimated for _, estimated in self._in_flight.values())
+            
+            # Until the oldest counted call ages out of the window
+            retry_after = max(1.0, events[0][0] + window - now) if events else 1.0
+            
+            request_limit = self.limits[requests_key]
+            if request_limit and requests + 1 > request_limit * share:
+                return requests_key, retry_after
+            
+            token_limit = self.limits[tokens_key]
+            if token_limit and tokens + estimated_tokens > token_limit * share:
+                return tokens_key, retry_after
+        
+        return None
+    
+    def _prune(self):
+        """Forget completed calls older than the longest window"""
+        cutoff = time.time() - DAY
+        while self._events and self._events[0][0] < cutoff:
+            self._events.popleft()
+
+
+# Global budget shared by every ClaudeService call
+claude_budget = ClaudeBudget()
+
+
+def get_claude_budget() -> ClaudeBudget:
+    """Get the shared Claude budget"""
+    return claude_budget
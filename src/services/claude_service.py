@@ -3,41 +3,226 @@ Claude AI service for content generation and analysis
 """
 
 import anthropic
+import asyncio
+import httpx
+import json
 from typing import Optional, Dict, Any, List
 from config.settings import get_settings
+from src.services.claude_budget import BudgetExceeded, get_claude_budget
+from src.services.generation_cache import get_generation_cache, make_cache_key
 import logging
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Process-wide async client and concurrency limit, created lazily
+_client: Optional[anthropic.AsyncAnthropic] = None
+_concurrency: Optional[asyncio.Semaphore] = None
+
+
+def get_claude_client() -> anthropic.AsyncAnthropic:
+    """Get the shared async Claude client backed by a keep-alive connection pool"""
+    global _client
+    if _client is None:
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.claude_max_connections,
+                max_keepalive_connections=settings.claude_max_keepalive_connections,
+                keepalive_expiry=settings.claude_keepalive_expiry_seconds
+            ),
+            timeout=settings.claude_timeout_seconds
+        )
+        _client = anthropic.AsyncAnthropic(
+            api_key=settings.claude_api_key,
+            base_url=settings.claude_base_url,
+            timeout=settings.claude_timeout_seconds,
+            max_retries=settings.claude_max_retries,
+            http_client=http_client
+        )
+        logger.info("Claude async client initialized")
+    return _client
+
+
+def _get_concurrency() -> asyncio.Semaphore:
+    """Get the semaphore bounding in-flight Claude requests"""
+    global _concurrency
+    if _concurrency is None:
+        _concurrency = asyncio.Semaphore(settings.claude_max_concurrency)
+    return _concurrency
+
+
+async def close_claude_client():
+    """Close the shared Claude client and its connection pool"""
+    global _client, _concurrency
+    if _client is not None:
+        await _client.close()
+        _client = None
+        _concurrency = None
+        logger.info("Claude async client closed")
+
+
+# Rough token accounting used to size batched triage requests
+TRIAGE_ITEM_OVERHEAD_TOKENS = 25
+TRIAGE_OUTPUT_TOKENS_PER_ITEM = 120
+# Output budget per generated content idea (a 280 character tweet plus numbering)
+IDEA_TOKENS_PER_ITEM = 100
+
+
+def _estimate_tokens(text: str) -> int:
+    """Cheap token estimate (about four characters per token)"""
+    return len(text) // 4 + 1
+
+
+def _estimate_request_tokens(kwargs: Dict[str, Any]) -> int:
+    """Estimated prompt plus maximum output tokens for a messages request"""
+    prompt_text = kwargs.get("system", "") + "".join(
+        message["content"] for message in kwargs.get("messages", [])
+    )
+    return _estimate_tokens(prompt_text) + kwargs.get("max_tokens", 0)
+
+
+def _tweet_system_prompt(personality: str, max_length: int, theme: Optional[str]) -> str:
+    """System prompt shared by the buffered and streaming tweet generators"""
+    return f"""You are a {personality} Twitter bot. Generate engaging tweet content that:
+- Is {max_length} characters or less
+- Matches the personality: {personality}
+- Is relevant to the theme: {theme or 'general topics'}
+- Includes appropriate hashtags if relevant
+- Is engaging and encourages interaction
+- Follows Twitter community guidelines
+- Does not include sensitive or controversial content
+
+Generate only the tweet text, no additional formatting or quotes."""
+
+
+def _clip_tweet(content: str, max_length: int) -> str:
+    """Strip and truncate generated text to the character limit"""
+    content = content.strip()
+    if len(content) > max_length:
+        content = content[:max_length-3] + "..."
+    return content
+
+
+def _parse_triage_response(response_text: str) -> List[Dict[str, Any]]:
+    """Extract the JSON array of decisions from a triage response"""
+    start = response_text.find("[")
+    end = response_text.rfind("]")
+    if start == -1 or end <= start:
+        logger.warning("Triage response did not contain a JSON array")
+        return []
+    
+    try:
+        decisions = json.loads(response_text[start:end + 1])
+    except json.JSONDecodeError as e:
+        logger.warning(f"Failed to parse triage response: {e}")
+        return []
+    
+    return [decision for decision in decisions if isinstance(decision, dict)]
+
 
 class ClaudeService:
     """Service for Claude AI interactions"""
     
-    def __init__(self):
-        self.client = anthropic.Anthropic(api_key=settings.claude_api_key)
+    def __init__(self, client: Optional[anthropic.AsyncAnthropic] = None):
+        self.client = client or get_claude_client()
+    
+    async def _create_message(
+        self,
+        call_type: str,
+        user_id: str = "default",
+        priority: str = "interactive",
+        **kwargs
+    ):
+        """Send a messages request within the usage budget and the concurrency limit"""
+        budget = get_claude_budget()
+        reservation = await budget.reserve(_estimate_request_tokens(kwargs), priority)
+        
+        try:
+            async with _get_concurrency():
+                message = await self.client.messages.create(**kwargs)
+        except Exception:
+            budget.release(reservation)
+            raise
+        
+        budget.commit(
+            reservation,
+            user_id,
+            call_type,
+            input_tokens=message.usage.input_tokens,
+            output_tokens=message.usage.output_tokens
+        )
+        return message
+    
+    async def _stream_message(
+        self,
+        call_type: str,
+        user_id: str = "default",
+        priority: str = "interactive",
+        **kwargs
+    ):
+        """Stream a messages request's text deltas within the usage budget and the concurrency limit
+        
+        Closing the generator early stops the stream; usage is still committed
+        from what the API reported, or estimated from the text received.
+        """
+        budget = get_claude_budget()
+        reservation = await budget.reserve(_estimate_request_tokens(kwargs), priority)
+        
+        received: List[str] = []
+        usage = None
+        try:
+            async with _get_concurrency():
+                async with self.client.messages.stream(**kwargs) as stream:
+                    try:
+                        async for text in stream.text_stream:
+                            received.append(text)
+                            yield text
+                    finally:
+                        try:
+                            usage = stream.current_message_snapshot.usage
+                        except Exception:
+                            usage = None  # Stream closed before message_start
+        finally:
+            if usage is None and not received:
+                budget.release(reservation)
+            else:
+                budget.commit(
+                    reservation,
+                    user_id,
+                    call_type,
+                    input_tokens=usage.input_tokens if usage else _estimate_request_tokens(kwargs) - kwargs.get("max_tokens", 0),
+                    output_tokens=max(usage.output_tokens if usage else 0, _estimate_tokens("".join(received)))
+                )
     
     async def generate_tweet_content(
         self, 
         prompt: str, 
         theme: Optional[str] = None,
         personality: str = "friendly",
-        max_length: int = 280
+        max_length: int = 280,
+        user_id: str = "default",
+        priority: str = "interactive",
+        use_cache: bool = False,
+        fresh: bool = False
     ) -> Dict[str, Any]:
-        """Generate tweet content based on prompt and theme"""
+        """Generate tweet content based on prompt and theme
+        
+        With use_cache, identical requests are answered from the generation cache;
+        fresh skips the lookup but still refreshes the cached entry.
+        """
         try:
-            system_prompt = f"""You are a {personality} Twitter bot. Generate engaging tweet content that:
-- Is {max_length} characters or less
-- Matches the personality: {personality}
-- Is relevant to the theme: {theme or 'general topics'}
-- Includes appropriate hashtags if relevant
-- Is engaging and encourages interaction
-- Follows Twitter community guidelines
-- Does not include sensitive or controversial content
-
-Generate only the tweet text, no additional formatting or quotes."""
+            cache_key = make_cache_key(prompt, theme, personality, max_length) if use_cache else None
+            if cache_key and not fresh:
+                cached = await get_generation_cache().get(cache_key)
+                if cached is not None:
+                    return {**cached, "cached": True}
+            
+            system_prompt = _tweet_system_prompt(personality, max_length, theme)
 
-            message = self.client.messages.create(
+            message = await self._create_message(
+                "generate_tweet",
+                user_id=user_id,
+                priority=priority,
                 model="claude-3-5-sonnet-20241022",
                 max_tokens=150,
                 temperature=0.7,
@@ -50,18 +235,26 @@ Generate only the tweet text, no additional formatting or quotes."""
                 ]
             )
             
-            content = message.content[0].text.strip()
-            
             # Ensure content is within character limit
-            if len(content) > max_length:
-                content = content[:max_length-3] + "..."
+            content = _clip_tweet(message.content[0].text, max_length)
             
-            return {
+            result = {
                 "content": content,
                 "success": True,
                 "character_count": len(content)
             }
+            if cache_key:
+                await get_generation_cache().set(cache_key, result)
+            
+            return {**result, "cached": False}
             
+        except BudgetExceeded as e:
+            logger.warning(f"Tweet generation deferred: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "retry_after": e.retry_after
+            }
         except Exception as e:
             logger.error(f"Failed to generate tweet content: {e}")
             return {
@@ -69,11 +262,85 @@ Generate only the tweet text, no additional formatting or quotes."""
                 "error": str(e)
             }
     
+    async def stream_tweet_content(
+        self,
+        prompt: str,
+        theme: Optional[str] = None,
+        personality: str = "friendly",
+        max_length: int = 280,
+        user_id: str = "default",
+        priority: str = "interactive"
+    ):
+        """Generate tweet content, yielding text deltas as they arrive
+        
+        Yields {"type": "delta", "text"} events, then one {"type": "done"}
+        event with the cleaned content, or {"type": "error"}. Deltas never
+        run past the character limit; once the text is certain to be
+        truncated the stream is stopped and only the final event follows.
+        """
+        # Text up to this length is safe to forward whether or not the result gets truncated
+        safe_length = max_length - 3
+        text = ""
+        forwarded = 0
+        truncated = False
+        
+        try:
+            stream = self._stream_message(
+                "generate_tweet",
+                user_id=user_id,
+                priority=priority,
+                model="claude-3-5-sonnet-20241022",
+                max_tokens=150,
+                temperature=0.7,
+                system=_tweet_system_prompt(personality, max_length, theme),
+                messages=[
+                    {
+                        "role": "user",
+                        "content": prompt
+                    }
+                ]
+            )
+            try:
+                async for delta in stream:
+                    # Leading whitespace is stripped from the final content, so never forward it
+                    text = (text + delta).lstrip()
+                    if len(text) > forwarded and forwarded < safe_length:
+                        chunk = text[forwarded:safe_length]
+                        forwarded += len(chunk)
+                        yield {"type": "delta", "text": chunk}
+                    if len(text.rstrip()) > max_length:
+                        truncated = True
+                        break
+            finally:
+                await stream.aclose()
+            
+            content = _clip_tweet(text, max_length)
+            if not truncated and len(content) > forwarded:
+                # The held-back tail fit after all
+                yield {"type": "delta", "text": content[forwarded:]}
+            
+            yield {
+                "type": "done",
+                "success": True,
+                "content": content,
+                "character_count": len(content),
+                "truncated": truncated
+            }
+            
+        except BudgetExceeded as e:
+            logger.warning(f"Tweet generation deferred: {e}")
+            yield {"type": "error", "success": False, "error": str(e), "retry_after": e.retry_after}
+        except Exception as e:
+            logger.error(f"Failed to stream tweet content: {e}")
+            yield {"type": "error", "success": False, "error": str(e)}
+    
     async def analyze_tweet_for_reply(
         self, 
         tweet_text: str, 
         author_username: str,
-        personality: str = "friendly"
+        personality: str = "friendly",
+        user_id: str = "default",
+        priority: str = "interactive"
     ) -> Dict[str, Any]:
         """Analyze a tweet and generate a contextual reply"""
         try:
@@ -102,7 +369,10 @@ SHOULD_REPLY: [true/false]
 REPLY: [your reply text or "N/A"]
 REASON: [brief explanation]"""
 
-            message = self.client.messages.create(
+            message = await self._create_message(
+                "analyze_reply",
+                user_id=user_id,
+                priority=priority,
                 model="claude-3-5-sonnet-20241022",
                 max_tokens=200,
                 temperature=0.6,
@@ -146,11 +416,166 @@ REASON: [brief explanation]"""
                 "error": str(e)
             }
     
+    def plan_triage_batches(self, tweets: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """Split tweets into batches that fit the triage token budget"""
+        batches = []
+        current = []
+        current_tokens = 0
+        
+        for tweet in tweets:
+            tokens = _estimate_tokens(tweet["text"]) + TRIAGE_ITEM_OVERHEAD_TOKENS
+            if current and (
+                current_tokens + tokens > settings.claude_triage_max_input_tokens
+                or len(current) >= settings.claude_triage_max_items
+            ):
+                batches.append(current)
+                current = []
+                current_tokens = 0
+            current.append(tweet)
+            current_tokens += tokens
+        
+        if current:
+            batches.append(current)
+        return batches
+    
+    async def analyze_tweets_for_reply(
+        self,
+        tweets: List[Dict[str, Any]],
+        personality: str = "friendly",
+        user_id: str = "default",
+        priority: str = "interactive"
+    ) -> Dict[str, Any]:
+        """Triage many tweets for replies, one Claude request per token-budgeted batch
+        
+        Each tweet is a dict with "id", "author" and "text". Results are keyed by
+        tweet id; tweets the model skipped twice come back with should_reply False.
+        """
+        try:
+            batches = self.plan_triage_batches(tweets)
+            calls = {"requests": 0}
+            batch_results = await asyncio.gather(*(
+                self._triage_batch(batch, personality, user_id, priority, calls) for batch in batches
+            ), return_exceptions=True)
+            
+            results = {}
+            for batch, batch_result in zip(batches, batch_results):
+                if isinstance(batch_result, Exception):
+                    logger.error(f"Failed to triage batch of {len(batch)} tweets: {batch_result}")
+                    for tweet in batch:
+                        results[str(tweet["id"])] = {
+                            "success": False,
+                            "error": str(batch_result)
+                        }
+                else:
+                    results.update(batch_result)
+            
+            return {
+                "results": results,
+                "requests": calls["requests"],
+                "success": True
+            }
+            
+        except Exception as e:
+            logger.error(f"Failed to triage tweets for reply: {e}")
+            return {
+                "success": False,
+                "error": str(e)
+            }
+    
+    async def _triage_batch(
+        self,
+        tweets: List[Dict[str, Any]],
+        personality: str,
+        user_id: str,
+        priority: str,
+        calls: Dict[str, int],
+        retry_missing: bool = True
+    ) -> Dict[str, Dict[str, Any]]:
+        """Triage one batch and map decisions back to tweet ids, counting each request in calls"""
+        # Short per-batch keys are echoed back more reliably than long tweet ids
+        keyed = {f"t{index}": tweet for index, tweet in enumerate(tweets, 1)}
+        
+        system_prompt = f"""You are a {personality} Twitter bot deciding which tweets deserve a reply.
+
+Rules for replies:
+- Be genuinely helpful and engaging
+- Match the {personality} personality
+- Keep replies under 280 characters
+- Don't be promotional or spammy
+- Add value to the conversation
+- Be respectful and considerate
+- Only reply if you have something meaningful to contribute
+- Avoid controversial topics
+
+You will receive a JSON array of tweets, each with a "key", "author" and "text".
+Respond with only a JSON array containing one object per tweet:
+{{"key": "<key>", "should_reply": true or false, "reply": "<reply text or empty>", "reason": "<brief explanation>"}}"""
+
+        payload = [
+            {"key": key, "author": f"@{tweet['author']}", "text": tweet["text"]}
+            for key, tweet in keyed.items()
+        ]
+        
+        message = await self._create_message(
+            "triage",
+            user_id=user_id,
+            priority=priority,
+            model="claude-3-5-sonnet-20241022",
+            max_tokens=min(4096, TRIAGE_OUTPUT_TOKENS_PER_ITEM * len(tweets) + 50),
+            temperature=0.6,
+            system=system_prompt,
+            messages=[
+                {
+                    "role": "user",
+                    "content": json.dumps(payload, ensure_ascii=False)
+                }
+            ]
+        )
+        
+        calls["requests"] += 1
+        decisions = _parse_triage_response(message.content[0].text)
+        
+        results = {}
+        for decision in decisions:
+            tweet = keyed.get(str(decision.get("key", "")))
+            if tweet is None or str(tweet["id"]) in results:
+                continue
+            
+            reply_text = str(decision.get("reply") or "").strip()
+            should_reply = bool(decision.get("should_reply")) and bool(reply_text)
+            results[str(tweet["id"])] = {
+                "success": True,
+                "should_reply": should_reply,
+                "reply_text": reply_text if should_reply else "",
+                "reason": str(decision.get("reason") or ""),
+                "character_count": len(reply_text) if should_reply else 0
+            }
+        
+        missing = [tweet for tweet in tweets if str(tweet["id"]) not in results]
+        if missing and retry_missing:
+            logger.warning(f"Triage response skipped {len(missing)} of {len(tweets)} tweets, retrying them")
+            results.update(await self._triage_batch(
+                missing, personality, user_id, priority, calls, retry_missing=False
+            ))
+        elif missing:
+            for tweet in missing:
+                results[str(tweet["id"])] = {
+                    "success": True,
+                    "should_reply": False,
+                    "reply_text": "",
+                    "reason": "No decision returned by the model",
+                    "character_count": 0
+                }
+        
+        return results
+    
     async def generate_content_ideas(
         self, 
         themes: List[str],
         count: int = 5,
-        personality: str = "friendly"
+        personality: str = "friendly",
+        user_id: str = "default",
+        priority: str = "interactive"
     ) -> Dict[str, Any]:
         """Generate content ideas based on themes"""
         try:
@@ -169,9 +594,13 @@ Each idea should be:
 
 Format: Return only the tweet ideas, one per line, numbered 1-{count}."""
 
-            message = self.client.messages.create(
+            message = await self._create_message(
+                "content_ideas",
+                user_id=user_id,
+                priority=priority,
                 model="claude-3-5-sonnet-20241022",
-                max_tokens=300,
+                # Room for a full tweet per idea so the list isn't cut off mid-item
+                max_tokens=IDEA_TOKENS_PER_ITEM * count,
                 temperature=0.8,
                 system=system_prompt,
                 messages=[
@@ -188,6 +617,8 @@ Format: Return only the tweet ideas, one per line, numbered 1-{count}."""
             return {
                 "ideas": ideas,
                 "count": len(ideas),
+                # The last line may be a partial idea when the model ran out of tokens
+                "truncated": message.stop_reason == "max_tokens",
                 "success": True
             }
             
@@ -196,4 +627,16 @@ Format: Return only the tweet ideas, one per line, numbered 1-{count}."""
             return {
                 "success": False,
                 "error": str(e)
-            }
\ No newline at end of file
+            }
+
+
+# Global Claude service instance, created on first use
+claude_service: Optional[ClaudeService] = None
+
+
+def get_claude_service() -> ClaudeService:
+    """Get the shared Claude service instance"""
+    global claude_service
+    if claude_service is None:
+        claude_service = ClaudeService()
+    return claude_service
\ No newline at end of file
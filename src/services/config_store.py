@@ -0,0 +1,313 @@
+"""
+Persistent bot configuration with a versioned in-process read cache
+"""
+
+import asyncio
+import time
+from typing import Optional, Dict, Any, List, Callable, Tuple
+from sqlalchemy import func, update, inspect as sa_inspect
+from sqlalchemy.exc import IntegrityError
+import logging
+
+from config.settings import get_settings
+from src.database.models import SessionLocal, BotConfiguration, TargetAccount, DEFAULT_USER_PK, user_pk
+from src.services.target_accounts import normalize_username
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# BotConfiguration columns behind each API config field
+SCHEDULE_COLUMNS = {
+    "enabled": "posting_enabled",
+    "interval_hours": "posting_interval_hours",
+    "interval_days": "posting_interval_days",
+    "timezone": "timezone"
+}
+CONTENT_COLUMNS = {
+    "themes": "content_themes",
+    "personality": "personality",
+    "content_types": "content_types",
+    "max_length": "max_tweet_length"
+}
+DEFAULT_CONTENT_TYPES = ["tips", "thoughts", "questions"]
+# Compare-and-swap retries before a write gives up under contention
+WRITE_ATTEMPTS = 10
+
+
+def _config_from_rows(
+    row: Optional[BotConfiguration],
+    targets: Optional[List[TargetAccount]] = None,
+    has_enabled_targets: Optional[bool] = None
+) -> Dict[str, Any]:
+    """Build the API-shaped config dict, filling defaults for unset columns
+    
+    Without targets only the settings row and has_enabled_targets are included,
+    which is all the scheduler needs to decide what to reschedule.
+    """
+    def value(column, default):
+        current = getattr(row, column) if row is not None else None
+        return default if current is None else current
+    
+    config = {
+        "version": value("version", 0),
+        "enabled": value("enabled", True),
+        "schedule": {
+            "enabled": value("posting_enabled", True),
+            "interval_hours": value("posting_interval_hours", settings.default_post_interval_hours),
+            "interval_days": value("posting_interval_days", 0),
+            "timezone": value("timezone", settings.timezone)
+        },
+        "content": {
+            "themes": value("content_themes", []),
+            "personality": value("personality", "friendly"),
+            "content_types": value("content_types", DEFAULT_CONTENT_TYPES),
+            "max_length": value("max_tweet_length", 280)
+        },
+        "monitoring_interval_hours": value("monitoring_interval_hours", 2),
+        "has_enabled_targets": has_enabled_targets
+    }
+    if targets is not None:
+        config["target_accounts"] = [
+            {
+                "username": target.target_username,
+                "user_id": target.target_user_id,
+                "enabled": target.enabled is not False,
+                "reply_enabled": target.reply_enabled is not False
+            }
+            for target in targets
+        ]
+        config["has_enabled_targets"] = any(target["enabled"] for target in config["target_accounts"])
+    return config
+
+
+class ConfigStore:
+    """Reads and writes per-user bot configuration in the database
+    
+    Reads are served from memory. After the TTL a cached entry is checked
+    against the row's version number and only reloaded if another process
+    changed it. Every write is a compare-and-swap on the row's version and
+    returns a summary of the settings before and after the change (without the
+    target list), so callers can act on the difference.
+    """
+    
+    def __init__(self, ttl_seconds: Optional[float] = None):
+        self.ttl = ttl_seconds if ttl_seconds is not None else settings.config_cache_ttl_seconds
+        self._cache: Dict[int, Dict[str, Any]] = {}
+    
+    async def get(self, user_id: str = "default") -> Dict[str, Any]:
+        """Current configuration for a user"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._get, user_pk(user_id))
+    
+    async def replace(self, user_id: str, config: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Replace the whole configuration, syncing target accounts row by row"""
+        def apply(db, row, owner):
+            row.enabled = config["enabled"]
+            self._set_columns(row, SCHEDULE_COLUMNS, config["schedule"])
+            self._set_columns(row, CONTENT_COLUMNS, config["content"])
+            
+            wanted = {normalize_username(target["username"]): target for target in config["target_accounts"]}
+            for target in db.query(TargetAccount).filter(TargetAccount.user_id == owner):
+                key = normalize_username(target.target_username)
+                if key not in wanted:
+                    db.delete(target)
+                    continue
+                update = wanted.pop(key)
+                target.enabled = update.get("enabled", True)
+                target.reply_enabled = update.get("reply_enabled", True)
+            for target in wanted.values():
+                db.add(self._new_target(owner, target))
+        
+        return await self._write(user_id, apply)
+    
+    async def set_enabled(self, user_id: str, enabled: bool) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Turn the whole bot on or off"""
+        def apply(db, row, owner):
+            row.enabled = enabled
+        
+        return await self._write(user_id, apply)
+    
+    async def update_schedule(self, user_id: str, schedule: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Replace the posting schedule"""
+        return await self._write(user_id, lambda db, row, owner: self._set_columns(row, SCHEDULE_COLUMNS, schedule))
+    
+    async def update_content(self, user_id: str, content: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Replace the content settings"""
+        return await self._write(user_id, lambda db, row, owner: self._set_columns(row, CONTENT_COLUMNS, content))
+    
+    async def add_target(self, user_id: str, target: Dict[str, Any]) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """Add one target account, or return None if it is already configured"""
+        def apply(db, row, owner):
+            exists = db.query(TargetAccount.id).filter(
+                TargetAccount.user_id == owner,
+                func.lower(TargetAccount.target_username) == normalize_username(target["username"])
+            ).first()
+            if exists:
+                return False
+            db.add(self._new_target(owner, target))
+        
+        return await self._write(user_id, apply)
+    
+    async def remove_target(self, user_id: str, username: str) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """Remove one target account, or return None if it was not configured"""
+        def apply(db, row, owner):
+            deleted = db.query(TargetAccount).filter(
+                TargetAccount.user_id == owner,
+                func.lower(TargetAccount.target_username) == normalize_username(username)
+            ).delete(synchronize_session=False)
+            if not deleted:
+                return False
+        
+        return await self._write(user_id, apply)
+    
+    async def list_versions(self) -> Dict[str, int]:
+        """Current version of every stored configuration, keyed by scheduler user id"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._list_versions)
+    
+    def invalidate(self, user_id: Optional[str] = None):
+        """Drop cached configuration for one user or everyone"""
+        if user_id is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(user_pk(user_id), None)
+    
+    def _get(self, owner: int) -> Dict[str, Any]:
+        cached = self._cache.get(owner)
+        now = time.monotonic()
+        if cached and now - cached["checked_at"] < self.ttl:
+            return cached["config"]
+        
+        db = SessionLocal()
+        try:
+            if cached:
+                version = db.query(BotConfiguration.version).filter(
+                    BotConfiguration.user_id == owner
+                ).scalar() or 0
+                if version == cached["config"]["version"]:
+                    cached["checked_at"] = now
+                    return cached["config"]
+            
+            return self._load(db, owner)
+        finally:
+            db.close()
+    
+    def _load(self, db, owner: int) -> Dict[str, Any]:
+        row = db.query(BotConfiguration).filter(BotConfiguration.user_id == owner).first()
+        targets = db.query(TargetAccount).filter(TargetAccount.user_id == owner).order_by(TargetAccount.id).all()
+        config = _config_from_rows(row, targets)
+        self._cache[owner] = {"config": config, "checked_at": time.monotonic()}
+        return config
+    
+    async def _write(self, user_id: str, apply: Callable) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._write_sync, user_pk(user_id), apply)
+    
+    def _write_sync(self, owner: int, apply: Callable) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        db = SessionLocal()
+        try:
+            for _ in range(WRITE_ATTEMPTS):
+                result = self._try_write(db, owner, apply)
+                if result is not False:
+                    # Next read reloads the full config, targets included
+                    self._cache.pop(owner, None)
+                    return result
+            raise RuntimeError("Configuration was changed concurrently, try again")
+        finally:
+            db.close()
+    
+    def _try_write(self, db, owner: int, apply: Callable):
+        """One write attempt: the change, or None for a no-op, or False if another writer won"""
+        row = db.query(BotConfiguration).filter(BotConfiguration.user_id == owner).first()
+        old = _config_from_rows(row, has_enabled_targets=self._has_enabled_targets(db, owner))
+        expected = old["version"]
+        inserting = row is None
+        if inserting:
+            row = BotConfiguration(user_id=owner, version=1)
+        
+        try:
+            # Row changes must go out in the conditional UPDATE below, not an autoflush
+            with db.no_autoflush:
+                if apply(db, row, owner) is False:
+                    db.rollback()
+                    return None
+            
+            if inserting:
+                db.add(row)
+                db.flush()
+            else:
+                changes = {
+                    attr.key: attr.value
+                    for attr in sa_inspect(row).attrs
+                    if attr.history.has_changes()
+                }
+                db.expunge(row)
+                db.flush()
+                swapped = db.execute(
+                    update(BotConfiguration)
+                    .where(
+                        BotConfiguration.id == row.id,
+                        func.coalesce(BotConfiguration.version, 0) == expected
+                    )
+                    .values(version=func.coalesce(BotConfiguration.version, 0) + 1, **changes)
+                ).rowcount
+                if not swapped:
+                    db.rollback()
+                    return False
+            
+            new = _config_from_rows(row, has_enabled_targets=self._has_enabled_targets(db, owner))
+            new["version"] = expected + 1
+            db.commit()
+            return old, new
+        except IntegrityError:
+            # Another writer created this user's row first
+            db.rollback()
+            return False
+        except Exception:
+            db.rollback()
+            raise
+    
+    @staticmethod
+    def _has_enabled_targets(db, owner: int) -> bool:
+        return db.query(
+            db.query(TargetAccount.id).filter(
+                TargetAccount.user_id == owner,
+                TargetAccount.enabled.isnot(False)
+            ).exists()
+        ).scalar()
+    
+    def _list_versions(self) -> Dict[str, int]:
+        db = SessionLocal()
+        try:
+            rows = db.query(BotConfiguration.user_id, BotConfiguration.version).all()
+            return {
+                "default" if owner == DEFAULT_USER_PK else str(owner): version or 0
+                for owner, version in rows
+            }
+        finally:
+            db.close()
+    
+    @staticmethod
+    def _set_columns(row: BotConfiguration, columns: Dict[str, str], values: Dict[str, Any]):
+        for field, column in columns.items():
+            if field in values:
+                setattr(row, column, values[field])
+    
+    @staticmethod
+    def _new_target(owner: int, target: Dict[str, Any]) -> TargetAccount:
+        return TargetAccount(
+            user_id=owner,
+            target_username=target["username"].strip().lstrip("@"),
+            target_user_id=target.get("user_id"),
+            enabled=target.get("enabled", True),
+            reply_enabled=target.get("reply_enabled", True)
+        )
+
+
+# Global config store instance
+config_store = ConfigStore()
+
+
+def get_config_store() -> ConfigStore:
+    """Get the config store instance"""
+    return config_store
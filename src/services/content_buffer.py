@@ -0,0 +1,223 @@
+"""
+Persisted buffer of pre-generated drafts for scheduled posting
+"""
+
+import asyncio
+import re
+from datetime import datetime
+from typing import Optional, Dict, List
+from sqlalchemy import or_
+import logging
+
+from config.settings import get_settings
+from src.database.models import SessionLocal, ContentDraft, user_pk
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+DEFAULT_THEMES = ["technology and innovation"]
+NUMBERED_IDEA_PATTERN = re.compile(r"^\s*\d+[.)]\s+")
+
+
+def clean_idea(line: str) -> Optional[str]:
+    """Strip list numbering and wrapping quotes, or None for lines that aren't numbered ideas"""
+    match = NUMBERED_IDEA_PATTERN.match(line)
+    if match is None:
+        # Preambles, headings and wrapped continuation lines
+        return None
+    return line[match.end():].strip().strip('"').strip()
+
+
+def parse_ideas(lines: List[str], truncated: bool = False) -> List[str]:
+    """Extract the numbered ideas from a generated list"""
+    ideas = [idea for idea in (clean_idea(line) for line in lines) if idea]
+    if truncated and ideas:
+        # Output stopped at max_tokens, so the last idea is likely cut off mid-sentence
+        ideas.pop()
+    return ideas
+
+
+class ContentBuffer:
+    """Keeps a per-user stock of drafts filled in the background from Claude"""
+    
+    def __init__(self):
+        self._refills: Dict[str, asyncio.Task] = {}
+        # Refills are low priority; only one generates at a time across all users
+        self._refill_slot: Optional[asyncio.Semaphore] = None
+    
+    async def take(self, user_id: str, personality: str, max_length: int) -> Optional[str]:
+        """Claim the oldest pending draft generated under these settings, or None when there is none"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, _claim_draft, user_id, personality, max_length)
+    
+    def request_refill(
+        self,
+        user_id: str,
+        themes: Optional[List[str]] = None,
+        personality: str = "friendly",
+        max_length: int = 280
+    ):
+        """Start a background refill for a user unless one is already running"""
+        task = self._refills.get(user_id)
+        if task and not task.done():
+            return
+        
+        self._refills[user_id] = asyncio.get_running_loop().create_task(
+            self.refill(user_id, themes, personality, max_length)
+        )
+    
+    async def refill(
+        self,
+        user_id: str,
+        themes: Optional[List[str]] = None,
+        personality: str = "friendly",
+        max_length: int = 280
+    ) -> int:
+        """Top the buffer back up to its target size once it falls to the low-water mark"""
+        from src.services.claude_service import get_claude_service
+        
+        loop = asyncio.get_running_loop()
+        pending = await loop.run_in_executor(None, _count_pending, user_id)
+        if pending > settings.content_buffer_low_water:
+            return 0
+        
+        if self._refill_slot is None:
+            self._refill_slot = asyncio.Semaphore(1)
+        
+        added = 0
+        themes = themes or DEFAULT_THEMES
+        async with self._refill_slot:
+            # Bounded number of attempts so a misbehaving model can't spin forever
+            for _ in range(settings.content_buffer_size):
+                if pending + added >= settings.content_buffer_size:
+                    break
+                
+                result = await get_claude_service().generate_content_ideas(
+                    themes=themes,
+                    count=settings.content_buffer_batch_size,
+                    personality=personality,
+                    user_id=user_id,
+                    priority="background"
+                )
+                if not result["success"]:
+                    logger.error(f"Failed to refill content buffer for user {user_id}: {result['error']}")
+                    break
+                
+                drafts = parse_ideas(result["ideas"], result.get("truncated", False))
+                drafts = [draft for draft in drafts if len(draft) <= max_length]
+                drafts = await self._unique(user_id, drafts)
+                drafts = drafts[:settings.content_buffer_size - pending - added]
+                if not drafts:
+                    continue
+                
+                await loop.run_in_executor(
+                    None, _store_drafts, user_id, drafts, ", ".join(themes), personality, max_length
+                )
+                added += len(drafts)
+        
+        if added:
+            logger.info(f"Added {added} drafts to content buffer for user {user_id}")
+        return added
+    
+    async def _unique(self, user_id: str, drafts: List[str]) -> List[str]:
+        """Drop near-duplicates of earlier content and index the rest as drafts"""
+        from src.services.dedup_index import get_content_deduplicator
+        
+        deduplicator = get_content_deduplicator()
+        unique = []
+        for draft in drafts:
+            if await deduplicator.is_duplicate(user_id, draft):
+                continue
+            await deduplicator.record(user_id, draft, "draft")
+            unique.append(draft)
+        return unique
+    
+    async def pending_count(self, user_id: str) -> int:
+        """Number of drafts ready to post for a user"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, _count_pending, user_id)
+
+
+def _claim_draft(user_id: str, personality: str, max_length: int) -> Optional[str]:
+    """Atomically mark the oldest matching pending draft as used and return its content"""
+    db = SessionLocal()
+    try:
+        # Drafts from before a personality or length change would post in the old voice
+        stale = db.query(ContentDraft).filter(
+            ContentDraft.user_id == user_pk(user_id),
+            ContentDraft.status == "pending",
+            or_(
+                ContentDraft.personality.is_(None),
+                ContentDraft.personality != personality,
+                ContentDraft.max_length.is_(None),
+                ContentDraft.max_length != max_length
+            )
+        ).update({ContentDraft.status: "stale"}, synchronize_session=False)
+        db.commit()
+        if stale:
+            logger.info(f"Discarded {stale} drafts generated under earlier content settings for user {user_id}")
+        
+        while True:
+            draft = db.query(ContentDraft.id, ContentDraft.content).filter(
+                ContentDraft.user_id == user_pk(user_id),
+                ContentDraft.status == "pending"
+            ).order_by(ContentDraft.id).first()
+            if draft is None:
+                return None
+            
+            # Guard against another worker claiming the same row
+            claimed = db.query(ContentDraft).filter(
+                ContentDraft.id == draft.id,
+                ContentDraft.status == "pending"
+            ).update(
+                {ContentDraft.status: "used", ContentDraft.used_at: datetime.utcnow()},
+                synchronize_session=False
+            )
+            db.commit()
+            if claimed:
+                return draft.content
+    finally:
+        db.close()
+
+
+def _count_pending(user_id: str) -> int:
+    """Count pending drafts for a user"""
+    db = SessionLocal()
+    try:
+        return db.query(ContentDraft).filter(
+            ContentDraft.user_id == user_pk(user_id),
+            ContentDraft.status == "pending"
+        ).count()
+    finally:
+        db.close()
+
+
+def _store_drafts(user_id: str, drafts: List[str], theme: str, personality: str, max_length: int):
+    """Insert new pending drafts for a user"""
+    db = SessionLocal()
+    try:
+        db.add_all([
+            ContentDraft(
+                user_id=user_pk(user_id),
+                content=draft,
+                theme=theme,
+                personality=personality,
+                max_length=max_length
+            )
+            for draft in drafts
+        ])
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to store drafts: {e}")
+    finally:
+        db.close()
+
+
+# Global content buffer instance
+content_buffer = ContentBuffer()
+
+
+def get_content_buffer() -> ContentBuffer:
+    """Get the shared content buffer"""
+    return content_buffer
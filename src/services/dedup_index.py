@@ -0,0 +1,213 @@
+"""
+SimHash near-duplicate index over posted and drafted content
+"""
+
+import asyncio
+import hashlib
+import re
+import time
+from typing import Optional, Dict, List, Set, Tuple
+import logging
+
+from config.settings import get_settings
+from src.database.models import SessionLocal, ContentFingerprint, user_pk
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+FINGERPRINT_BITS = 64
+SHINGLE_SIZE = 3
+URL_PATTERN = re.compile(r"https?://\S+")
+TOKEN_PATTERN = re.compile(r"[a-z0-9#@']+")
+
+
+def simhash(text: str) -> int:
+    """64-bit SimHash over word shingles of normalized text"""
+    words = TOKEN_PATTERN.findall(URL_PATTERN.sub("", text.lower()))
+    if len(words) >= SHINGLE_SIZE:
+        shingles = [" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)]
+    else:
+        shingles = [" ".join(words)] if words else [""]
+    
+    weights = [0] * FINGERPRINT_BITS
+    for shingle in shingles:
+        value = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(FINGERPRINT_BITS):
+            weights[bit] += 1 if (value >> bit) & 1 else -1
+    
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def to_signed(fingerprint: int) -> int:
+    """Store unsigned 64-bit fingerprints in a signed BIGINT column"""
+    return fingerprint - (1 << 64) if fingerprint >= (1 << 63) else fingerprint
+
+
+def to_unsigned(value: int) -> int:
+    return value + (1 << 64) if value < 0 else value
+
+
+class NearDuplicateIndex:
+    """Finds fingerprints within a Hamming distance using band lookups
+    
+    Splitting the fingerprint into max_distance + 1 bands guarantees that any
+    fingerprint within max_distance bits matches at least one band exactly, so a
+    query only compares against the few entries sharing one of its bands.
+    """
+    
+    def __init__(self, max_distance: int = 3):
+        self.max_distance = max_distance
+        self.band_count = max_distance + 1
+        self.band_width = FINGERPRINT_BITS // self.band_count
+        self._bands: List[Dict[int, List[int]]] = [{} for _ in range(self.band_count)]
+        self._size = 0
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def _band_keys(self, fingerprint: int):
+        mask = (1 << self.band_width) - 1
+        for band in range(self.band_count):
+            yield band, (fingerprint >> (band * self.band_width)) & mask
+    
+    def add(self, fingerprint: int):
+        for band, key in self._band_keys(fingerprint):
+            self._bands[band].setdefault(key, []).append(fingerprint)
+        self._size += 1
+    
+    def find(self, fingerprint: int) -> Optional[int]:
+        """Return a stored fingerprint within max_distance, if any"""
+        for band, key in self._band_keys(fingerprint):
+            for candidate in self._bands[band].get(key, ()):
+                if bin(candidate ^ fingerprint).count("1") <= self.max_distance:
+                    return candidate
+        return None
+
+
+class ContentDeduplicator:
+    """Per-user near-duplicate checks backed by persisted fingerprints
+    
+    Checks run against the in-memory index. Other processes record
+    fingerprints too, so at most every dedup_refresh_seconds a background
+    refresh pulls in rows stored since the highest id already loaded.
+    """
+    
+    def __init__(self, refresh_seconds: Optional[float] = None):
+        self.refresh_seconds = refresh_seconds if refresh_seconds is not None else settings.dedup_refresh_seconds
+        self._indexes: Dict[str, NearDuplicateIndex] = {}
+        self._last_ids: Dict[str, int] = {}
+        self._refreshed_at: Dict[str, float] = {}
+        # Ids this process already indexed when recording, skipped by the next refresh
+        self._own_ids: Dict[str, Set[int]] = {}
+        self._loading: Dict[str, asyncio.Lock] = {}
+        self._refreshes: Dict[str, asyncio.Task] = {}
+    
+    async def _index(self, user_id: str) -> NearDuplicateIndex:
+        """Get a user's index, loading it on first use and refreshing it in the background when stale"""
+        index = self._indexes.get(user_id)
+        if index is None:
+            await self._refresh(user_id)
+            return self._indexes[user_id]
+        
+        if time.monotonic() - self._refreshed_at[user_id] >= self.refresh_seconds:
+            task = self._refreshes.get(user_id)
+            if task is None or task.done():
+                self._refreshes[user_id] = asyncio.get_running_loop().create_task(self._refresh(user_id))
+        return index
+    
+    async def _refresh(self, user_id: str):
+        """Add fingerprints stored since the last one seen"""
+        async with self._loading.setdefault(user_id, asyncio.Lock()):
+            index = self._indexes.get(user_id)
+            first_load = index is None
+            if first_load:
+                index = NearDuplicateIndex(settings.dedup_max_distance)
+            
+            loop = asyncio.get_running_loop()
+            try:
+                rows = await loop.run_in_executor(
+                    None, _load_fingerprints, user_id, self._last_ids.get(user_id, 0)
+                )
+            except Exception as e:
+                if first_load:
+                    raise
+                logger.error(f"Failed to refresh content fingerprints for user {user_id}: {e}")
+                rows = []
+            
+            own_ids = self._own_ids.setdefault(user_id, set())
+            for row_id, fingerprint in rows:
+                if row_id in own_ids:
+                    own_ids.discard(row_id)
+                else:
+                    index.add(fingerprint)
+                self._last_ids[user_id] = row_id
+            self._refreshed_at[user_id] = time.monotonic()
+            
+            if first_load:
+                self._indexes[user_id] = index
+                logger.info(f"Loaded {len(index)} content fingerprints for user {user_id}")
+    
+    async def is_duplicate(self, user_id: str, text: str) -> bool:
+        """Whether text is a near-duplicate of anything posted or drafted"""
+        index = await self._index(user_id)
+        return index.find(simhash(text)) is not None
+    
+    async def record(self, user_id: str, text: str, source: str, tweet_id: Optional[str] = None):
+        """Add content to the index and persist its fingerprint"""
+        fingerprint = simhash(text)
+        index = await self._index(user_id)
+        index.add(fingerprint)
+        
+        # Hold off refreshes until the new row id is marked as already indexed
+        async with self._loading[user_id]:
+            loop = asyncio.get_running_loop()
+            row_id = await loop.run_in_executor(None, _store_fingerprint, user_id, fingerprint, source, tweet_id)
+            if row_id is not None and row_id > self._last_ids.get(user_id, 0):
+                self._own_ids.setdefault(user_id, set()).add(row_id)
+
+
+def _load_fingerprints(user_id: str, after_id: int = 0) -> List[Tuple[int, int]]:
+    """Read a user's stored fingerprints with ids above after_id, oldest first"""
+    db = SessionLocal()
+    try:
+        rows = db.query(ContentFingerprint.id, ContentFingerprint.fingerprint).filter(
+            ContentFingerprint.user_id == user_pk(user_id),
+            ContentFingerprint.id > after_id
+        ).order_by(ContentFingerprint.id)
+        return [(row_id, to_unsigned(fingerprint)) for row_id, fingerprint in rows]
+    finally:
+        db.close()
+
+
+def _store_fingerprint(user_id: str, fingerprint: int, source: str, tweet_id: Optional[str]) -> Optional[int]:
+    """Persist one fingerprint, returning its row id"""
+    db = SessionLocal()
+    try:
+        row = ContentFingerprint(
+            user_id=user_pk(user_id),
+            fingerprint=to_signed(fingerprint),
+            source=source,
+            tweet_id=tweet_id
+        )
+        db.add(row)
+        db.commit()
+        return row.id
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to store content fingerprint: {e}")
+        return None
+    finally:
+        db.close()
+
+
+# Global deduplicator instance
+content_deduplicator = ContentDeduplicator()
+
+
+def get_content_deduplicator() -> ContentDeduplicator:
+    """Get the shared content deduplicator"""
+    return content_deduplicator
@@ -0,0 +1,156 @@
+"""
+Multi-tenant dispatcher: one timer heap and worker pool for every user's jobs
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, List, Callable
+import logging
+
+from config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class TenantDispatcher:
+    """Tracks the next due time of every user's recurring job in a single heap
+    
+    One timer task sleeps until the earliest due entry, then hands it to a
+    bounded queue drained by a fixed pool of workers. A job that is still
+    running when it comes due again is skipped for that round.
+    """
+    
+    def __init__(self, workers: Optional[int] = None, queue_size: Optional[int] = None):
+        self.worker_count = workers or settings.dispatcher_workers
+        self.queue_size = queue_size or settings.dispatcher_queue_size
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._heap: List[tuple] = []
+        self._seq = itertools.count()
+        self._in_flight: set = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+    
+    def schedule(
+        self,
+        job_id: str,
+        func: Callable,
+        interval_seconds: float,
+        args: Optional[list] = None,
+        first_run_delay: float = 0
+    ):
+        """Add or replace a recurring job"""
+        entry = {
+            "func": func,
+            "args": args or [],
+            "interval": interval_seconds,
+            "due": time.time() + first_run_delay,
+            "version": next(self._seq)
+        }
+        self._entries[job_id] = entry
+        heapq.heappush(self._heap, (entry["due"], entry["version"], job_id))
+        self._wake()
+    
+    def unschedule(self, job_id: str) -> bool:
+        """Remove a job; its stale heap entries are skipped when they surface"""
+        return self._entries.pop(job_id, None) is not None
+    
+    def clear(self):
+        """Remove every job; stale heap entries are skipped when they surface"""
+        self._entries.clear()
+    
+    def has_job(self, job_id: str) -> bool:
+        return job_id in self._entries
+    
+    def get_jobs(self) -> list:
+        """Scheduled jobs in the same shape as SchedulerService.get_jobs"""
+        return [
+            {
+                "id": job_id,
+                "name": entry["func"].__name__,
+                "next_run": datetime.fromtimestamp(entry["due"]).isoformat(),
+                "trigger": f"dispatcher[interval={timedelta(seconds=entry['interval'])}]"
+            }
+            for job_id, entry in sorted(self._entries.items(), key=lambda item: item[1]["due"])
+        ]
+    
+    async def start(self):
+        """Start the timer task and worker pool"""
+        if self._tasks:
+            return
+        
+        self._wakeup = asyncio.Event()
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._timer())]
+        self._tasks += [loop.create_task(self._worker()) for _ in range(self.worker_count)]
+        logger.info(f"Dispatcher started with {self.worker_count} workers")
+    
+    async def stop(self):
+        """Cancel the timer and workers; in-flight jobs are interrupted"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._in_flight.clear()
+        logger.info("Dispatcher stopped")
+    
+    def _wake(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+    
+    async def _timer(self):
+        while True:
+            self._wakeup.clear()
+            
+            # Discard heap entries for removed or rescheduled jobs
+            while self._heap:
+                due, version, job_id = self._heap[0]
+                entry = self._entries.get(job_id)
+                if entry is not None and entry["version"] == version:
+                    break
+                heapq.heappop(self._heap)
+            
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+            
+            delay = self._heap[0][0] - time.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            
+            _, _, job_id = heapq.heappop(self._heap)
+            entry = self._entries[job_id]
+            
+            # Next run keeps a fixed cadence but never lands in the past
+            entry["due"] = max(entry["due"] + entry["interval"], time.time())
+            entry["version"] = next(self._seq)
+            heapq.heappush(self._heap, (entry["due"], entry["version"], job_id))
+            
+            if job_id in self._in_flight:
+                logger.warning(f"Skipping {job_id}: previous run still in progress")
+                continue
+            
+            self._in_flight.add(job_id)
+            # Blocks when workers fall behind, applying backpressure to the timer
+            await self._queue.put((job_id, entry["func"], list(entry["args"])))
+    
+    async def _worker(self):
+        while True:
+            job_id, func, args = await self._queue.get()
+            try:
+                await func(*args)
+                logger.info(f"Job {job_id} executed successfully")
+            except Exception as e:
+                logger.error(f"Job {job_id} failed: {e}")
+            finally:
+                self._in_flight.discard(job_id)
+                self._queue.task_done()
@@ -0,0 +1,198 @@
+"""
+LRU/TTL cache for generated tweet content
+"""
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
+import logging
+
+from config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def make_cache_key(prompt: str, theme: Optional[str], personality: str, max_length: int) -> str:
+    """Key generation parameters so trivially different requests share an entry"""
+    normalized = {
+        "prompt": " ".join(prompt.lower().split()),
+        "theme": " ".join((theme or "").lower().split()),
+        "personality": " ".join((personality or "").lower().split()),
+        "max_length": max_length
+    }
+    return hashlib.sha256(json.dumps(normalized, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class SQLiteCacheTier:
+    """Persistent second tier so cached generations survive restarts
+    
+    Calls block on disk I/O; GenerationCache runs them in the default executor.
+    """
+    
+    # Expiry and cap enforcement run once per this many writes
+    TRIM_EVERY = 100
+    
+    def __init__(self, path: str, max_entries: int):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS generation_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_generation_cache_expires_at ON generation_cache (expires_at)"
+        )
+        self._conn.commit()
+    
+    def get(self, key: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Return the cached value and its expiry time, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM generation_cache WHERE key = ? AND expires_at > ?",
+                (key, time.time())
+            ).fetchone()
+        return (json.loads(row[0]), row[1]) if row else None
+    
+    def set(self, key: str, value: Dict[str, Any], expires_at: float):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO generation_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), expires_at)
+            )
+            self._writes += 1
+            if self._writes % self.TRIM_EVERY == 0:
+                self._trim()
+            self._conn.commit()
+    
+    def _trim(self):
+        """Expire stale rows, then drop the soonest-to-expire beyond the cap"""
+        self._conn.execute("DELETE FROM generation_cache WHERE expires_at <= ?", (time.time(),))
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM generation_cache").fetchone()
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM generation_cache WHERE key IN ("
+                "SELECT key FROM generation_cache ORDER BY expires_at LIMIT ?)",
+                (count - self.max_entries,)
+            )
+    
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM generation_cache")
+            self._conn.commit()
+
+
+class GenerationCache:
+    """In-memory LRU with TTL eviction, optionally backed by SQLite"""
+    
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[int] = None,
+        sqlite_path: Optional[str] = None
+    ):
+        self.max_entries = max_entries or settings.generation_cache_max_entries
+        self.ttl_seconds = ttl_seconds or settings.generation_cache_ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._persistent: Optional[SQLiteCacheTier] = None
+        
+        sqlite_path = sqlite_path or settings.generation_cache_sqlite_path
+        if sqlite_path:
+            try:
+                self._persistent = SQLiteCacheTier(sqlite_path, settings.generation_cache_sqlite_max_entries)
+            except sqlite3.Error as e:
+                logger.error(f"Failed to open generation cache database: {e}")
+        
+        self.hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a cached result, promoting persistent hits into memory"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, expires_at = entry
+            if expires_at > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+        
+        if self._persistent is not None:
+            loop = asyncio.get_running_loop()
+            try:
+                stored = await loop.run_in_executor(None, self._persistent.get, key)
+            except sqlite3.Error as e:
+                logger.error(f"Generation cache read failed: {e}")
+                stored = None
+            if stored is not None:
+                # Keep the stored expiry so promotion doesn't extend the entry's life
+                value, expires_at = stored
+                self._remember(key, value, expires_at)
+                self.persistent_hits += 1
+                return value
+        
+        self.misses += 1
+        return None
+    
+    async def set(self, key: str, value: Dict[str, Any]):
+        """Store a result in every tier"""
+        expires_at = time.time() + self.ttl_seconds
+        self._remember(key, value, expires_at)
+        
+        if self._persistent is not None:
+            loop = asyncio.get_running_loop()
+            try:
+                await loop.run_in_executor(None, self._persistent.set, key, value, expires_at)
+            except sqlite3.Error as e:
+                logger.error(f"Generation cache write failed: {e}")
+    
+    async def clear(self):
+        """Drop every cached entry"""
+        self._entries.clear()
+        if self._persistent is not None:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._persistent.clear)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for sizing the cache"""
+        lookups = self.hits + self.persistent_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "persistent": self._persistent is not None,
+            "hits": self.hits,
+            "persistent_hits": self.persistent_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round((self.hits + self.persistent_hits) / lookups, 4) if lookups else 0.0
+        }
+    
+    def _remember(self, key: str, value: Dict[str, Any], expires_at: float):
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+
+# Global generation cache, created on first use
+generation_cache: Optional[GenerationCache] = None
+
+
+def get_generation_cache() -> GenerationCache:
+    """Get the shared generation cache"""
+    global generation_cache
+    if generation_cache is None:
+        generation_cache = GenerationCache()
+    return generation_cache
@@ -0,0 +1,165 @@
+"""
+Database lease based leader election for the scheduler
+"""
+
+import asyncio
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional, Callable, Awaitable
+from sqlalchemy import update, or_
+from sqlalchemy.exc import IntegrityError
+import logging
+
+from config.settings import get_settings
+from src.database.models import SessionLocal, SchedulerLease
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def default_holder_id() -> str:
+    """Identify this process uniquely across hosts and restarts"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class LeaderElector:
+    """Holds a named lease row while this process is the leader
+    
+    Every replica tries to take or renew the lease on a fixed interval. The
+    lease is taken with a single conditional UPDATE (or an INSERT for the first
+    holder), so the database decides the race. If the leader dies, its lease
+    expires after the TTL and the next replica to try takes over.
+    """
+    
+    def __init__(
+        self,
+        name: str = "scheduler",
+        ttl_seconds: Optional[int] = None,
+        renew_seconds: Optional[int] = None,
+        holder: Optional[str] = None
+    ):
+        self.name = name
+        self.ttl = ttl_seconds or settings.scheduler_lease_ttl_seconds
+        self.renew_interval = renew_seconds or settings.scheduler_lease_renew_seconds
+        self.holder = holder or default_holder_id()
+        self.is_leader = False
+        self._valid_until: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+        self._on_elected: Optional[Callable[[], Awaitable[None]]] = None
+        self._on_demoted: Optional[Callable[[], Awaitable[None]]] = None
+        self._on_renewed: Optional[Callable[[], None]] = None
+    
+    async def start(
+        self,
+        on_elected: Callable[[], Awaitable[None]],
+        on_demoted: Callable[[], Awaitable[None]],
+        on_renewed: Optional[Callable[[], None]] = None
+    ):
+        """Start competing for the lease"""
+        if self._task is not None:
+            return
+        
+        self._on_elected = on_elected
+        self._on_demoted = on_demoted
+        self._on_renewed = on_renewed
+        
+        # Run the first round inline so a sole replica leads immediately
+        await self._tick()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        logger.info(f"Leader election started as {self.holder}")
+    
+    async def stop(self):
+        """Stop competing and hand the lease back so a follower takes over at once"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        
+        if self.is_leader:
+            await self._set_leader(False)
+            loop = asyncio.get_running_loop()
+            try:
+                await loop.run_in_executor(None, self._release)
+            except Exception as e:
+                logger.error(f"Error releasing {self.name} lease: {e}")
+    
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.renew_interval)
+            await self._tick()
+    
+    async def _tick(self):
+        loop = asyncio.get_running_loop()
+        try:
+            acquired = await loop.run_in_executor(None, self._try_acquire)
+        except Exception as e:
+            logger.error(f"Error renewing {self.name} lease: {e}")
+            # Can't reach the database, keep leading only while our last lease is still valid
+            acquired = self.is_leader and datetime.utcnow() < self._valid_until
+        
+        if acquired and self.is_leader and self._on_renewed:
+            self._on_renewed()
+        if acquired != self.is_leader:
+            await self._set_leader(acquired)
+    
+    async def _set_leader(self, leader: bool):
+        self.is_leader = leader
+        if leader:
+            logger.info(f"{self.holder} became {self.name} leader")
+            await self._on_elected()
+        else:
+            logger.warning(f"{self.holder} is no longer {self.name} leader")
+            await self._on_demoted()
+    
+    def _try_acquire(self) -> bool:
+        """Take or renew the lease if it is ours or has expired"""
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=self.ttl)
+        
+        db = SessionLocal()
+        try:
+            result = db.execute(
+                update(SchedulerLease)
+                .where(SchedulerLease.name == self.name)
+                .where(or_(SchedulerLease.holder == self.holder, SchedulerLease.expires_at < now))
+                .values(holder=self.holder, renewed_at=now, expires_at=expires_at)
+            )
+            db.commit()
+            
+            if result.rowcount == 0:
+                if db.get(SchedulerLease, self.name) is not None:
+                    return False  # Held by a live leader
+                
+                db.add(SchedulerLease(
+                    name=self.name,
+                    holder=self.holder,
+                    acquired_at=now,
+                    renewed_at=now,
+                    expires_at=expires_at
+                ))
+                try:
+                    db.commit()
+                except IntegrityError:
+                    db.rollback()
+                    return False  # Another replica inserted first
+            
+            # Leave a margin so we step down before anyone else can take over
+            self._valid_until = expires_at - timedelta(seconds=self.renew_interval)
+            return True
+        finally:
+            db.close()
+    
+    def _release(self):
+        db = SessionLocal()
+        try:
+            db.execute(
+                update(SchedulerLease)
+                .where(SchedulerLease.name == self.name)
+                .where(SchedulerLease.holder == self.holder)
+                .values(expires_at=datetime.utcnow())
+            )
+            db.commit()
+        finally:
+            db.close()
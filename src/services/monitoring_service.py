@@ -0,0 +1,303 @@
+"""
+Concurrent monitoring engine for target accounts
+"""
+
+import asyncio
+import time
+from typing import Optional, Dict, Any, List
+import logging
+
+from config.settings import get_settings
+from src.services.activity_recorder import get_activity_recorder
+from src.services.dedup_index import get_content_deduplicator
+from src.services.prefilter import STAGES, get_prefilter
+from src.services.target_accounts import (
+    ensure_target_accounts,
+    load_watermarks,
+    normalize_username,
+    store_watermark
+)
+from src.services.user_resolver import get_user_resolver
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Stats from the most recent monitoring cycle, keyed by user id
+last_cycle_stats: Dict[str, Dict[str, Any]] = {}
+
+
+class ConcurrencyGate:
+    """Semaphore that records its peak number of concurrent holders"""
+    
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = limit
+        self.active = 0
+        self.peak = 0
+        self._semaphore = asyncio.Semaphore(limit)
+    
+    async def __aenter__(self):
+        await self._semaphore.acquire()
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        self.active -= 1
+        self._semaphore.release()
+
+
+class MonitoringEngine:
+    """Monitors target accounts in parallel under per-service concurrency limits"""
+    
+    def __init__(self, twitter_service, claude_service):
+        self.twitter_service = twitter_service
+        self.claude_service = claude_service
+        self.accounts_gate = ConcurrencyGate("accounts", settings.monitoring_account_concurrency)
+        self.twitter_gate = ConcurrencyGate("twitter_reads", settings.monitoring_twitter_read_concurrency)
+        self.claude_gate = ConcurrencyGate("claude", settings.monitoring_claude_concurrency)
+        self.write_gate = ConcurrencyGate("writes", settings.monitoring_write_concurrency)
+        self.claude_requests = 0
+    
+    async def run_cycle(
+        self,
+        target_accounts: list,
+        user_id: str,
+        themes: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Run one monitoring cycle over all enabled target accounts"""
+        started = time.monotonic()
+        loop = asyncio.get_running_loop()
+        
+        usernames = [account.get("username") for account in target_accounts if account.get("username")]
+        await loop.run_in_executor(None, ensure_target_accounts, user_id, usernames)
+        
+        # Resolve every handle up front from cache, database or bulk lookups
+        async with self.twitter_gate:
+            user_ids = await get_user_resolver().resolve(usernames, self.twitter_service)
+        watermarks = await loop.run_in_executor(None, load_watermarks, user_id, usernames)
+        
+        fetched = await asyncio.gather(*(
+            self._fetch_account(
+                username,
+                user_ids.get(normalize_username(username)),
+                watermarks.get(normalize_username(username)),
+                user_id
+            )
+            for username in usernames
+        ))
+        
+        # Drop clearly irrelevant tweets locally before they cost an LLM call
+        prefilter_dropped = {stage: 0 for stage in STAGES}
+        if settings.prefilter_enabled:
+            prefilter = get_prefilter()
+            for account in fetched:
+                filtered = prefilter.filter(account["tweets"], themes)
+                account["candidates"] = filtered["kept"]
+                for stage, count in filtered["dropped"].items():
+                    prefilter_dropped[stage] += count
+        else:
+            for account in fetched:
+                account["candidates"] = account["tweets"]
+        
+        # Triage the remaining tweets from every account in as few Claude requests as possible
+        candidates = [
+            {"id": str(tweet.id), "author": account["username"], "text": tweet.text}
+            for account in fetched
+            for tweet in account["candidates"]
+        ]
+        decisions = await self._triage(candidates, user_id)
+        
+        replies = await asyncio.gather(*(
+            self._reply_to_first(account, decisions, user_id) for account in fetched
+        ))
+        
+        # Only now is it safe to move past these tweets
+        await asyncio.gather(*(
+            self._advance_watermark(account, decisions, user_id)
+            for account in fetched
+            if account["success"]
+        ))
+        
+        stats = {
+            "accounts": len(usernames),
+            "accounts_failed": sum(1 for account in fetched if not account["success"]),
+            "tweets_fetched": sum(len(account["tweets"]) for account in fetched),
+            "prefilter_dropped": prefilter_dropped,
+            "tweets_analyzed": len(decisions),
+            "claude_requests": self.claude_requests,
+            "replies_posted": sum(1 for replied in replies if replied),
+            "duration_seconds": round(time.monotonic() - started, 3),
+            "peak_concurrency": {
+                gate.name: gate.peak
+                for gate in (self.accounts_gate, self.twitter_gate, self.claude_gate, self.write_gate)
+            },
+            "finished_at": time.time()
+        }
+        last_cycle_stats[user_id] = stats
+        
+        logger.info(
+            f"Monitoring cycle for user {user_id} finished in {stats['duration_seconds']}s: "
+            f"{stats['accounts']} accounts, {stats['tweets_fetched']} tweets fetched, "
+            f"{stats['tweets_analyzed']} analyzed in "
+            f"{stats['claude_requests']} Claude requests, {stats['replies_posted']} replies, "
+            f"peak concurrency {stats['peak_concurrency']}"
+        )
+        return stats
+    
+    async def _fetch_account(
+        self,
+        username: str,
+        target_user_id: Optional[str],
+        since_id: Optional[str],
+        user_id: str
+    ) -> Dict[str, Any]:
+        """Fetch one account's new tweets; the watermark moves only after they are handled"""
+        account = {"username": username, "success": False, "tweets": [], "candidates": [], "newest_id": None}
+        
+        async with self.accounts_gate:
+            try:
+                if not target_user_id:
+                    logger.warning(f"Could not resolve user id for {username}")
+                    return account
+                
+                tweets_result = await self._fetch_new_tweets(target_user_id, since_id)
+                if not tweets_result["success"]:
+                    return account
+                
+                account["success"] = True
+                account["tweets"] = tweets_result["data"]
+                account["newest_id"] = tweets_result["newest_id"]
+                
+            except Exception as e:
+                logger.error(f"Error monitoring account {username}: {e}")
+                await get_activity_recorder().record(
+                    "error",
+                    user_id=user_id,
+                    description="Account monitoring failed",
+                    success=False,
+                    target_username=username,
+                    error_message=str(e)
+                )
+        
+        return account
+    
+    async def _advance_watermark(
+        self,
+        account: Dict[str, Any],
+        decisions: Dict[str, Dict[str, Any]],
+        user_id: str
+    ):
+        """Store the account's newest tweet id once every candidate was triaged and replies recorded"""
+        triaged = all(
+            decisions.get(str(tweet.id), {}).get("success")
+            for tweet in account["candidates"]
+        )
+        if not triaged:
+            logger.warning(f"Triage incomplete for {account['username']}, keeping the watermark to retry next cycle")
+        
+        async with self.write_gate:
+            await asyncio.get_running_loop().run_in_executor(
+                None,
+                store_watermark,
+                user_id,
+                account["username"],
+                account["newest_id"] if triaged else None
+            )
+    
+    async def _fetch_new_tweets(self, target_user_id: str, since_id: Optional[str]) -> Dict[str, Any]:
+        """Fetch tweets newer than the account's high-water mark"""
+        async with self.twitter_gate:
+            if since_id:
+                return await self.twitter_service.get_user_tweets_since(
+                    target_user_id,
+                    since_id=since_id,
+                    max_pages=settings.monitoring_max_pages
+                )
+            
+            tweets_result = await self.twitter_service.get_user_tweets(
+                target_user_id,
+                max_results=settings.monitoring_bootstrap_tweets
+            )
+            if tweets_result["success"]:
+                tweets_result["newest_id"] = tweets_result["meta"].get("newest_id")
+            return tweets_result
+    
+    async def _triage(self, candidates: List[Dict[str, Any]], user_id: str) -> Dict[str, Dict[str, Any]]:
+        """Run batched reply triage with each batch under the Claude limit"""
+        async def triage_batch(batch):
+            async with self.claude_gate:
+                result = await self.claude_service.analyze_tweets_for_reply(
+                    batch,
+                    user_id=user_id,
+                    priority="scheduled"
+                )
+                # Includes the follow-up calls for tweets the model skipped
+                self.claude_requests += result.get("requests", 0)
+                return result
+        
+        batch_results = await asyncio.gather(*(
+            triage_batch(batch) for batch in self.claude_service.plan_triage_batches(candidates)
+        ))
+        
+        decisions = {}
+        for batch_result in batch_results:
+            if batch_result["success"]:
+                decisions.update(batch_result["results"])
+            else:
+                logger.error(f"Failed to triage tweets: {batch_result['error']}")
+        return decisions
+    
+    async def _reply_to_first(
+        self,
+        account: Dict[str, Any],
+        decisions: Dict[str, Dict[str, Any]],
+        user_id: str
+    ) -> bool:
+        """Reply to the first tweet triage approved; at most one reply per account per cycle"""
+        username = account["username"]
+        deduplicator = get_content_deduplicator()
+        
+        for tweet in account["candidates"]:
+            analysis = decisions.get(str(tweet.id))
+            if not analysis or not analysis["success"] or not analysis["should_reply"]:
+                continue
+            
+            if await deduplicator.is_duplicate(user_id, analysis["reply_text"]):
+                logger.info(f"Skipping near-duplicate reply to {username}")
+                continue
+            
+            async with self.write_gate:
+                reply_result = await self.twitter_service.post_tweet(
+                    text=analysis["reply_text"],
+                    reply_to_id=tweet.id
+                )
+            
+            await get_activity_recorder().record(
+                "reply",
+                user_id=user_id,
+                description=analysis["reason"],
+                success=reply_result["success"],
+                tweet_id=reply_result.get("id"),
+                tweet_text=analysis["reply_text"],
+                target_username=username,
+                error_message=reply_result.get("error"),
+                extra_data={"in_reply_to": str(tweet.id)}
+            )
+            
+            if reply_result["success"]:
+                logger.info(f"Posted reply to {username}: {analysis['reply_text']}")
+                await deduplicator.record(user_id, analysis["reply_text"], "reply", reply_result["id"])
+                return True
+            
+            logger.error(f"Failed to post reply: {reply_result['error']}")
+            return False
+        
+        return False
+
+
+def get_last_cycle_stats(user_id: Optional[str] = None) -> Dict[str, Any]:
+    """Get stats from the latest monitoring cycle for one user or all users"""
+    if user_id is not None:
+        return last_cycle_stats.get(user_id, {})
+    return dict(last_cycle_stats)
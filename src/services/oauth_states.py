@@ -0,0 +1,232 @@
+"""
+Expiring stores for pending OAuth login state and PKCE verifiers
+"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+import logging
+
+from config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class OAuthStateStore(ABC):
+    """Base class for login state stores with TTL expiry and a size cap
+    
+    Entries are consumed at most once by pop(). Abandoned logins expire after
+    the TTL, and a background sweeper removes them even if nobody looks them up.
+    """
+    
+    def __init__(self, ttl_seconds: Optional[int] = None, max_entries: Optional[int] = None):
+        self.ttl_seconds = ttl_seconds or settings.oauth_state_ttl_seconds
+        self.max_entries = max_entries or settings.oauth_state_max_entries
+        self.expired = 0
+        self.evicted = 0
+        self._sweeper: Optional[asyncio.Task] = None
+    
+    @abstractmethod
+    async def put(self, state: str, data: Dict[str, Any]):
+        """Store data for a new login state"""
+    
+    @abstractmethod
+    async def pop(self, state: str) -> Optional[Dict[str, Any]]:
+        """Consume a state, returning None if it is unknown or expired"""
+    
+    @abstractmethod
+    def sweep(self) -> int:
+        """Remove expired entries, returning how many were removed"""
+    
+    @abstractmethod
+    def size(self) -> int:
+        """Number of stored entries, live or not yet swept"""
+    
+    def start(self, interval_seconds: Optional[float] = None):
+        """Start the periodic sweeper"""
+        if self._sweeper is None or self._sweeper.done():
+            interval = interval_seconds or settings.oauth_state_sweep_interval_seconds
+            self._sweeper = asyncio.get_running_loop().create_task(self._sweep_forever(interval))
+    
+    async def stop(self):
+        """Stop the sweeper"""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            await asyncio.gather(self._sweeper, return_exceptions=True)
+            self._sweeper = None
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": self.size(),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "expired": self.expired,
+            "evicted": self.evicted
+        }
+    
+    async def _sweep_forever(self, interval: float):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                removed = await loop.run_in_executor(None, self.sweep)
+                if removed:
+                    logger.info(f"Swept {removed} expired OAuth states")
+            except Exception as e:
+                logger.error(f"OAuth state sweep failed: {e}")
+
+
+class MemoryStateStore(OAuthStateStore):
+    """Per-process store; insertion order is expiry order because the TTL is fixed"""
+    
+    def __init__(self, ttl_seconds: Optional[int] = None, max_entries: Optional[int] = None):
+        super().__init__(ttl_seconds, max_entries)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    async def put(self, state: str, data: Dict[str, Any]):
+        with self._lock:
+            self._entries[state] = (data, time.time() + self.ttl_seconds)
+            # Over the cap, the oldest pending logins go first
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evicted += 1
+    
+    async def pop(self, state: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.pop(state, None)
+        if entry is None:
+            return None
+        data, expires_at = entry
+        if expires_at <= time.time():
+            self.expired += 1
+            return None
+        return data
+    
+    def sweep(self) -> int:
+        now = time.time()
+        removed = 0
+        with self._lock:
+            # Oldest first, so stop at the first entry that is still live
+            while self._entries:
+                state, (_, expires_at) = next(iter(self._entries.items()))
+                if expires_at > now:
+                    break
+                del self._entries[state]
+                removed += 1
+        self.expired += removed
+        return removed
+    
+    def size(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteStateStore(OAuthStateStore):
+    """Store shared by every worker process on the host through one SQLite file
+    
+    Reads and writes block on disk I/O, so put() and pop() run them in the
+    default executor.
+    """
+    
+    # Expired rows are purged and the cap enforced once per this many puts
+    TRIM_EVERY = 100
+    
+    def __init__(self, path: str, ttl_seconds: Optional[int] = None, max_entries: Optional[int] = None):
+        super().__init__(ttl_seconds, max_entries)
+        self._lock = threading.Lock()
+        self._puts = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=settings.sqlite_busy_timeout_ms / 1000)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS oauth_states ("
+            "state TEXT PRIMARY KEY, data TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_oauth_states_expires_at ON oauth_states (expires_at)")
+        self._conn.commit()
+    
+    async def put(self, state: str, data: Dict[str, Any]):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._put, state, data)
+    
+    async def pop(self, state: str) -> Optional[Dict[str, Any]]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._pop, state)
+    
+    def _put(self, state: str, data: Dict[str, Any]):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO oauth_states (state, data, expires_at) VALUES (?, ?, ?)",
+                (state, json.dumps(data), time.time() + self.ttl_seconds)
+            )
+            self._puts += 1
+            if self._puts % self.TRIM_EVERY == 0:
+                self._trim()
+            self._conn.commit()
+    
+    def _trim(self):
+        """Purge expired rows by index range, then drop the soonest-to-expire beyond the cap"""
+        self.expired += self._conn.execute(
+            "DELETE FROM oauth_states WHERE expires_at < ?", (time.time(),)
+        ).rowcount
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM oauth_states").fetchone()
+        if count > self.max_entries:
+            self.evicted += self._conn.execute(
+                "DELETE FROM oauth_states WHERE state IN ("
+                "SELECT state FROM oauth_states ORDER BY expires_at LIMIT ?)",
+                (count - self.max_entries,)
+            ).rowcount
+    
+    def _pop(self, state: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, expires_at FROM oauth_states WHERE state = ?", (state,)
+            ).fetchone()
+            # Deleting decides which process consumes the state if two race
+            deleted = self._conn.execute("DELETE FROM oauth_states WHERE state = ?", (state,)).rowcount
+            self._conn.commit()
+        
+        if row is None or deleted == 0:
+            return None
+        data, expires_at = row
+        if expires_at <= time.time():
+            self.expired += 1
+            return None
+        return json.loads(data)
+    
+    def sweep(self) -> int:
+        with self._lock:
+            removed = self._conn.execute(
+                "DELETE FROM oauth_states WHERE expires_at < ?", (time.time(),)
+            ).rowcount
+            self._conn.commit()
+        self.expired += removed
+        return removed
+    
+    def size(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM oauth_states").fetchone()[0]
+
+
+def create_state_store() -> OAuthStateStore:
+    """Build the configured store, falling back to memory if SQLite can't be opened"""
+    if settings.oauth_state_backend == "sqlite":
+        try:
+            return SQLiteStateStore(settings.oauth_state_sqlite_path)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to open OAuth state database, using memory store: {e}")
+    return MemoryStateStore()
+
+
+# Global OAuth state store instance
+oauth_state_store = create_state_store()
+
+
+def get_oauth_state_store() -> OAuthStateStore:
+    """Get the OAuth state store instance"""
+    return oauth_state_store
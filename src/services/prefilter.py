@@ -0,0 +1,154 @@
+"""
+Local pre-filter that keeps clearly irrelevant tweets away from Claude
+"""
+
+import importlib
+import re
+from abc import ABC, abstractmethod
+from typing import Optional, Dict, Any, List
+import logging
+
+from config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+URL_PATTERN = re.compile(r"https?://\S+")
+MENTION_PATTERN = re.compile(r"@\w+")
+WORD_PATTERN = re.compile(r"[A-Za-z0-9#]+")
+
+# Words that carry no topic on their own and would only dilute a theme's keywords
+STOPWORDS = frozenset("""
+a about after all also an and any are as at be been but by can could did do does for from had has have
+how if in into is it its just more most my new no not of on or our out over so some than that the their
+them then there these they this to up us was we were what when which who will with you your
+""".split())
+
+# Stages in the order they run; each records how many tweets it dropped
+STAGES = ["retweet", "reply", "language", "length", "relevance"]
+
+
+def _normalize_word(word: str) -> str:
+    """Lowercase, drop a hashtag and a plural s so "#AI", "ai" and "AIs" match"""
+    word = word.lstrip("#")
+    if len(word) > 2 and word.endswith("s") and word[:-1].isupper():
+        return word[:-1].lower()
+    word = word.lower()
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        word = word[:-1]
+    return word
+
+
+def theme_keywords(theme: str) -> set:
+    """Topic words of a theme: no stopwords, and no short words unless they are acronyms like AI"""
+    keywords = set()
+    for word in WORD_PATTERN.findall(theme):
+        bare = word.lstrip("#")
+        if bare.lower() in STOPWORDS:
+            continue
+        if len(bare) > 2 or (len(bare) == 2 and bare.isupper()):
+            keywords.add(_normalize_word(bare))
+    return keywords
+
+
+class RelevanceScorer(ABC):
+    """Base class for scorers that rate a batch of tweet texts against themes"""
+    
+    @abstractmethod
+    def score(self, texts: List[str], themes: List[str]) -> List[float]:
+        """Return one relevance score in [0, 1] per text"""
+
+
+class KeywordRelevanceScorer(RelevanceScorer):
+    """Scores a tweet by the best fraction of any theme's keywords it mentions"""
+    
+    def score(self, texts: List[str], themes: List[str]) -> List[float]:
+        keyword_sets = [keywords for keywords in (theme_keywords(theme) for theme in themes) if keywords]
+        if not keyword_sets:
+            return [1.0] * len(texts)
+        
+        scores = []
+        for text in texts:
+            words = {_normalize_word(word) for word in WORD_PATTERN.findall(text)}
+            scores.append(max(len(keywords & words) / len(keywords) for keywords in keyword_sets))
+        return scores
+
+
+def load_scorer(path: Optional[str]) -> RelevanceScorer:
+    """Instantiate a scorer from a "module:ClassName" path, defaulting to keywords"""
+    if not path:
+        return KeywordRelevanceScorer()
+    
+    module_name, _, class_name = path.partition(":")
+    scorer_class = getattr(importlib.import_module(module_name), class_name)
+    return scorer_class()
+
+
+class TweetPreFilter:
+    """Cheap feature checks and a relevance score applied before LLM triage"""
+    
+    def __init__(self, scorer: Optional[RelevanceScorer] = None):
+        self.scorer = scorer or load_scorer(settings.prefilter_scorer)
+        self.languages = {
+            lang.strip() for lang in settings.prefilter_languages.split(",") if lang.strip()
+        }
+        self.min_chars = settings.prefilter_min_chars
+        self.threshold = settings.prefilter_relevance_threshold
+    
+    def filter(self, tweets: list, themes: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Split tweets into candidates for the LLM and per-stage drop counts"""
+        dropped = {stage: 0 for stage in STAGES}
+        survivors = []
+        
+        for tweet in tweets:
+            stage = self._rejecting_stage(tweet)
+            if stage:
+                dropped[stage] += 1
+            else:
+                survivors.append(tweet)
+        
+        kept = survivors
+        if survivors and themes:
+            scores = self.scorer.score([tweet.text for tweet in survivors], themes)
+            kept = [tweet for tweet, score in zip(survivors, scores) if score >= self.threshold]
+            dropped["relevance"] = len(survivors) - len(kept)
+        
+        return {
+            "kept": kept,
+            "dropped": dropped
+        }
+    
+    def _rejecting_stage(self, tweet) -> Optional[str]:
+        """Return the first feature stage that rejects the tweet, if any"""
+        text = tweet.text or ""
+        referenced = getattr(tweet, "referenced_tweets", None) or []
+        
+        if text.startswith("RT @") or any(ref.type == "retweeted" for ref in referenced):
+            return "retweet"
+        
+        # Replies within someone else's thread; self-replies continue the author's own thread
+        reply_to = getattr(tweet, "in_reply_to_user_id", None)
+        if reply_to and str(reply_to) != str(getattr(tweet, "author_id", None)):
+            return "reply"
+        
+        lang = getattr(tweet, "lang", None)
+        if self.languages and lang and lang not in self.languages and lang not in ("und", "zxx"):
+            return "language"
+        
+        body = MENTION_PATTERN.sub("", URL_PATTERN.sub("", text)).strip()
+        if len(body) < self.min_chars:
+            return "length"
+        
+        return None
+
+
+# Global pre-filter instance, created on first use
+prefilter: Optional[TweetPreFilter] = None
+
+
+def get_prefilter() -> TweetPreFilter:
+    """Get the shared tweet pre-filter"""
+    global prefilter
+    if prefilter is None:
+        prefilter = TweetPreFilter()
+    return prefilter
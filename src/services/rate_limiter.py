@@ -0,0 +1,182 @@
+"""
+Token-bucket governor for Twitter API rate limits
+"""
+
+import aiohttp
+import asyncio
+import contextvars
+import time
+from typing import Optional, Dict, Any, List, Tuple
+import logging
+
+from config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Known per-user limits as (requests, window seconds), keyed by client method
+KNOWN_LIMITS: Dict[str, Tuple[int, int]] = {
+    "create_tweet": (200, 900),
+    "get_users_tweets": (900, 900),
+    "get_user": (900, 900),
+    "get_users": (900, 900),
+    "get_me": (75, 900),
+    "like": (50, 900),
+    "follow_user": (50, 900),
+}
+DEFAULT_LIMIT = (300, 900)
+
+POLICIES = ("wait", "queue", "fail_fast")
+
+# (credential key, endpoint) of the request currently in flight in this task
+current_endpoint: contextvars.ContextVar = contextvars.ContextVar("twitter_endpoint", default=None)
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a request would exceed its endpoint's rate limit"""
+    
+    def __init__(self, endpoint: str, retry_after: float):
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+        super().__init__(f"Rate limit for {endpoint} exhausted, retry in {retry_after:.0f}s")
+
+
+class TokenBucket:
+    """Continuously refilling bucket corrected by Twitter's rate-limit headers"""
+    
+    def __init__(self, capacity: int, window_seconds: int):
+        self.capacity = capacity
+        self.window_seconds = window_seconds
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self.reset_at: Optional[float] = None  # Epoch seconds reported by Twitter
+        self.lock = asyncio.Lock()
+    
+    @property
+    def refill_rate(self) -> float:
+        return self.capacity / self.window_seconds
+    
+    def refill(self):
+        now = time.monotonic()
+        if self.reset_at and time.time() >= self.reset_at:
+            # Twitter's window rolled over, so the whole allowance is back
+            self.tokens = float(self.capacity)
+            self.reset_at = None
+        elif not self.reset_at:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_rate)
+        self.updated_at = now
+    
+    def wait_time(self) -> float:
+        """Seconds until a token is available"""
+        self.refill()
+        if self.tokens >= 1:
+            return 0.0
+        if self.reset_at:
+            return max(0.0, self.reset_at - time.time())
+        return (1 - self.tokens) / self.refill_rate
+    
+    def update(self, limit: Optional[int], remaining: Optional[int], reset_at: Optional[float]):
+        """Adopt the authoritative state from response headers"""
+        if limit:
+            self.capacity = limit
+        if remaining is not None:
+            self.tokens = float(min(remaining, self.capacity))
+        self.reset_at = reset_at if remaining is not None and remaining < 1 else None
+        self.updated_at = time.monotonic()
+
+
+class RateLimitGovernor:
+    """Keeps one token bucket per credential and endpoint"""
+    
+    def __init__(self, policy: Optional[str] = None, max_wait_seconds: Optional[float] = None):
+        self.policy = policy or settings.twitter_rate_limit_policy
+        self.max_wait_seconds = max_wait_seconds or settings.twitter_rate_limit_max_wait_seconds
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+    
+    def bucket(self, credential_key: str, endpoint: str) -> TokenBucket:
+        """Get or create the bucket for a credential and endpoint"""
+        key = (credential_key, endpoint)
+        if key not in self._buckets:
+            self._buckets[key] = TokenBucket(*KNOWN_LIMITS.get(endpoint, DEFAULT_LIMIT))
+        return self._buckets[key]
+    
+    async def acquire(self, credential_key: str, endpoint: str, policy: Optional[str] = None):
+        """Take a token, waiting or failing according to policy"""
+        policy = policy or self.policy
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown rate limit policy: {policy}")
+        
+        bucket = self.bucket(credential_key, endpoint)
+        if policy == "fail_fast":
+            wait = bucket.wait_time()
+            if wait > 0:
+                raise RateLimitExceeded(endpoint, wait)
+            bucket.tokens -= 1
+            return
+        
+        # The bucket lock makes waiters take tokens in arrival order
+        async with bucket.lock:
+            while True:
+                wait = bucket.wait_time()
+                if wait <= 0:
+                    bucket.tokens -= 1
+                    return
+                if policy == "wait" and wait > self.max_wait_seconds:
+                    raise RateLimitExceeded(endpoint, wait)
+                logger.info(f"Waiting {wait:.1f}s for {endpoint} rate limit")
+                await asyncio.sleep(wait)
+    
+    def available(self, credential_key: str, endpoint: str) -> int:
+        """Whole requests that can be sent right now"""
+        bucket = self.bucket(credential_key, endpoint)
+        bucket.refill()
+        return int(bucket.tokens)
+    
+    def update_from_headers(self, credential_key: str, endpoint: str, headers):
+        """Correct a bucket from x-rate-limit-* response headers"""
+        remaining = headers.get("x-rate-limit-remaining")
+        if remaining is None:
+            return
+        
+        limit = headers.get("x-rate-limit-limit")
+        reset = headers.get("x-rate-limit-reset")
+        self.bucket(credential_key, endpoint).update(
+            int(limit) if limit else None,
+            int(remaining),
+            float(reset) if reset else None
+        )
+    
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Current state of every bucket, for status endpoints and planning"""
+        state = []
+        for (credential_key, endpoint), bucket in self._buckets.items():
+            bucket.refill()
+            state.append({
+                "credential": credential_key[:8],
+                "endpoint": endpoint,
+                "available": int(bucket.tokens),
+                "capacity": bucket.capacity,
+                "window_seconds": bucket.window_seconds,
+                "reset_at": bucket.reset_at
+            })
+        return state
+    
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """aiohttp hook that feeds response headers back into the buckets"""
+        async def on_request_end(session, context, params):
+            endpoint = current_endpoint.get()
+            if endpoint:
+                self.update_from_headers(*endpoint, params.response.headers)
+        
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_end.append(on_request_end)
+        return trace_config
+
+
+# Global governor shared by all TwitterService instances
+rate_limit_governor = RateLimitGovernor()
+
+
+def get_rate_limit_governor() -> RateLimitGovernor:
+    """Get the shared rate limit governor"""
+    return rate_limit_governor
@@ -8,10 +8,15 @@ from apscheduler.executors.asyncio import AsyncIOExecutor
 from apscheduler.events import EVENT_JOB_EXECUTED, EVENT_JOB_ERROR
 import logging
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 import asyncio
+import random
 
 from config.settings import get_settings
+from src.database.models import engine, SessionLocal, ActivityLog, TargetAccount, DEFAULT_USER_PK
+from src.services.dispatcher import TenantDispatcher
+from src.services.leader_election import LeaderElector
+from src.services.config_store import get_config_store
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -23,7 +28,7 @@ class SchedulerService:
     def __init__(self):
         # Configure job stores, executors and job defaults
         jobstores = {
-            'default': SQLAlchemyJobStore(url=settings.database_url)
+            'default': SQLAlchemyJobStore(engine=engine)
         }
         executors = {
             'default': AsyncIOExecutor()
@@ -33,6 +38,12 @@ class SchedulerService:
             'max_instances': 3
         }
         
+        # Only the elected replica runs jobs
+        self.elector = LeaderElector("scheduler") if settings.scheduler_coordination == "lease" else None
+        if self.elector:
+            # Runs that came due during a leader failover still fire on the new leader
+            job_defaults['misfire_grace_time'] = settings.scheduler_misfire_grace_seconds
+        
         self.scheduler = AsyncIOScheduler(
             jobstores=jobstores,
             executors=executors,
@@ -44,22 +55,126 @@ class SchedulerService:
         self.scheduler.add_listener(self._job_executed, EVENT_JOB_EXECUTED)
         self.scheduler.add_listener(self._job_error, EVENT_JOB_ERROR)
         
+        # In dispatcher mode per-user jobs live in one in-memory heap, not in APScheduler
+        self.dispatcher = TenantDispatcher() if settings.scheduler_dispatch_mode == "dispatcher" else None
+        # Last config applied per user, used to pick up changes written by other processes
+        self._applied: Dict[str, Dict[str, Any]] = {}
+        # Persisted last run per dispatcher job id, consumed when the job is first scheduled
+        self._last_runs: Dict[str, datetime] = {}
+        self._config_sync: Optional[asyncio.Task] = None
+        
         self._running = False
     
+    @property
+    def is_leader(self) -> bool:
+        """Whether this process runs jobs"""
+        if settings.scheduler_role == "api":
+            return False
+        return self.elector.is_leader if self.elector else self._running
+    
     async def start(self):
         """Start the scheduler"""
         if not self._running:
-            self.scheduler.start()
+            if settings.scheduler_role == "api":
+                # Jobs can still be added to the shared job store, but never run here
+                self.scheduler.start(paused=True)
+                logger.info("Scheduler started in API-only mode")
+            elif self.elector:
+                self.scheduler.start(paused=True)
+                await self.elector.start(
+                    on_elected=self._become_leader,
+                    on_demoted=self._step_down,
+                    on_renewed=self.scheduler.wakeup
+                )
+            else:
+                self.scheduler.start()
+                await self._become_leader(resume=False)
             self._running = True
             logger.info("Scheduler started successfully")
     
     async def stop(self):
         """Stop the scheduler"""
         if self._running:
+            if self.elector:
+                await self.elector.stop()
+            else:
+                await self._step_down(pause=False)
             self.scheduler.shutdown()
             self._running = False
             logger.info("Scheduler stopped")
     
+    async def _become_leader(self, resume: bool = True):
+        """Start running jobs after winning the scheduler lease"""
+        if resume:
+            self.scheduler.resume()
+        self._remove_stale_store_jobs()
+        if self.dispatcher:
+            # Entries kept from an earlier term may be out of date
+            self.dispatcher.clear()
+            await self.dispatcher.start()
+        await self.restore_jobs()
+        if self.dispatcher:
+            self._config_sync = asyncio.get_running_loop().create_task(self._sync_config_loop())
+    
+    async def _step_down(self, pause: bool = True):
+        """Stop running jobs after losing the scheduler lease"""
+        if pause:
+            self.scheduler.pause()
+        if self._config_sync is not None:
+            self._config_sync.cancel()
+            await asyncio.gather(self._config_sync, return_exceptions=True)
+            self._config_sync = None
+        if self.dispatcher:
+            await self.dispatcher.stop()
+    
+    async def restore_jobs(self):
+        """Schedule any job missing for a stored bot configuration"""
+        self._applied.clear()
+        if self.dispatcher:
+            # The heap starts empty after a restart or failover; keep each user's cadence
+            try:
+                loop = asyncio.get_running_loop()
+                self._last_runs = await loop.run_in_executor(None, _load_last_runs)
+            except Exception as e:
+                logger.error(f"Failed to load last job runs: {e}")
+                self._last_runs = {}
+        await self.sync_config()
+    
+    async def sync_config(self):
+        """Apply configuration changes written by any process since the last sync"""
+        store = get_config_store()
+        try:
+            for user_id, version in (await store.list_versions()).items():
+                applied = self._applied.get(user_id)
+                if applied is not None and applied["version"] == version:
+                    continue
+                store.invalidate(user_id)
+                config = await store.get(user_id)
+                # On the first pass only create missing jobs, keeping their next run times
+                self._apply(user_id, applied or config, config)
+        except Exception as e:
+            logger.error(f"Failed to sync scheduled jobs with stored configuration: {e}")
+    
+    async def _sync_config_loop(self):
+        while True:
+            await asyncio.sleep(settings.scheduler_config_sync_seconds)
+            await self.sync_config()
+    
+    def _remove_stale_store_jobs(self):
+        """Drop per-user job store entries left behind by a different dispatch or execution mode"""
+        expected = {
+            "content_posting_": self._job_target("post", post_content_job, [], "")[0],
+            "account_monitoring_": self._job_target("monitor", monitor_accounts_job, [], "")[0]
+        }
+        for job in self.scheduler.get_jobs():
+            for prefix, func in expected.items():
+                if not job.id.startswith(prefix):
+                    continue
+                # In dispatcher mode the heap owns every per-user job
+                if self.dispatcher or job.func is not func:
+                    self.scheduler.remove_job(job.id)
+                    logger.info(f"Removed job {job.id} scheduled under a previous scheduler mode")
+    
     def _job_executed(self, event):
         """Handle job execution event"""
         logger.info(f"Job {event.job_id} executed successfully")
@@ -68,6 +183,20 @@ class SchedulerService:
         """Handle job error event"""
         logger.error(f"Job {event.job_id} failed: {event.exception}")
     
+    def _first_run_delay(self, job_id: str, interval_seconds: float, default: float) -> float:
+        """Seconds until a dispatcher job is next due, from its persisted last run if there is one"""
+        last_run = self._last_runs.pop(job_id, None)
+        if last_run is None:
+            return default
+        due = last_run + timedelta(seconds=interval_seconds)
+        return max((due - datetime.utcnow()).total_seconds(), 0)
+    
+    def _job_target(self, job_type: str, func, args: list, job_id: str):
+        """Run the job body here, or in worker mode just enqueue it for a worker process"""
+        if settings.scheduler_execution_mode == "worker":
+            return enqueue_work_job, [job_type, args, job_id]
+        return func, args
+    
     def schedule_content_posting(
         self, 
         interval_hours: int = 2,
@@ -81,26 +210,37 @@ class SchedulerService:
         if self.scheduler.get_job(job_id):
             self.scheduler.remove_job(job_id)
         
+        func, args = self._job_target("post", post_content_job, [user_id], job_id)
+        
         # Calculate interval
-        if interval_days > 0:
+        if self.dispatcher:
+            interval = timedelta(days=interval_days) if interval_days > 0 else timedelta(hours=interval_hours)
+            self.dispatcher.schedule(
+                job_id,
+                func,
+                interval.total_seconds(),
+                args=args,
+                first_run_delay=self._first_run_delay(job_id, interval.total_seconds(), 60)  # Else start in 1 minute
+            )
+        elif interval_days > 0:
             # Use interval trigger for days
             self.scheduler.add_job(
-                func=post_content_job,
+                func=func,
                 trigger="interval",
                 days=interval_days,
                 id=job_id,
-                args=[user_id],
+                args=args,
                 replace_existing=True,
                 next_run_time=datetime.now() + timedelta(minutes=1)  # Start in 1 minute
             )
         else:
             # Use interval trigger for hours
             self.scheduler.add_job(
-                func=post_content_job,
+                func=func,
                 trigger="interval",
                 hours=interval_hours,
                 id=job_id,
-                args=[user_id],
+                args=args,
                 replace_existing=True,
                 next_run_time=datetime.now() + timedelta(minutes=1)  # Start in 1 minute
             )
@@ -110,9 +250,10 @@ class SchedulerService:
     
     def schedule_account_monitoring(
         self, 
-        target_accounts: list,
+        target_accounts: Optional[list],
         check_interval_hours: int = 2,
-        user_id: str = "default"
+        user_id: str = "default",
+        themes: Optional[List[str]] = None
     ) -> str:
         """Schedule automated account monitoring"""
         job_id = f"account_monitoring_{user_id}"
@@ -121,21 +262,83 @@ class SchedulerService:
         if self.scheduler.get_job(job_id):
             self.scheduler.remove_job(job_id)
         
-        self.scheduler.add_job(
-            func=monitor_accounts_job,
-            trigger="interval",
-            hours=check_interval_hours,
-            id=job_id,
-            args=[target_accounts, user_id],
-            replace_existing=True,
-            next_run_time=datetime.now() + timedelta(minutes=2)  # Start in 2 minutes
-        )
+        func, args = self._job_target("monitor", monitor_accounts_job, [target_accounts, user_id, themes or []], job_id)
         
-        logger.info(f"Scheduled account monitoring every {check_interval_hours} hours for {len(target_accounts)} accounts")
+        if self.dispatcher:
+            interval = timedelta(hours=check_interval_hours).total_seconds()
+            self.dispatcher.schedule(
+                job_id,
+                func,
+                interval,
+                args=args,
+                first_run_delay=self._first_run_delay(job_id, interval, 120)  # Else start in 2 minutes
+            )
+        else:
+            self.scheduler.add_job(
+                func=func,
+                trigger="interval",
+                hours=check_interval_hours,
+                id=job_id,
+                args=args,
+                replace_existing=True,
+                next_run_time=datetime.now() + timedelta(minutes=2)  # Start in 2 minutes
+            )
+        
+        accounts = "stored target" if target_accounts is None else len(target_accounts)
+        logger.info(f"Scheduled account monitoring every {check_interval_hours} hours for {accounts} accounts")
         return job_id
     
+    def apply_config(self, user_id: str, old: Optional[Dict[str, Any]], new: Dict[str, Any]) -> List[str]:
+        """Reschedule only the jobs whose timing inputs differ between two configs"""
+        if self.dispatcher and not self.is_leader:
+            # The dispatcher heap only exists on the leader, which picks the change up from the database
+            return []
+        return self._apply(user_id, old, new)
+    
+    def _apply(self, user_id: str, old: Optional[Dict[str, Any]], new: Dict[str, Any]) -> List[str]:
+        changed = []
+        for job_id, old_key, new_key, schedule in (
+            (f"content_posting_{user_id}", _posting_key(old), _posting_key(new), self._schedule_posting_from),
+            (f"account_monitoring_{user_id}", _monitoring_key(old), _monitoring_key(new), self._schedule_monitoring_from),
+        ):
+            if new_key is None:
+                if self.has_job(job_id):
+                    self.remove_job(job_id)
+                    changed.append(job_id)
+            elif new_key != old_key or not self.has_job(job_id):
+                schedule(user_id, new)
+                changed.append(job_id)
+        self._applied[user_id] = new
+        return changed
+    
+    def _schedule_posting_from(self, user_id: str, config: Dict[str, Any]):
+        self.schedule_content_posting(
+            interval_hours=config["schedule"]["interval_hours"],
+            interval_days=config["schedule"]["interval_days"],
+            user_id=user_id
+        )
+    
+    def _schedule_monitoring_from(self, user_id: str, config: Dict[str, Any]):
+        # Targets and themes are read from the config store on each run, so
+        # editing the target list never reschedules or re-pickles the job
+        self.schedule_account_monitoring(
+            target_accounts=None,
+            check_interval_hours=config["monitoring_interval_hours"],
+            user_id=user_id
+        )
+    
+    def has_job(self, job_id: str) -> bool:
+        """Whether a job is scheduled in APScheduler or the dispatcher"""
+        if self.dispatcher and self.dispatcher.has_job(job_id):
+            return True
+        return self.scheduler.get_job(job_id) is not None
+    
     def remove_job(self, job_id: str) -> bool:
         """Remove a scheduled job"""
+        if self.dispatcher and self.dispatcher.unschedule(job_id):
+            logger.info(f"Removed job {job_id}")
+            return True
+        
         try:
             self.scheduler.remove_job(job_id)
             logger.info(f"Removed job {job_id}")
@@ -154,103 +357,50 @@ class SchedulerService:
                 "next_run": job.next_run_time.isoformat() if job.next_run_time else None,
                 "trigger": str(job.trigger)
             })
+        if self.dispatcher:
+            jobs.extend(self.dispatcher.get_jobs())
         return jobs
 
 
-async def post_content_job(user_id: str):
-        """Background job for posting content"""
-        try:
-            logger.info(f"Starting content posting job for user {user_id}")
-            
-            # Import here to avoid circular imports
-            from src.services.claude_service import ClaudeService
-            from src.services.twitter_service import TwitterService
-            
-            # Initialize services
-            claude_service = ClaudeService()
-            twitter_service = TwitterService()  # Will need user tokens
-            
-            # Generate content
-            content_result = await claude_service.generate_tweet_content(
-                prompt="Generate an engaging and interesting tweet",
-                theme="technology and innovation",
-                personality="friendly"
-            )
-            
-            if content_result["success"]:
-                # Post the tweet
-                tweet_result = await twitter_service.post_tweet(content_result["content"])
-                
-                if tweet_result["success"]:
-                    logger.info(f"Successfully posted automated tweet: {content_result['content']}")
-                else:
-                    logger.error(f"Failed to post tweet: {tweet_result['error']}")
-            else:
-                logger.error(f"Failed to generate content: {content_result['error']}")
-                
-        except Exception as e:
-            logger.error(f"Content posting job failed: {e}")
+def _posting_key(config: Optional[Dict[str, Any]]) -> Optional[tuple]:
+    """Inputs that decide the posting job's timing, or None when it shouldn't run"""
+    if not config or not config["enabled"] or not config["schedule"]["enabled"]:
+        return None
+    return (config["schedule"]["interval_hours"], config["schedule"]["interval_days"])
 
 
-async def monitor_accounts_job(target_accounts: list, user_id: str):
-        """Background job for monitoring target accounts"""
-        try:
-            logger.info(f"Starting account monitoring job for user {user_id}")
-            
-            # Import here to avoid circular imports
-            from src.services.twitter_service import TwitterService
-            from src.services.claude_service import ClaudeService
-            
-            twitter_service = TwitterService()  # Will need user tokens
-            claude_service = ClaudeService()
-            
-            for account in target_accounts:
-                try:
-                    username = account.get("username")
-                    if not username:
-                        continue
-                    
-                    logger.info(f"Monitoring account: {username}")
-                    
-                    # Get user info
-                    user_info = await twitter_service.get_user_by_username(username)
-                    if not user_info or not user_info["success"]:
-                        continue
-                    
-                    user_id_target = user_info["id"]
-                    
-                    # Get recent tweets
-                    tweets_result = await twitter_service.get_user_tweets(user_id_target, max_results=5)
-                    
-                    if tweets_result["success"] and tweets_result["data"]:
-                        for tweet in tweets_result["data"]:
-                            # Analyze tweet for potential reply
-                            analysis = await claude_service.analyze_tweet_for_reply(
-                                tweet_text=tweet.text,
-                                author_username=username
-                            )
-                            
-                            if analysis["success"] and analysis["should_reply"]:
-                                # Post reply
-                                reply_result = await twitter_service.post_tweet(
-                                    text=analysis["reply_text"],
-                                    reply_to_id=tweet.id
-                                )
-                                
-                                if reply_result["success"]:
-                                    logger.info(f"Posted reply to {username}: {analysis['reply_text']}")
-                                else:
-                                    logger.error(f"Failed to post reply: {reply_result['error']}")
-                                
-                                # Only reply to one tweet per account per monitoring cycle
-                                break
-                    
-                except Exception as e:
-                    logger.error(f"Error monitoring account {username}: {e}")
-                    continue
-                
-        except Exception as e:
-            logger.error(f"Account monitoring job failed: {e}")
+def _monitoring_key(config: Optional[Dict[str, Any]]) -> Optional[tuple]:
+    """Inputs that decide the monitoring job's timing, or None when it shouldn't run"""
+    if not config or not config["enabled"]:
+        return None
+    if not config["has_enabled_targets"]:
+        return None
+    return (config["monitoring_interval_hours"],)
+
+
+def _load_last_runs() -> Dict[str, datetime]:
+    """Latest scheduled post and monitoring check per user, keyed by job id"""
+    from sqlalchemy import func
+    
+    def scheduler_user(owner: int) -> str:
+        return "default" if owner == DEFAULT_USER_PK else str(owner)
+    
+    db = SessionLocal()
+    try:
+        posts = db.query(ActivityLog.user_id, func.max(ActivityLog.created_at)).filter(
+            ActivityLog.activity_type == "post",
+            ActivityLog.description == "Scheduled post"
+        ).group_by(ActivityLog.user_id)
+        checks = db.query(TargetAccount.user_id, func.max(TargetAccount.last_checked_at)).group_by(TargetAccount.user_id)
+        
+        last_runs = {}
+        for prefix, rows in (("content_posting_", posts), ("account_monitoring_", checks)):
+            for owner, last_run in rows:
+                if last_run is not None:
+                    last_runs[f"{prefix}{scheduler_user(owner)}"] = last_run
+        return last_runs
+    finally:
+        db.close()
 
 
 async def post_content_job(user_id: str):
@@ -259,94 +409,136 @@ async def post_content_job(user_id: str):
         logger.info(f"Starting content posting job for user {user_id}")
         
         # Import here to avoid circular imports
-        from src.services.claude_service import ClaudeService
-        from src.services.twitter_service import TwitterService
+        from src.services.activity_recorder import get_activity_recorder
+        from src.services.claude_service import get_claude_service
+        from src.services.content_buffer import DEFAULT_THEMES, get_content_buffer
+        from src.services.dedup_index import get_content_deduplicator
+        from src.services.twitter_client_pool import get_twitter_client_pool
         
         # Initialize services
-        claude_service = ClaudeService()
-        twitter_service = TwitterService()  # Will need user tokens
+        claude_service = get_claude_service()
+        twitter_service = await get_twitter_client_pool().get(user_id)
+        content_buffer = get_content_buffer()
+        deduplicator = get_content_deduplicator()
+        recorder = get_activity_recorder()
         
-        # Generate content
-        content_result = await claude_service.generate_tweet_content(
-            prompt="Generate an engaging and interesting tweet",
-            theme="technology and innovation",
-            personality="friendly"
-        )
+        # Generate from the user's configured content settings
+        content_config = (await get_config_store().get(user_id))["content"]
+        themes = content_config["themes"] or DEFAULT_THEMES
+        personality = content_config["personality"]
+        max_length = content_config["max_length"]
         
-        if content_result["success"]:
-            # Post the tweet
-            tweet_result = await twitter_service.post_tweet(content_result["content"])
-            
-            if tweet_result["success"]:
-                logger.info(f"Successfully posted automated tweet: {content_result['content']}")
-            else:
-                logger.error(f"Failed to post tweet: {tweet_result['error']}")
+        # Prefer a pre-generated draft so posting doesn't wait on the LLM.
+        # Drafts were checked against the duplicate index when they were buffered.
+        content = None
+        generated = False
+        if settings.content_buffer_enabled:
+            content = await content_buffer.take(user_id, personality, max_length)
+            content_buffer.request_refill(user_id, themes, personality, max_length)
+        
+        if content is None:
+            # Buffer empty or disabled, fall back to live generation
+            for _ in range(settings.dedup_max_attempts):
+                content_result = await claude_service.generate_tweet_content(
+                    prompt="Generate an engaging and interesting tweet",
+                    theme=random.choice(themes),
+                    personality=personality,
+                    max_length=max_length,
+                    user_id=user_id,
+                    priority="scheduled"
+                )
+                if not content_result["success"]:
+                    logger.error(f"Failed to generate content: {content_result['error']}")
+                    await recorder.record(
+                        "error",
+                        user_id=user_id,
+                        description="Content generation failed",
+                        success=False,
+                        error_message=content_result["error"]
+                    )
+                    raise RuntimeError(f"Content generation failed: {content_result['error']}")
+                
+                if not await deduplicator.is_duplicate(user_id, content_result["content"]):
+                    content = content_result["content"]
+                    generated = True
+                    break
+                logger.info("Generated content is a near-duplicate of an earlier tweet, regenerating")
+        
+        if content is None:
+            logger.warning(f"Skipping post for user {user_id}: only near-duplicate content was generated")
+            return
+        
+        # Post the tweet
+        tweet_result = await twitter_service.post_tweet(content)
+        
+        if tweet_result["success"]:
+            logger.info(f"Successfully posted automated tweet: {content}")
+            if generated:
+                await deduplicator.record(user_id, content, "posted", tweet_result["id"])
         else:
-            logger.error(f"Failed to generate content: {content_result['error']}")
+            logger.error(f"Failed to post tweet: {tweet_result['error']}")
+        
+        await recorder.record(
+            "post",
+            user_id=user_id,
+            description="Scheduled post",
+            success=tweet_result["success"],
+            tweet_id=tweet_result.get("id"),
+            tweet_text=content,
+            error_message=tweet_result.get("error"),
+            extra_data={"source": "generated" if generated else "buffer"}
+        )
+        if not tweet_result["success"]:
+            raise RuntimeError(f"Failed to post tweet: {tweet_result['error']}")
             
     except Exception as e:
         logger.error(f"Content posting job failed: {e}")
+        # Let the caller see the failure so worker items end up failed, not done
+        raise
 
 
-async def monitor_accounts_job(target_accounts: list, user_id: str):
+async def monitor_accounts_job(target_accounts: Optional[list], user_id: str, themes: Optional[List[str]] = None):
     """Background job for monitoring target accounts"""
     try:
         logger.info(f"Starting account monitoring job for user {user_id}")
         
+        if target_accounts is None:
+            # Read the current targets instead of a list frozen at scheduling time
+            config = await get_config_store().get(user_id)
+            target_accounts = [
+                account for account in config["target_accounts"]
+                if account["enabled"]
+            ]
+            themes = config["content"]["themes"]
+        
         # Import here to avoid circular imports
-        from src.services.twitter_service import TwitterService
-        from src.services.claude_service import ClaudeService
+        from src.services.twitter_client_pool import get_twitter_client_pool
+        from src.services.claude_service import get_claude_service
+        from src.services.monitoring_service import MonitoringEngine
         
-        twitter_service = TwitterService()  # Will need user tokens
-        claude_service = ClaudeService()
+        twitter_service = await get_twitter_client_pool().get(user_id)
+        engine = MonitoringEngine(twitter_service, get_claude_service())
+        
+        await engine.run_cycle(target_accounts, user_id, themes=themes)
         
-        for account in target_accounts:
-            try:
-                username = account.get("username")
-                if not username:
-                    continue
-                
-                logger.info(f"Monitoring account: {username}")
-                
-                # Get user info
-                user_info = await twitter_service.get_user_by_username(username)
-                if not user_info or not user_info["success"]:
-                    continue
-                
-                user_id_target = user_info["id"]
-                
-                # Get recent tweets
-                tweets_result = await twitter_service.get_user_tweets(user_id_target, max_results=5)
-                
-                if tweets_result["success"] and tweets_result["data"]:
-                    for tweet in tweets_result["data"]:
-                        # Analyze tweet for potential reply
-                        analysis = await claude_service.analyze_tweet_for_reply(
-                            tweet_text=tweet.text,
-                            author_username=username
-                        )
-                        
-                        if analysis["success"] and analysis["should_reply"]:
-                            # Post reply
-                            reply_result = await twitter_service.post_tweet(
-                                text=analysis["reply_text"],
-                                reply_to_id=tweet.id
-                            )
-                            
-                            if reply_result["success"]:
-                                logger.info(f"Posted reply to {username}: {analysis['reply_text']}")
-                            else:
-                                logger.error(f"Failed to post reply: {reply_result['error']}")
-                            
-                            # Only reply to one tweet per account per monitoring cycle
-                            break
-                
-            except Exception as e:
-                logger.error(f"Error monitoring account {username}: {e}")
-                continue
-            
     except Exception as e:
         logger.error(f"Account monitoring job failed: {e}")
+        raise
+
+
+async def enqueue_work_job(job_type: str, args: list, job_id: str):
+    """Background job that hands a run to the worker processes"""
+    try:
+        # Import here to avoid circular imports
+        from src.services.work_queue import get_work_queue
+        
+        loop = asyncio.get_running_loop()
+        item_id = await loop.run_in_executor(None, get_work_queue().enqueue, job_type, args, job_id)
+        if item_id:
+            logger.info(f"Enqueued {job_id} as work item {item_id}")
+        
+    except Exception as e:
+        logger.error(f"Failed to enqueue {job_id}: {e}")
 
 
 # Global scheduler instance
@@ -0,0 +1,105 @@
+"""
+Persistence helpers for monitored target accounts
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy import func
+import logging
+
+from src.database.models import SessionLocal, TargetAccount, user_pk
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_username(username: str) -> str:
+    """Normalize a handle for lookups and storage keys"""
+    return username.strip().lstrip("@").lower()
+
+
+def ensure_target_accounts(user_id, usernames: List[str]):
+    """Create target account rows for usernames that are not stored yet"""
+    owner = user_pk(user_id)
+    db = SessionLocal()
+    try:
+        wanted = {normalize_username(username): username for username in usernames if username}
+        existing = {
+            normalize_username(username)
+            for (username,) in db.query(TargetAccount.target_username).filter(
+                TargetAccount.user_id == owner,
+                func.lower(TargetAccount.target_username).in_(list(wanted))
+            )
+        }
+        for key, username in wanted.items():
+            if key not in existing:
+                db.add(TargetAccount(user_id=owner, target_username=username.lstrip("@")))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to store target accounts: {e}")
+    finally:
+        db.close()
+
+
+def load_target_user_ids(usernames: List[str]) -> Dict[str, str]:
+    """Read persisted user ids for the given usernames"""
+    db = SessionLocal()
+    try:
+        rows = db.query(TargetAccount.target_username, TargetAccount.target_user_id).filter(
+            func.lower(TargetAccount.target_username).in_(usernames),
+            TargetAccount.target_user_id.isnot(None)
+        ).all()
+        return {normalize_username(username): user_id for username, user_id in rows}
+    finally:
+        db.close()
+
+
+def store_target_user_ids(user_ids: Dict[str, Optional[str]]):
+    """Persist resolved user ids onto matching target account rows"""
+    db = SessionLocal()
+    try:
+        for username, user_id in user_ids.items():
+            db.query(TargetAccount).filter(
+                func.lower(TargetAccount.target_username) == username
+            ).update({TargetAccount.target_user_id: user_id}, synchronize_session=False)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to store resolved user ids: {e}")
+    finally:
+        db.close()
+
+
+def load_watermarks(user_id, usernames: List[str]) -> Dict[str, Optional[str]]:
+    """Read the last seen tweet id for each of a user's target accounts"""
+    db = SessionLocal()
+    try:
+        rows = db.query(TargetAccount.target_username, TargetAccount.last_tweet_id).filter(
+            TargetAccount.user_id == user_pk(user_id),
+            func.lower(TargetAccount.target_username).in_(
+                [normalize_username(username) for username in usernames]
+            )
+        ).all()
+        return {normalize_username(username): last_tweet_id for username, last_tweet_id in rows}
+    finally:
+        db.close()
+
+
+def store_watermark(user_id, username: str, last_tweet_id: Optional[str]):
+    """Record a monitoring pass and advance the account's high-water mark"""
+    values = {TargetAccount.last_checked_at: datetime.utcnow()}
+    if last_tweet_id:
+        values[TargetAccount.last_tweet_id] = last_tweet_id
+    
+    db = SessionLocal()
+    try:
+        db.query(TargetAccount).filter(
+            TargetAccount.user_id == user_pk(user_id),
+            func.lower(TargetAccount.target_username) == normalize_username(username)
+        ).update(values, synchronize_session=False)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to store watermark for {username}: {e}")
+    finally:
+        db.close()
\ No newline at end of file
@@ -0,0 +1,159 @@
+"""
+Persistence for threads so partially posted reply chains can resume
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, List
+from sqlalchemy import update, or_
+from sqlalchemy.exc import IntegrityError
+import logging
+
+from src.database.models import SessionLocal, TweetThread, user_pk
+
+logger = logging.getLogger(__name__)
+
+# Longest a posting attempt may go without recording progress before another can take over
+CLAIM_TIMEOUT_SECONDS = 600
+
+
+def _thread_dict(thread: TweetThread) -> Dict[str, Any]:
+    return {
+        "id": thread.id,
+        "segments": thread.segments or [],
+        "posted_ids": thread.posted_ids or [],
+        "reply_to_id": thread.reply_to_id,
+        "status": thread.status,
+        "error": thread.error_message,
+        "created_at": thread.created_at
+    }
+
+
+class ThreadStore:
+    """Creates thread rows and records each segment as it is posted"""
+    
+    async def create(
+        self,
+        user_id: str,
+        segments: List[str],
+        reply_to_id: Optional[str] = None,
+        idempotency_key: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Create a thread, or return the existing one for a repeated idempotency key"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, self._create, user_pk(user_id), segments, reply_to_id, idempotency_key
+        )
+    
+    async def get(self, thread_id: int) -> Optional[Dict[str, Any]]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._get, thread_id)
+    
+    async def claim(self, thread_id: int) -> Optional[Dict[str, Any]]:
+        """Mark a thread as being posted, or return None if another request is already posting it"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._claim, thread_id)
+    
+    async def record_posted(self, thread_id: int, index: int, tweet_id: str):
+        """Store the id of a posted segment"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._record_posted, thread_id, index, tweet_id)
+    
+    async def finish(self, thread_id: int, tweet_ids: List[str], error: Optional[str] = None):
+        """Mark a posting attempt complete or failed"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._finish, thread_id, tweet_ids, error)
+    
+    def _create(self, owner, segments, reply_to_id, idempotency_key) -> Dict[str, Any]:
+        db = SessionLocal()
+        try:
+            if idempotency_key:
+                existing = db.query(TweetThread).filter(TweetThread.idempotency_key == idempotency_key).first()
+                if existing:
+                    return _thread_dict(existing)
+            
+            thread = TweetThread(
+                user_id=owner,
+                idempotency_key=idempotency_key,
+                segments=segments,
+                posted_ids=[],
+                reply_to_id=reply_to_id
+            )
+            db.add(thread)
+            try:
+                db.commit()
+            except IntegrityError:
+                # A concurrent request with the same key won
+                db.rollback()
+                return _thread_dict(
+                    db.query(TweetThread).filter(TweetThread.idempotency_key == idempotency_key).one()
+                )
+            return _thread_dict(thread)
+        finally:
+            db.close()
+    
+    def _get(self, thread_id: int) -> Optional[Dict[str, Any]]:
+        db = SessionLocal()
+        try:
+            thread = db.get(TweetThread, thread_id)
+            return _thread_dict(thread) if thread else None
+        finally:
+            db.close()
+    
+    def _claim(self, thread_id: int) -> Optional[Dict[str, Any]]:
+        # A claim whose poster died stops blocking once it has seen no progress for a while
+        cutoff = datetime.utcnow() - timedelta(seconds=CLAIM_TIMEOUT_SECONDS)
+        db = SessionLocal()
+        try:
+            claimed = db.execute(
+                update(TweetThread)
+                .where(
+                    TweetThread.id == thread_id,
+                    or_(TweetThread.status != "posting", TweetThread.updated_at < cutoff)
+                )
+                .values(status="posting", updated_at=datetime.utcnow())
+            ).rowcount
+            db.commit()
+            if not claimed:
+                return None
+            # Re-read so progress recorded by an earlier attempt is resumed from
+            return _thread_dict(db.get(TweetThread, thread_id))
+        finally:
+            db.close()
+    
+    def _record_posted(self, thread_id: int, index: int, tweet_id: str):
+        db = SessionLocal()
+        try:
+            thread = db.get(TweetThread, thread_id)
+            posted_ids = list(thread.posted_ids or [])
+            if len(posted_ids) == index:
+                thread.posted_ids = posted_ids + [tweet_id]
+                db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to record thread {thread_id} segment {index}: {e}")
+        finally:
+            db.close()
+    
+    def _finish(self, thread_id: int, tweet_ids: List[str], error: Optional[str]):
+        db = SessionLocal()
+        try:
+            thread = db.get(TweetThread, thread_id)
+            thread.posted_ids = tweet_ids
+            thread.status = "failed" if error else "posted"
+            thread.error_message = error
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to update thread {thread_id}: {e}")
+        finally:
+            db.close()
+
+
+# Global thread store instance
+thread_store = ThreadStore()
+
+
+def get_thread_store() -> ThreadStore:
+    """Get the thread store instance"""
+    return thread_store
@@ -0,0 +1,324 @@
+"""
+Per-user pool of authenticated Twitter clients with background token refresh
+"""
+
+import asyncio
+import base64
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any
+from cryptography.fernet import Fernet, InvalidToken
+import logging
+
+from config.settings import get_settings
+from src.database.models import SessionLocal, User, DEFAULT_USER_PK, user_pk
+from src.services.twitter_service import TwitterService, get_http_session
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+TOKEN_URL = "https://api.twitter.com/2/oauth2/token"
+# How long a failed refresh waits for a concurrent rotation by another process to be stored
+ROTATION_CHECK_ATTEMPTS = 5
+ROTATION_CHECK_SECONDS = 0.2
+
+
+class TokenCipher:
+    """Encrypts OAuth tokens at rest; passes them through unchanged when no key is configured"""
+    
+    def __init__(self, key: Optional[str] = None):
+        key = key or settings.token_encryption_key
+        self._fernet = Fernet(key.encode("utf-8")) if key else None
+    
+    def encrypt(self, token: Optional[str]) -> Optional[str]:
+        if token is None or self._fernet is None:
+            return token
+        return self._fernet.encrypt(token.encode("utf-8")).decode("utf-8")
+    
+    def decrypt(self, token: Optional[str]) -> Optional[str]:
+        if token is None or self._fernet is None:
+            return token
+        try:
+            return self._fernet.decrypt(token.encode("utf-8")).decode("utf-8")
+        except InvalidToken:
+            # Rows written before encryption was enabled
+            logger.warning("Stored token is not encrypted, using it as is")
+            return token
+
+
+class TwitterClientPool:
+    """LRU of TwitterService instances keyed by user
+    
+    Decrypted tokens only live in the pooled entries. A background task
+    refreshes pooled tokens shortly before they expire, so callers get a
+    ready client without waiting on the token endpoint.
+    """
+    
+    def __init__(
+        self,
+        max_clients: Optional[int] = None,
+        refresh_margin_seconds: Optional[int] = None,
+        refresh_interval_seconds: Optional[float] = None,
+        cipher: Optional[TokenCipher] = None
+    ):
+        self.max_clients = max_clients or settings.twitter_client_pool_size
+        self.refresh_margin = refresh_margin_seconds or settings.twitter_token_refresh_margin_seconds
+        self.refresh_interval = refresh_interval_seconds or settings.twitter_token_refresh_interval_seconds
+        self.cipher = cipher or TokenCipher()
+        self._entries: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._locks: Dict[int, asyncio.Lock] = {}
+        self._default: Optional[TwitterService] = None
+        self._task: Optional[asyncio.Task] = None
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+    
+    async def get(self, user_id: str = "default") -> TwitterService:
+        """Return a client authenticated as the user"""
+        owner = user_pk(user_id)
+        if owner == DEFAULT_USER_PK:
+            # The bot's own account from settings
+            if self._default is None:
+                self._default = TwitterService()
+            return self._default
+        
+        entry = self._entries.get(owner)
+        if entry is not None and not self._expired(entry):
+            self._entries.move_to_end(owner)
+            self.hits += 1
+            return entry["service"]
+        
+        lock = self._locks.setdefault(owner, asyncio.Lock())
+        async with lock:
+            # Another caller may have loaded it while we waited
+            entry = self._entries.get(owner)
+            if entry is not None and not self._expired(entry):
+                self.hits += 1
+                return entry["service"]
+            
+            self.misses += 1
+            entry = await self._load(owner)
+            if self._expiring(entry):
+                entry = await self._refresh(owner, entry)
+            if self._expired(entry):
+                raise Exception(f"Twitter token for user {owner} has expired and cannot be refreshed")
+            self._store(owner, entry)
+            return entry["service"]
+    
+    def forget(self, user_id: str):
+        """Drop a user's pooled client, e.g. after logout or revocation"""
+        owner = user_pk(user_id)
+        self._entries.pop(owner, None)
+        self._locks.pop(owner, None)
+    
+    def start(self):
+        """Start the background refresher"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._refresh_forever())
+            logger.info("Twitter token refresher started")
+    
+    async def stop(self):
+        """Stop the background refresher"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._entries),
+            "max_clients": self.max_clients,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures
+        }
+    
+    def _expired(self, entry: Dict[str, Any]) -> bool:
+        return entry["expires_at"] is not None and entry["expires_at"] <= time.time()
+    
+    def _expiring(self, entry: Dict[str, Any]) -> bool:
+        return (
+            entry["refresh_token"] is not None
+            and entry["expires_at"] is not None
+            and entry["expires_at"] - self.refresh_margin <= time.time()
+        )
+    
+    def _store(self, owner: int, entry: Dict[str, Any]):
+        self._entries[owner] = entry
+        self._entries.move_to_end(owner)
+        while len(self._entries) > self.max_clients:
+            evicted, _ = self._entries.popitem(last=False)
+            self._locks.pop(evicted, None)
+            self.evictions += 1
+    
+    async def _load(self, owner: int) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        row = await loop.run_in_executor(None, self._read_tokens, owner)
+        if row is None or not row["access_token"]:
+            raise Exception(f"No stored Twitter tokens for user {owner}")
+        return self._entry(owner, row["access_token"], row["refresh_token"], row["expires_at"], row["stored_refresh_token"])
+    
+    def _entry(
+        self,
+        owner: int,
+        access_token: str,
+        refresh_token: Optional[str],
+        expires_at: Optional[datetime],
+        stored_refresh_token: Optional[str]
+    ) -> Dict[str, Any]:
+        return {
+            "service": TwitterService(oauth2_token=access_token, credential_key=f"user:{owner}"),
+            "refresh_token": refresh_token,
+            # Column value as stored, for the conditional update that rotates it
+            "stored_refresh_token": stored_refresh_token,
+            "expires_at": (expires_at - datetime.utcnow()).total_seconds() + time.time() if expires_at else None
+        }
+    
+    async def _rotated_elsewhere(self, owner: int, entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """A fresh entry if another process has replaced the stored refresh token since entry was loaded"""
+        loop = asyncio.get_running_loop()
+        row = await loop.run_in_executor(None, self._read_tokens, owner)
+        if row is None or not row["access_token"] or row["stored_refresh_token"] == entry["stored_refresh_token"]:
+            return None
+        return self._entry(owner, row["access_token"], row["refresh_token"], row["expires_at"], row["stored_refresh_token"])
+    
+    def _read_tokens(self, owner: int) -> Optional[Dict[str, Any]]:
+        db = SessionLocal()
+        try:
+            user = db.query(User).filter(User.id == owner, User.is_active.isnot(False)).first()
+            if user is None:
+                return None
+            return {
+                "access_token": self.cipher.decrypt(user.access_token),
+                "refresh_token": self.cipher.decrypt(user.refresh_token),
+                "stored_refresh_token": user.refresh_token,
+                "expires_at": user.token_expires_at
+            }
+        finally:
+            db.close()
+    
+    def _write_tokens(
+        self,
+        owner: int,
+        access_token: str,
+        refresh_token: str,
+        expires_at: datetime,
+        expected_refresh_token: Optional[str]
+    ) -> Optional[str]:
+        """Store a rotated pair unless another process replaced the refresh token first
+        
+        Returns the stored refresh token column value, or None if the write lost.
+        """
+        stored_refresh_token = self.cipher.encrypt(refresh_token)
+        db = SessionLocal()
+        try:
+            # Compare-and-swap on the column so only one process's rotation is kept
+            written = db.query(User).filter(
+                User.id == owner,
+                User.refresh_token == expected_refresh_token
+            ).update({
+                User.access_token: self.cipher.encrypt(access_token),
+                User.refresh_token: stored_refresh_token,
+                User.token_expires_at: expires_at
+            }, synchronize_session=False)
+            db.commit()
+            return stored_refresh_token if written else None
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+    
+    async def _refresh(self, owner: int, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Exchange the refresh token, persist the new pair and return a fresh entry
+        
+        Processes sharing the database race on the stored refresh token: a
+        process that finds it already rotated uses the stored pair instead
+        of exchanging a token the provider has invalidated.
+        """
+        try:
+            rotated = await self._rotated_elsewhere(owner, entry)
+            if rotated is not None:
+                logger.info(f"Using Twitter token refreshed by another process for user {owner}")
+                if not self._expiring(rotated):
+                    return rotated
+                entry = rotated
+            
+            credentials = f"{settings.twitter_client_id}:{settings.twitter_client_secret}"
+            headers = {"Authorization": "Basic " + base64.b64encode(credentials.encode("utf-8")).decode("utf-8")}
+            data = {
+                "grant_type": "refresh_token",
+                "refresh_token": entry["refresh_token"],
+                "client_id": settings.twitter_client_id
+            }
+            async with get_http_session().post(TOKEN_URL, data=data, headers=headers) as response:
+                payload = await response.json()
+                if response.status != 200:
+                    raise Exception(payload.get("error_description") or payload.get("error") or response.status)
+            
+            expires_at = datetime.utcnow() + timedelta(seconds=payload.get("expires_in", 7200))
+            # Twitter rotates refresh tokens; keep the old one only if none was returned
+            refresh_token = payload.get("refresh_token", entry["refresh_token"])
+            
+            loop = asyncio.get_running_loop()
+            stored_refresh_token = await loop.run_in_executor(
+                None, self._write_tokens, owner, payload["access_token"], refresh_token, expires_at,
+                entry["stored_refresh_token"]
+            )
+            if stored_refresh_token is None:
+                # Another process stored its rotation first; the handler below switches to it
+                raise Exception("Stored tokens changed during refresh")
+            
+            self.refreshes += 1
+            logger.info(f"Refreshed Twitter token for user {owner}")
+            return self._entry(owner, payload["access_token"], refresh_token, expires_at, stored_refresh_token)
+            
+        except Exception as e:
+            # The provider rejects a refresh token that another process has just rotated,
+            # possibly before that process has stored the new pair
+            for _ in range(ROTATION_CHECK_ATTEMPTS):
+                try:
+                    rotated = await self._rotated_elsewhere(owner, entry)
+                except Exception:
+                    rotated = None
+                if rotated is not None:
+                    logger.info(f"Using Twitter token refreshed by another process for user {owner}")
+                    return rotated
+                await asyncio.sleep(ROTATION_CHECK_SECONDS)
+            
+            self.refresh_failures += 1
+            logger.error(f"Failed to refresh Twitter token for user {owner}: {e}")
+            if self._expired(entry):
+                raise Exception(f"Twitter token for user {owner} has expired and could not be refreshed: {e}")
+            # Keep serving the current token until it actually expires
+            return entry
+    
+    async def _refresh_forever(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            for owner, entry in list(self._entries.items()):
+                if not self._expiring(entry):
+                    continue
+                async with self._locks.setdefault(owner, asyncio.Lock()):
+                    # Skip users evicted or refreshed by a caller in the meantime
+                    if self._entries.get(owner) is entry:
+                        try:
+                            self._entries[owner] = await self._refresh(owner, entry)
+                        except Exception:
+                            # Expired and unrefreshable; the next get reloads or fails
+                            self._entries.pop(owner, None)
+
+
+# Global client pool instance
+twitter_client_pool = TwitterClientPool()
+
+
+def get_twitter_client_pool() -> TwitterClientPool:
+    """Get the Twitter client pool instance"""
+    return twitter_client_pool
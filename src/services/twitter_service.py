@@ -2,49 +2,245 @@
 Twitter API service for handling Twitter interactions
 """
 
+import aiohttp
+import asyncio
+import hashlib
+import html
+import re
 import tweepy
-from typing import Optional, List, Dict, Any
+from tweepy.asynchronous import AsyncClient
+from datetime import datetime, timezone
+from typing import Optional, List, Dict, Any, Callable
 from config.settings import get_settings
+from src.services.rate_limiter import current_endpoint, get_rate_limit_governor
 import logging
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Keep-alive HTTP session shared by every TwitterService instance
+_http_session: Optional[aiohttp.ClientSession] = None
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    """Get the shared pooled HTTP session for Twitter API requests"""
+    global _http_session
+    if _http_session is None or _http_session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=settings.twitter_max_connections,
+            keepalive_timeout=settings.twitter_keepalive_seconds
+        )
+        _http_session = aiohttp.ClientSession(
+            connector=connector,
+            trace_configs=[get_rate_limit_governor().trace_config()],
+            timeout=aiohttp.ClientTimeout(
+                total=settings.twitter_timeout_seconds,
+                sock_connect=settings.twitter_connect_timeout_seconds
+            )
+        )
+        logger.info("Twitter HTTP session initialized")
+    return _http_session
+
+
+async def close_http_session():
+    """Close the shared Twitter HTTP session"""
+    global _http_session
+    if _http_session is not None and not _http_session.closed:
+        await _http_session.close()
+        logger.info("Twitter HTTP session closed")
+    _http_session = None
+
+
+# Errors after which a create_tweet may or may not have gone through
+TRANSIENT_ERRORS = (asyncio.TimeoutError, aiohttp.ClientError, tweepy.TwitterServerError)
+
+URL_PATTERN = re.compile(r"https?://\S+")
+
+
+def comparable_text(text: str) -> str:
+    """Tweet text as returned by the API (t.co links, HTML entities) reduced to what we posted"""
+    return " ".join(URL_PATTERN.sub("", html.unescape(text)).split())
+
+
+def split_into_segments(text: str, max_length: int = 280, numbered: bool = True) -> List[str]:
+    """Split long text into tweet-sized segments, preferring sentence boundaries"""
+    text = " ".join(text.split())
+    if len(text) <= max_length:
+        return [text] if text else []
+    
+    # Room for a " 12/34" style suffix
+    limit = max_length - (len(" 99/99") if numbered else 0)
+    
+    segments = []
+    current = ""
+    for word in text.split(" "):
+        while len(word) > limit:
+            # A single unbreakable run (e.g. a long URL) gets hard-split
+            if current:
+                segments.append(current)
+                current = ""
+            segments.append(word[:limit])
+            word = word[limit:]
+        
+        candidate = f"{current} {word}" if current else word
+        if len(candidate) <= limit:
+            current = candidate
+            continue
+        
+        # Break after the last sentence end if it leaves the segment at least half full
+        cut = max(current.rfind(". "), current.rfind("! "), current.rfind("? "))
+        if cut >= limit // 2:
+            segments.append(current[:cut + 1])
+            current = f"{current[cut + 2:]} {word}"
+        else:
+            segments.append(current)
+            current = word
+    if current:
+        segments.append(current)
+    
+    if numbered:
+        segments = [f"{segment} {index}/{len(segments)}" for index, segment in enumerate(segments, 1)]
+    return segments
+
+
+class IdentityCache:
+    """Caches the authenticated user id for each set of credentials"""
+    
+    def __init__(self):
+        self._user_ids: Dict[str, str] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+    
+    async def get_user_id(self, credential_key: str, resolver) -> str:
+        """Return the cached user id, resolving it once per credential set"""
+        user_id = self._user_ids.get(credential_key)
+        if user_id:
+            return user_id
+        
+        lock = self._locks.setdefault(credential_key, asyncio.Lock())
+        async with lock:
+            # Another caller may have resolved it while we waited
+            if credential_key not in self._user_ids:
+                self._user_ids[credential_key] = str(await resolver())
+                logger.info("Resolved authenticated Twitter user id")
+        return self._user_ids[credential_key]
+    
+    def invalidate(self, credential_key: Optional[str] = None):
+        """Forget the cached id for one credential set, or all of them"""
+        if credential_key is None:
+            self._user_ids.clear()
+        else:
+            self._user_ids.pop(credential_key, None)
+
+
+# Global identity cache shared by all TwitterService instances
+identity_cache = IdentityCache()
+
+
+class BotClient(AsyncClient):
+    """AsyncClient that takes the authenticating user id from the identity cache
+    
+    tweepy otherwise resolves it with a get_me request per client for OAuth 2.0
+    tokens before every like, follow or timeline call.
+    """
+    
+    user_id: Optional[str] = None
+    
+    async def _get_authenticating_user_id(self, *, oauth_1=False):
+        if self.user_id:
+            return self.user_id
+        return await super()._get_authenticating_user_id(oauth_1=oauth_1)
+
 
 class TwitterService:
     """Service for Twitter API interactions"""
     
-    def __init__(self, access_token: Optional[str] = None, access_token_secret: Optional[str] = None):
+    def __init__(
+        self,
+        access_token: Optional[str] = None,
+        access_token_secret: Optional[str] = None,
+        oauth2_token: Optional[str] = None,
+        credential_key: Optional[str] = None
+    ):
+        # An OAuth 2.0 user token takes precedence over OAuth 1.0a tokens
+        self.oauth2_token = oauth2_token
+        
         # Use provided tokens or fall back to settings for testing
-        self.access_token = access_token or settings.twitter_access_token
-        self.access_token_secret = access_token_secret or settings.twitter_access_token_secret
+        self.access_token = access_token or (None if oauth2_token else settings.twitter_access_token)
+        self.access_token_secret = access_token_secret or (None if oauth2_token else settings.twitter_access_token_secret)
+        self._credential_key = credential_key
         self._client_v2 = None
         self._client_v1 = None
     
     @property
-    def client_v2(self) -> Optional[tweepy.Client]:
-        """Get Twitter API v2 client"""
+    def client_v2(self) -> Optional[BotClient]:
+        """Get async Twitter API v2 client bound to the shared HTTP session"""
         if not self._client_v2:
             try:
-                self._client_v2 = tweepy.Client(
-                    bearer_token=settings.twitter_bearer_token,
-                    consumer_key=settings.twitter_client_id,
-                    consumer_secret=settings.twitter_client_secret,
-                    access_token=self.access_token,
-                    access_token_secret=self.access_token_secret
-                )
+                if self.oauth2_token:
+                    # OAuth 2.0 user context: the user's token is sent as the bearer token
+                    self._client_v2 = BotClient(bearer_token=self.oauth2_token)
+                else:
+                    self._client_v2 = BotClient(
+                        bearer_token=settings.twitter_bearer_token,
+                        consumer_key=settings.twitter_client_id,
+                        consumer_secret=settings.twitter_client_secret,
+                        access_token=self.access_token,
+                        access_token_secret=self.access_token_secret
+                    )
+                self._client_v2.session = get_http_session()
                 logger.info("Twitter API v2 client initialized successfully")
             except Exception as e:
                 logger.error(f"Failed to create Twitter client: {e}")
         return self._client_v2
     
+    @property
+    def credential_key(self) -> str:
+        """Fingerprint of the tokens this service authenticates with"""
+        if self._credential_key:
+            # Stable across token refreshes so rate limit and identity state carry over
+            return self._credential_key
+        raw = f"{self.access_token}:{self.access_token_secret}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    
+    async def get_authenticated_user_id(self) -> str:
+        """Get the bot's own user id from the shared identity cache"""
+        async def resolve():
+            me = await self._request("get_me")
+            return me.data.id
+        
+        return await identity_cache.get_user_id(self.credential_key, resolve)
+    
+    async def _request(
+        self,
+        method: str,
+        timeout: Optional[float] = None,
+        rate_limit_policy: Optional[str] = None,
+        **kwargs
+    ):
+        """Call an async client method under its rate limit with a per-request timeout"""
+        if not self.client_v2:
+            raise Exception("Twitter client not authenticated")
+        
+        await get_rate_limit_governor().acquire(self.credential_key, method, rate_limit_policy)
+        
+        if self.oauth2_token:
+            kwargs.setdefault("user_auth", False)
+        
+        # Lets the session's trace hook attribute response headers to this bucket
+        token = current_endpoint.set((self.credential_key, method))
+        try:
+            return await asyncio.wait_for(
+                getattr(self.client_v2, method)(**kwargs),
+                timeout=timeout or settings.twitter_timeout_seconds
+            )
+        finally:
+            current_endpoint.reset(token)
+    
     async def post_tweet(self, text: str, reply_to_id: Optional[str] = None) -> Dict[str, Any]:
         """Post a tweet"""
         try:
-            if not self.client_v2:
-                raise Exception("Twitter client not authenticated")
-            
-            response = self.client_v2.create_tweet(
+            response = await self._request(
+                "create_tweet",
                 text=text,
                 in_reply_to_tweet_id=reply_to_id
             )
@@ -62,20 +258,145 @@ class TwitterService:
                 "error": str(e)
             }
     
-    async def get_user_tweets(self, user_id: str, max_results: int = 10) -> Dict[str, Any]:
+    async def post_thread(
+        self,
+        segments: List[str],
+        reply_to_id: Optional[str] = None,
+        posted_ids: Optional[List[str]] = None,
+        on_posted: Optional[Callable[[int, str], None]] = None,
+        max_attempts: int = 3,
+        not_before: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """Post segments as a reply chain, resuming after any already posted ids
+        
+        Each segment is retried on transient errors. Before a retry, the bot's
+        recent replies are checked, so a tweet that was created but whose
+        response was lost is adopted rather than posted twice. not_before (UTC)
+        keeps an unrelated older tweet with the same text from being adopted
+        as the thread's first segment.
+        """
+        tweet_ids = list(posted_ids or [])
+        parent_id = tweet_ids[-1] if tweet_ids else reply_to_id
+        
+        for index in range(len(tweet_ids), len(segments)):
+            text = segments[index]
+            tweet_id = None
+            error = None
+            
+            for attempt in range(max_attempts):
+                if attempt:
+                    await asyncio.sleep(2 ** attempt)
+                    tweet_id = await self._find_posted_reply(text, parent_id, not_before)
+                    if tweet_id:
+                        logger.info(f"Thread segment {index} was already posted as {tweet_id}")
+                        break
+                
+                try:
+                    response = await self._request(
+                        "create_tweet",
+                        text=text,
+                        in_reply_to_tweet_id=parent_id
+                    )
+                    tweet_id = str(response.data["id"])
+                    break
+                except TRANSIENT_ERRORS as e:
+                    error = e
+                    logger.warning(f"Thread segment {index} attempt {attempt + 1} failed: {e}")
+                except tweepy.Forbidden as e:
+                    # Twitter rejects duplicate content, which also covers an earlier attempt that landed
+                    error = e
+                    tweet_id = await self._find_posted_reply(text, parent_id, not_before)
+                    break
+                except Exception as e:
+                    error = e
+                    break
+            
+            if not tweet_id:
+                logger.error(f"Failed to post thread segment {index}: {error}")
+                return {
+                    "success": False,
+                    "tweet_ids": tweet_ids,
+                    "failed_index": index,
+                    "error": str(error)
+                }
+            
+            tweet_ids.append(tweet_id)
+            parent_id = tweet_id
+            if on_posted:
+                on_posted(index, tweet_id)
+        
+        return {
+            "success": True,
+            "tweet_ids": tweet_ids
+        }
+    
+    async def _find_posted_reply(
+        self,
+        text: str,
+        parent_id: Optional[str],
+        not_before: Optional[datetime] = None
+    ) -> Optional[str]:
+        """Look for a recent tweet of ours with this text posted after the parent"""
+        try:
+            user_id = await self.get_authenticated_user_id()
+            response = await self._request(
+                "get_users_tweets",
+                id=user_id,
+                max_results=10,
+                since_id=parent_id,
+                tweet_fields=['referenced_tweets', 'created_at']
+            )
+        except Exception as e:
+            logger.warning(f"Could not check for an already posted thread segment: {e}")
+            return None
+        
+        if not_before is not None:
+            # The API reports whole seconds
+            not_before = not_before.replace(microsecond=0)
+        wanted = comparable_text(text)
+        for tweet in response.data or []:
+            if comparable_text(tweet.text) != wanted:
+                continue
+            if parent_id is None:
+                # Nothing to anchor a thread root to except when it was posted
+                created_at = tweet.created_at
+                if not_before is None or created_at is None:
+                    continue
+                if created_at.astimezone(timezone.utc).replace(tzinfo=None) < not_before:
+                    continue
+                return str(tweet.id)
+            replied_to = [
+                str(ref.id) for ref in (tweet.referenced_tweets or [])
+                if ref.type == "replied_to"
+            ]
+            if str(parent_id) in replied_to:
+                return str(tweet.id)
+        return None
+    
+    async def get_user_tweets(
+        self,
+        user_id: str,
+        max_results: int = 10,
+        since_id: Optional[str] = None,
+        pagination_token: Optional[str] = None
+    ) -> Dict[str, Any]:
         """Get tweets from a user"""
         try:
-            if not self.client_v2:
-                raise Exception("Twitter client not authenticated")
-            
-            tweets = self.client_v2.get_users_tweets(
+            tweets = await self._request(
+                "get_users_tweets",
                 id=user_id,
                 max_results=max_results,
-                tweet_fields=['created_at', 'public_metrics', 'context_annotations']
+                since_id=since_id,
+                pagination_token=pagination_token,
+                tweet_fields=[
+                    'created_at', 'public_metrics', 'context_annotations',
+                    'author_id', 'lang', 'referenced_tweets', 'in_reply_to_user_id'
+                ]
             )
             
             return {
                 "data": tweets.data or [],
+                "meta": tweets.meta or {},
                 "success": True
             }
             
@@ -86,17 +407,64 @@ class TwitterService:
                 "error": str(e)
             }
     
+    async def get_user_tweets_since(
+        self,
+        user_id: str,
+        since_id: str,
+        max_results: int = 100,
+        max_pages: int = 5
+    ) -> Dict[str, Any]:
+        """Get every tweet newer than since_id, following pagination through the gap
+        
+        newest_id is the newest tweet fetched. If paging stops early (page cap or
+        a failed page) complete is False and the older part of the gap is
+        skipped, so a busy account never re-reads the same newest tweets.
+        """
+        tweets = []
+        newest_id = None
+        pagination_token = None
+        complete = False
+        
+        for _ in range(max_pages):
+            page = await self.get_user_tweets(
+                user_id,
+                max_results=max_results,
+                since_id=since_id,
+                pagination_token=pagination_token
+            )
+            if not page["success"]:
+                if tweets:
+                    logger.warning(
+                        f"Paging tweets for user {user_id} failed partway, skipping tweets older than those fetched"
+                    )
+                    break
+                return page
+            
+            tweets.extend(page["data"])
+            newest_id = newest_id or page["meta"].get("newest_id")
+            pagination_token = page["meta"].get("next_token")
+            if not pagination_token:
+                complete = True
+                break
+        else:
+            logger.warning(
+                f"Stopped paginating tweets for user {user_id} after {max_pages} pages, "
+                f"skipping tweets older than those fetched"
+            )
+        
+        return {
+            "data": tweets,
+            "newest_id": newest_id,
+            "complete": complete,
+            "success": True
+        }
+    
     async def like_tweet(self, tweet_id: str) -> Dict[str, Any]:
         """Like a tweet"""
         try:
-            if not self.client_v2:
-                raise Exception("Twitter client not authenticated")
+            await self._use_cached_identity()
             
-            # Get authenticated user ID (this would be stored from OAuth)
-            me = self.client_v2.get_me()
-            user_id = me.data.id
-            
-            response = self.client_v2.like(tweet_id=tweet_id, user_id=user_id)
+            response = await self._request("like", tweet_id=tweet_id)
             
             return {
                 "success": True,
@@ -104,6 +472,7 @@ class TwitterService:
             }
             
         except Exception as e:
+            self._invalidate_identity_on_auth_error(e)
             logger.error(f"Failed to like tweet: {e}")
             return {
                 "success": False,
@@ -113,14 +482,9 @@ class TwitterService:
     async def follow_user(self, target_user_id: str) -> Dict[str, Any]:
         """Follow a user"""
         try:
-            if not self.client_v2:
-                raise Exception("Twitter client not authenticated")
-            
-            # Get authenticated user ID
-            me = self.client_v2.get_me()
-            user_id = me.data.id
+            await self._use_cached_identity()
             
-            response = self.client_v2.follow_user(target_user_id=target_user_id, user_id=user_id)
+            response = await self._request("follow_user", target_user_id=target_user_id)
             
             return {
                 "success": True,
@@ -128,19 +492,60 @@ class TwitterService:
             }
             
         except Exception as e:
+            self._invalidate_identity_on_auth_error(e)
             logger.error(f"Failed to follow user: {e}")
             return {
                 "success": False,
                 "error": str(e)
             }
     
+    async def like_tweets(self, tweet_ids: List[str]) -> Dict[str, Any]:
+        """Like several tweets, resolving the bot's user id only once"""
+        return await self._bulk_action(self.like_tweet, tweet_ids)
+    
+    async def follow_users(self, target_user_ids: List[str]) -> Dict[str, Any]:
+        """Follow several users, resolving the bot's user id only once"""
+        return await self._bulk_action(self.follow_user, target_user_ids)
+    
+    async def _bulk_action(self, action, ids: List[str]) -> Dict[str, Any]:
+        """Run a per-id action concurrently and collect results in input order"""
+        try:
+            # Warm the identity cache so the actions don't race to resolve it
+            await self.get_authenticated_user_id()
+        except Exception as e:
+            self._invalidate_identity_on_auth_error(e)
+            logger.error(f"Failed to resolve authenticated user: {e}")
+            return {
+                "success": False,
+                "error": str(e)
+            }
+        
+        results = await asyncio.gather(*(action(item_id) for item_id in ids))
+        
+        return {
+            "success": all(result["success"] for result in results),
+            "results": [
+                {"id": item_id, **result} for item_id, result in zip(ids, results)
+            ]
+        }
+    
+    async def _use_cached_identity(self):
+        """Hand the cached user id to the client so tweepy skips its own lookup"""
+        user_id = await self.get_authenticated_user_id()
+        if self.client_v2:
+            self.client_v2.user_id = user_id
+    
+    def _invalidate_identity_on_auth_error(self, error: Exception):
+        """Drop the cached identity when Twitter rejects our credentials"""
+        if isinstance(error, tweepy.Unauthorized):
+            identity_cache.invalidate(self.credential_key)
+            if self._client_v2:
+                self._client_v2.user_id = None
+    
     async def get_user_by_username(self, username: str) -> Optional[Dict[str, Any]]:
         """Get user information by username"""
         try:
-            if not self.client_v2:
-                raise Exception("Twitter client not authenticated")
-            
-            user = self.client_v2.get_user(username=username)
+            user = await self._request("get_user", username=username)
             
             if user.data:
                 return {
@@ -154,6 +559,26 @@ class TwitterService:
             
         except Exception as e:
             logger.error(f"Failed to get user: {e}")
+            return {
+                "success": False,
+                "error": str(e)
+            }
+    
+    async def get_users_by_usernames(self, usernames: List[str]) -> Dict[str, Any]:
+        """Look up to 100 users by username in a single request"""
+        try:
+            users = await self._request("get_users", usernames=usernames)
+            
+            return {
+                "data": [
+                    {"id": str(user.id), "username": user.username, "name": user.name}
+                    for user in users.data or []
+                ],
+                "success": True
+            }
+            
+        except Exception as e:
+            logger.error(f"Failed to look up users: {e}")
             return {
                 "success": False,
                 "error": str(e)
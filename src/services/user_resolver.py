@@ -0,0 +1,97 @@
+"""
+Username to user id resolution for monitored Twitter accounts
+"""
+
+import asyncio
+import time
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from config.settings import get_settings
+from src.services.target_accounts import (
+    load_target_user_ids,
+    normalize_username,
+    store_target_user_ids
+)
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Twitter's users lookup endpoint accepts at most 100 usernames per request
+LOOKUP_BATCH_SIZE = 100
+
+
+class UserResolver:
+    """Resolves usernames to user ids through a TTL cache, the database and bulk lookups"""
+    
+    def __init__(self, ttl_seconds: Optional[int] = None):
+        self.ttl_seconds = ttl_seconds or settings.twitter_user_id_cache_ttl_hours * 3600
+        self._cache: Dict[str, Tuple[str, float]] = {}
+        self.lookups = 0
+    
+    async def resolve(self, usernames: List[str], twitter_service) -> Dict[str, str]:
+        """Map normalized usernames to user ids, querying Twitter only for unknown handles"""
+        resolved: Dict[str, str] = {}
+        missing: List[str] = []
+        now = time.monotonic()
+        
+        for username in dict.fromkeys(normalize_username(u) for u in usernames if u):
+            cached = self._cache.get(username)
+            if cached and cached[1] > now:
+                resolved[username] = cached[0]
+            else:
+                missing.append(username)
+        
+        if not missing:
+            return resolved
+        
+        loop = asyncio.get_running_loop()
+        stored = await loop.run_in_executor(None, load_target_user_ids, missing)
+        for username, user_id in stored.items():
+            self._remember(username, user_id)
+            resolved[username] = user_id
+        missing = [username for username in missing if username not in stored]
+        
+        fetched: Dict[str, str] = {}
+        batches = [
+            missing[start:start + LOOKUP_BATCH_SIZE]
+            for start in range(0, len(missing), LOOKUP_BATCH_SIZE)
+        ]
+        for batch in batches:
+            self.lookups += 1
+            result = await twitter_service.get_users_by_usernames(batch)
+            if not result["success"]:
+                logger.warning(f"User lookup failed for {len(batch)} usernames: {result['error']}")
+                continue
+            
+            for user in result["data"]:
+                fetched[normalize_username(user["username"])] = user["id"]
+        
+        for username, user_id in fetched.items():
+            self._remember(username, user_id)
+            resolved[username] = user_id
+        
+        if fetched:
+            await loop.run_in_executor(None, store_target_user_ids, fetched)
+            logger.info(f"Resolved {len(fetched)} usernames in {len(batches)} lookups")
+        
+        return resolved
+    
+    async def forget(self, username: str):
+        """Drop a mapping that turned out to be stale"""
+        username = normalize_username(username)
+        self._cache.pop(username, None)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, store_target_user_ids, {username: None})
+    
+    def _remember(self, username: str, user_id: str):
+        self._cache[username] = (user_id, time.monotonic() + self.ttl_seconds)
+
+
+# Global resolver instance
+user_resolver = UserResolver()
+
+
+def get_user_resolver() -> UserResolver:
+    """Get the shared user resolver instance"""
+    return user_resolver
@@ -0,0 +1,187 @@
+"""
+Database-backed work queue shared by the scheduler and worker processes
+"""
+
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, List
+from sqlalchemy import update, func
+import logging
+
+from config.settings import get_settings
+from src.database.models import SessionLocal, WorkItem
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+JOB_TYPES = ("post", "monitor")
+
+
+class QueueFull(Exception):
+    """Raised when a job type already has too many items waiting"""
+    
+    def __init__(self, job_type: str, depth: int):
+        self.job_type = job_type
+        self.depth = depth
+        super().__init__(f"Work queue for {job_type} is full ({depth} items waiting)")
+
+
+class WorkQueue:
+    """Enqueues job runs as rows and lets workers claim them one at a time
+    
+    Claims are a conditional UPDATE on the queued row, so several worker
+    processes can poll the same table without taking the same item. A claim is
+    a lease the worker renews with heartbeats while the job runs; only items
+    whose heartbeat has lapsed are handed to another worker.
+    """
+    
+    def __init__(
+        self,
+        max_depth: Optional[int] = None,
+        lease_seconds: Optional[int] = None,
+        max_attempts: Optional[int] = None
+    ):
+        self.max_depth = max_depth or settings.work_queue_max_depth
+        self.lease = lease_seconds or settings.work_item_lease_seconds
+        self.max_attempts = max_attempts or settings.work_item_max_attempts
+    
+    def enqueue(self, job_type: str, args: list, dedup_key: Optional[str] = None) -> Optional[int]:
+        """Queue a job run, returning its id or None if the same run is already pending"""
+        if job_type not in JOB_TYPES:
+            raise ValueError(f"Unknown job type: {job_type}")
+        
+        db = SessionLocal()
+        try:
+            if dedup_key and db.query(WorkItem.id).filter(
+                WorkItem.dedup_key == dedup_key,
+                WorkItem.status.in_(("queued", "running"))
+            ).first():
+                # Workers are behind; one pending run per job is enough
+                logger.info(f"Skipped enqueue of {dedup_key}: a run is already pending")
+                return None
+            
+            depth = db.query(func.count(WorkItem.id)).filter(
+                WorkItem.job_type == job_type,
+                WorkItem.status == "queued"
+            ).scalar()
+            if depth >= self.max_depth:
+                raise QueueFull(job_type, depth)
+            
+            item = WorkItem(job_type=job_type, dedup_key=dedup_key, args=args)
+            db.add(item)
+            db.commit()
+            return item.id
+        finally:
+            db.close()
+    
+    def claim(self, job_type: str, worker: str) -> Optional[Dict[str, Any]]:
+        """Claim the oldest queued item of a type"""
+        db = SessionLocal()
+        try:
+            # A few attempts in case other workers win the race for the head item
+            for _ in range(5):
+                item_id = db.query(WorkItem.id).filter(
+                    WorkItem.job_type == job_type,
+                    WorkItem.status == "queued"
+                ).order_by(WorkItem.id).limit(1).scalar()
+                if item_id is None:
+                    return None
+                
+                now = datetime.utcnow()
+                result = db.execute(
+                    update(WorkItem)
+                    .where(WorkItem.id == item_id, WorkItem.status == "queued")
+                    .values(
+                        status="running",
+                        worker=worker,
+                        started_at=now,
+                        heartbeat_at=now,
+                        attempts=WorkItem.attempts + 1
+                    )
+                )
+                db.commit()
+                if result.rowcount == 1:
+                    item = db.get(WorkItem, item_id)
+                    return {"id": item.id, "job_type": item.job_type, "args": item.args or []}
+            return None
+        finally:
+            db.close()
+    
+    def heartbeat(self, item_id: int, worker: str) -> bool:
+        """Renew a worker's lease on a running item, False if the item was taken away"""
+        db = SessionLocal()
+        try:
+            result = db.execute(
+                update(WorkItem)
+                .where(WorkItem.id == item_id, WorkItem.status == "running", WorkItem.worker == worker)
+                .values(heartbeat_at=datetime.utcnow())
+            )
+            db.commit()
+            return result.rowcount == 1
+        finally:
+            db.close()
+    
+    def complete(self, item_id: int, error: Optional[str] = None, worker: Optional[str] = None):
+        """Mark a claimed item done or failed, unless another worker has since claimed it"""
+        db = SessionLocal()
+        try:
+            owned = (WorkItem.worker == worker,) if worker else ()
+            db.execute(
+                update(WorkItem)
+                .where(WorkItem.id == item_id, *owned)
+                .values(
+                    status="failed" if error else "done",
+                    error_message=error,
+                    finished_at=datetime.utcnow()
+                )
+            )
+            db.commit()
+        finally:
+            db.close()
+    
+    def requeue_stale(self) -> int:
+        """Return items whose worker stopped heartbeating to the queue, up to the attempt limit"""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.lease)
+        
+        db = SessionLocal()
+        try:
+            last_seen = func.coalesce(WorkItem.heartbeat_at, WorkItem.started_at)
+            stale = (WorkItem.status == "running", last_seen < cutoff)
+            requeued = db.execute(
+                update(WorkItem)
+                .where(*stale, WorkItem.attempts < self.max_attempts)
+                .values(status="queued", worker=None)
+            ).rowcount
+            db.execute(
+                update(WorkItem)
+                .where(*stale)
+                .values(status="failed", error_message="Worker lease expired", finished_at=datetime.utcnow())
+            )
+            db.commit()
+            if requeued:
+                logger.warning(f"Requeued {requeued} stale work items")
+            return requeued
+        finally:
+            db.close()
+    
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Item counts per job type and status"""
+        db = SessionLocal()
+        try:
+            rows = db.query(WorkItem.job_type, WorkItem.status, func.count(WorkItem.id)).group_by(
+                WorkItem.job_type, WorkItem.status
+            ).all()
+            counts: Dict[str, Dict[str, int]] = {job_type: {} for job_type in JOB_TYPES}
+            for job_type, status, count in rows:
+                counts.setdefault(job_type, {})[status] = count
+            return counts
+        finally:
+            db.close()
+
+
+# Global work queue instance
+work_queue = WorkQueue()
+
+
+def get_work_queue() -> WorkQueue:
+    """Get the work queue instance"""
+    return work_queue
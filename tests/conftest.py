@@ -0,0 +1,23 @@
+"""
+Shared pytest setup: required settings and import path
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Settings fails to load without these; tests never talk to the real APIs
+for name in (
+    "TWITTER_CLIENT_ID",
+    "TWITTER_CLIENT_SECRET",
+    "TWITTER_BEARER_TOKEN",
+    "TWITTER_ACCESS_TOKEN",
+    "TWITTER_ACCESS_TOKEN_SECRET",
+    "CLAUDE_API_KEY",
+    "SECRET_KEY",
+):
+    os.environ.setdefault(name, "test")
+# A fresh SQLite file per run so database tests never see leftovers
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/test_twitter_bot.db")
@@ -0,0 +1,39 @@
+"""
+Tests for the buffered activity writer on the async session
+"""
+
+import pytest
+
+pytest.importorskip("pydantic_settings")
+pytest.importorskip("aiosqlite")
+
+from src.database.models import SessionLocal, ActivityLog, ActivityRollup, create_tables
+from src.database.session import close_async_engine
+from src.services.activity_recorder import ActivityRecorder
+
+
+@pytest.mark.asyncio
+async def test_recorder_writes_logs_and_rollups_through_async_session():
+    create_tables()
+    db = SessionLocal()
+    try:
+        db.query(ActivityLog).delete()
+        db.query(ActivityRollup).delete()
+        db.commit()
+    finally:
+        db.close()
+    
+    recorder = ActivityRecorder(batch_size=3, flush_interval=0.05)
+    for index in range(5):
+        await recorder.record("post", description=f"post {index}", success=index != 0)
+    await recorder.stop()
+    await close_async_engine()
+    
+    assert recorder.written == 5
+    db = SessionLocal()
+    try:
+        assert db.query(ActivityLog).count() == 5
+        hourly = db.query(ActivityRollup).filter(ActivityRollup.granularity == "hour").one()
+        assert (hourly.total, hourly.succeeded, hourly.failed) == (5, 4, 1)
+    finally:
+        db.close()
@@ -0,0 +1,151 @@
+"""
+Tests for the shared Claude client, its connection reuse and its concurrency limit
+"""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("anthropic")
+pytest.importorskip("pydantic_settings")
+pytest_asyncio = pytest.importorskip("pytest_asyncio")
+
+from src.services import claude_service
+from src.services.claude_budget import ClaudeBudget
+
+
+MESSAGE_RESPONSE = json.dumps({
+    "id": "msg_test",
+    "type": "message",
+    "role": "assistant",
+    "model": "test-model",
+    "content": [{"type": "text", "text": "hello"}],
+    "stop_reason": "end_turn",
+    "stop_sequence": None,
+    "usage": {"input_tokens": 5, "output_tokens": 5}
+}).encode("utf-8")
+
+
+class FakeMessagesAPI(ThreadingHTTPServer):
+    """Local stand-in for the messages endpoint that counts connections and in-flight requests"""
+    
+    daemon_threads = True
+    
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeMessagesHandler)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+    
+    @property
+    def url(self) -> str:
+        host, port = self.server_address
+        return f"http://{host}:{port}"
+
+
+class FakeMessagesHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so reused connections show up as several requests on one socket
+    protocol_version = "HTTP/1.1"
+    
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+    
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with self.server.lock:
+            self.server.calls += 1
+            self.server.active += 1
+            self.server.peak = max(self.server.peak, self.server.active)
+        time.sleep(0.01)
+        with self.server.lock:
+            self.server.active -= 1
+        
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(MESSAGE_RESPONSE)))
+        self.end_headers()
+        self.wfile.write(MESSAGE_RESPONSE)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest_asyncio.fixture
+async def fake_api(monkeypatch):
+    server = FakeMessagesAPI()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    
+    monkeypatch.setattr(claude_service.settings, "claude_base_url", server.url)
+    monkeypatch.setattr(claude_service, "_client", None)
+    monkeypatch.setattr(claude_service, "_concurrency", None)
+    monkeypatch.setattr(claude_service, "get_claude_budget", lambda: ClaudeBudget())
+    yield server
+    
+    await claude_service.close_claude_client()
+    server.shutdown()
+    server.server_close()
+
+
+async def _send(service: claude_service.ClaudeService):
+    return await service._create_message(
+        "test",
+        model="test-model",
+        max_tokens=10,
+        messages=[{"role": "user", "content": "hi"}]
+    )
+
+
+def test_shared_client_is_reused(monkeypatch):
+    monkeypatch.setattr(claude_service, "_client", None)
+    
+    first = claude_service.get_claude_client()
+    
+    assert claude_service.get_claude_client() is first
+    assert claude_service.ClaudeService().client is first
+    assert claude_service.ClaudeService().client is first
+
+
+@pytest.mark.asyncio
+async def test_sequential_calls_share_one_connection(fake_api):
+    service = claude_service.ClaudeService()
+    
+    for _ in range(10):
+        message = await _send(service)
+        assert message.content[0].text == "hello"
+    
+    assert fake_api.calls == 10
+    assert fake_api.connections == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_respect_semaphore_and_reuse_connections(monkeypatch, fake_api):
+    monkeypatch.setattr(claude_service.settings, "claude_max_concurrency", 3)
+    service = claude_service.ClaudeService()
+    
+    await asyncio.gather(*(_send(service) for _ in range(12)))
+    
+    assert fake_api.calls == 12
+    assert fake_api.peak == 3
+    # Connections are pooled up to the concurrency limit, not opened per call
+    assert fake_api.connections <= 3
+
+
+@pytest.mark.asyncio
+async def test_semaphore_is_shared_across_services(monkeypatch, fake_api):
+    monkeypatch.setattr(claude_service.settings, "claude_max_concurrency", 2)
+    services = [claude_service.ClaudeService() for _ in range(4)]
+    
+    await asyncio.gather(*(_send(service) for service in services for _ in range(3)))
+    
+    assert fake_api.calls == 12
+    assert fake_api.peak == 2
+    assert fake_api.connections <= 2
@@ -0,0 +1,95 @@
+"""
+Tests for compare-and-swap configuration writes
+"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("pydantic_settings")
+pytest.importorskip("sqlalchemy")
+
+from sqlalchemy import inspect, text
+
+from src.database import models
+from src.database.models import SessionLocal, BotConfiguration, TargetAccount, create_tables
+from src.database.session import create_db_engine
+from src.services.config_store import ConfigStore
+
+
+@pytest.fixture
+def store():
+    create_tables()
+    db = SessionLocal()
+    try:
+        db.query(BotConfiguration).delete()
+        db.query(TargetAccount).delete()
+        db.commit()
+    finally:
+        db.close()
+    return ConfigStore(ttl_seconds=0)
+
+
+@pytest.mark.asyncio
+async def test_write_returns_summary_without_reloading_targets(store):
+    old, new = await store.add_target("default", {"username": "@someone"})
+    
+    assert old["has_enabled_targets"] is False
+    assert new["has_enabled_targets"] is True
+    assert new["version"] == old["version"] + 1
+    assert "target_accounts" not in new
+    
+    config = await store.get("default")
+    assert config["version"] == new["version"]
+    assert [target["username"] for target in config["target_accounts"]] == ["someone"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_writes_all_land_on_one_row(store):
+    writes = [store.update_schedule("42", {"interval_hours": hours}) for hours in range(1, 6)]
+    results = await asyncio.gather(*writes)
+    
+    # Each write saw the one before it, so no update was lost
+    versions = sorted(new["version"] for _, new in results)
+    assert versions == list(range(1, 6))
+    
+    db = SessionLocal()
+    try:
+        assert db.query(BotConfiguration).filter(BotConfiguration.user_id == 42).count() == 1
+    finally:
+        db.close()
+    assert (await store.get("42"))["version"] == 5
+
+
+@pytest.mark.asyncio
+async def test_noop_write_keeps_version(store):
+    await store.add_target("default", {"username": "someone"})
+    
+    assert await store.add_target("default", {"username": "SomeOne"}) is None
+    assert (await store.get("default"))["version"] == 1
+
+
+def test_create_tables_collapses_legacy_default_rows(tmp_path, monkeypatch):
+    legacy = create_db_engine(f"sqlite:///{tmp_path}/legacy.db")
+    with legacy.begin() as conn:
+        # Before the unique index, the default user's rows had a NULL owner
+        conn.execute(text("CREATE TABLE bot_configurations (id INTEGER PRIMARY KEY, user_id INTEGER, version INTEGER)"))
+        conn.execute(text("CREATE TABLE target_accounts (id INTEGER PRIMARY KEY, user_id INTEGER, target_username VARCHAR(50))"))
+        conn.execute(text(
+            "INSERT INTO bot_configurations (id, user_id, version) VALUES "
+            "(1, NULL, 1), (2, NULL, 4), (3, 7, 2), (4, 7, 3)"
+        ))
+        conn.execute(text("INSERT INTO target_accounts (user_id, target_username) VALUES (NULL, 'someone')"))
+    monkeypatch.setattr(models, "engine", legacy)
+    
+    create_tables()
+    
+    with legacy.connect() as conn:
+        configs = conn.execute(text("SELECT id, user_id, version FROM bot_configurations ORDER BY id")).all()
+        targets = conn.execute(text("SELECT user_id FROM target_accounts")).scalars().all()
+    assert [tuple(row) for row in configs] == [(2, 0, 4), (4, 7, 3)]
+    assert targets == [0]
+    assert "uq_bot_configurations_user_id" in {
+        index["name"] for index in inspect(legacy).get_indexes("bot_configurations")
+    }
+    legacy.dispose()
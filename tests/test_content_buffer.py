@@ -0,0 +1,62 @@
+"""
+Tests for parsing generated content ideas into drafts
+"""
+
+import pytest
+
+pytest.importorskip("pydantic_settings")
+pytest.importorskip("sqlalchemy")
+
+from src.database.models import SessionLocal, ContentDraft, create_tables
+from src.services.content_buffer import ContentBuffer, clean_idea, parse_ideas, _store_drafts
+
+
+def test_only_numbered_lines_become_ideas():
+    lines = [
+        "Here are 3 tweet ideas about AI:",
+        "1. AI pair programmers are changing code review #AI",
+        '2) "What is the one tool you could not work without?"',
+        "   continued thought that wrapped onto a new line",
+        "3.Not a valid item without a space",
+    ]
+    
+    assert parse_ideas(lines) == [
+        "AI pair programmers are changing code review #AI",
+        "What is the one tool you could not work without?",
+    ]
+
+
+def test_truncated_output_drops_last_idea():
+    lines = ["1. First idea", "2. Second idea", "3. Third id"]
+    
+    assert parse_ideas(lines, truncated=True) == ["First idea", "Second idea"]
+    assert parse_ideas(lines, truncated=False)[-1] == "Third id"
+
+
+def test_clean_idea_rejects_bullets():
+    assert clean_idea("- a bullet point") is None
+    assert clean_idea("10. Tenth idea") == "Tenth idea"
+
+
+@pytest.mark.asyncio
+async def test_take_skips_drafts_from_other_content_settings():
+    create_tables()
+    db = SessionLocal()
+    try:
+        db.query(ContentDraft).delete()
+        db.commit()
+    finally:
+        db.close()
+    _store_drafts("default", ["Old voice"], "tech", "sarcastic", 280)
+    _store_drafts("default", ["Longer limit"], "tech", "friendly", 500)
+    _store_drafts("default", ["Current"], "tech", "friendly", 280)
+    
+    buffer = ContentBuffer()
+    assert await buffer.take("default", "friendly", 280) == "Current"
+    assert await buffer.take("default", "friendly", 280) is None
+    
+    db = SessionLocal()
+    try:
+        assert db.query(ContentDraft).filter(ContentDraft.status == "stale").count() == 2
+    finally:
+        db.close()
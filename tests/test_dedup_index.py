@@ -0,0 +1,60 @@
+"""
+Tests for the in-memory duplicate checks and their periodic refresh
+"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("pydantic_settings")
+pytest.importorskip("sqlalchemy")
+
+from src.database.models import create_tables
+from src.services import dedup_index
+from src.services.dedup_index import ContentDeduplicator
+
+
+@pytest.fixture
+def load_calls(monkeypatch):
+    create_tables()
+    calls = []
+    load = dedup_index._load_fingerprints
+    
+    def counting_load(user_id, after_id=0):
+        calls.append(after_id)
+        return load(user_id, after_id)
+    
+    monkeypatch.setattr(dedup_index, "_load_fingerprints", counting_load)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_checks_stay_in_memory_between_refreshes(load_calls):
+    deduplicator = ContentDeduplicator(refresh_seconds=3600)
+    
+    await deduplicator.record("9101", "The quick brown fox jumps over the lazy dog", "posted")
+    for _ in range(20):
+        assert await deduplicator.is_duplicate("9101", "The quick brown fox jumps over the lazy dog!")
+    assert not await deduplicator.is_duplicate("9101", "Completely unrelated text about databases")
+    
+    assert load_calls == [0]
+
+
+@pytest.mark.asyncio
+async def test_stale_index_picks_up_other_processes_rows(load_calls):
+    ours = ContentDeduplicator(refresh_seconds=0)
+    other = ContentDeduplicator(refresh_seconds=3600)
+    text = "Shipping a new release of the scheduler with tenant dispatch"
+    
+    assert not await ours.is_duplicate("9102", text)
+    await other.record("9102", text, "posted")
+    
+    # The stale check answers from memory and refreshes in the background
+    assert not await ours.is_duplicate("9102", text)
+    await asyncio.gather(*ours._refreshes.values())
+    assert await ours.is_duplicate("9102", text)
+    
+    # The refresh skips rows this process already indexed
+    await ours.record("9102", "Another post about connection pooling", "posted")
+    await ours._refresh("9102")
+    assert len(ours._indexes["9102"]) == 2
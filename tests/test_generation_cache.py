@@ -0,0 +1,39 @@
+"""
+Tests for the two-tier generation cache
+"""
+
+import time
+
+import pytest
+
+pytest.importorskip("pydantic_settings")
+
+from src.services.generation_cache import GenerationCache, SQLiteCacheTier
+
+
+@pytest.mark.asyncio
+async def test_persistent_hit_keeps_stored_expiry(tmp_path):
+    path = str(tmp_path / "cache.db")
+    writer = GenerationCache(max_entries=10, ttl_seconds=3600, sqlite_path=path)
+    await writer.set("key", {"content": "hello"})
+    stored_expiry = writer._entries["key"][1]
+    
+    # A fresh process only has the persistent tier
+    reader = GenerationCache(max_entries=10, ttl_seconds=3600, sqlite_path=path)
+    assert await reader.get("key") == {"content": "hello"}
+    assert reader.persistent_hits == 1
+    assert reader._entries["key"][1] == pytest.approx(stored_expiry)
+
+
+def test_sqlite_tier_trims_to_cap_periodically(tmp_path):
+    tier = SQLiteCacheTier(str(tmp_path / "cache.db"), max_entries=10)
+    now = time.time()
+    tier.set("expired", {"content": "old"}, now - 1)
+    for i in range(SQLiteCacheTier.TRIM_EVERY - 1):
+        tier.set(f"key-{i}", {"content": str(i)}, now + 60 + i)
+    
+    (count,) = tier._conn.execute("SELECT COUNT(*) FROM generation_cache").fetchone()
+    assert count == 10
+    assert tier.get("expired") is None
+    # The entries furthest from expiry survive the trim
+    assert tier.get(f"key-{SQLiteCacheTier.TRIM_EVERY - 2}") is not None
@@ -0,0 +1,72 @@
+"""
+Load tests for the OAuth state stores under abandoned logins
+"""
+
+import secrets
+import time
+import tracemalloc
+
+import pytest
+
+pytest.importorskip("pydantic_settings")
+
+from src.services.oauth_states import MemoryStateStore, SQLiteStateStore
+
+ABANDONED_LOGINS = 1_000_000
+
+
+def _login_data() -> dict:
+    return {"code_verifier": secrets.token_urlsafe(32), "timestamp": 0}
+
+
+@pytest.mark.asyncio
+async def test_memory_store_stays_flat_under_abandoned_logins():
+    store = MemoryStateStore(ttl_seconds=600, max_entries=1000)
+    data = _login_data()
+    
+    for i in range(ABANDONED_LOGINS):
+        await store.put(f"state-{i}", dict(data))
+    
+    # Once the cap is reached, every further abandoned login is net zero memory.
+    # Tracing starts a few caps' worth of logins before the baseline so every
+    # stored entry is counted in both measurements.
+    tracemalloc.start()
+    try:
+        for i in range(ABANDONED_LOGINS, ABANDONED_LOGINS + 5000):
+            await store.put(f"state-{i}", dict(data))
+        before, _ = tracemalloc.get_traced_memory()
+        for i in range(ABANDONED_LOGINS + 5000, ABANDONED_LOGINS + 100_000):
+            await store.put(f"state-{i}", dict(data))
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    
+    assert store.size() == 1000
+    assert store.evicted == ABANDONED_LOGINS + 100_000 - 1000
+    assert after - before < 16 * 1024
+
+
+@pytest.mark.asyncio
+async def test_sqlite_store_stays_bounded_under_abandoned_logins(tmp_path):
+    store = SQLiteStateStore(str(tmp_path / "states.db"), ttl_seconds=600, max_entries=200)
+    
+    for i in range(5000):
+        await store.put(f"state-{i}", _login_data())
+    
+    assert store.size() <= store.max_entries + SQLiteStateStore.TRIM_EVERY
+    # The newest logins survive trimming and are consumed exactly once
+    assert await store.pop("state-4999") is not None
+    assert await store.pop("state-4999") is None
+    assert await store.pop("state-0") is None
+
+
+@pytest.mark.asyncio
+async def test_expired_state_is_not_returned(tmp_path, monkeypatch):
+    store = SQLiteStateStore(str(tmp_path / "states.db"), ttl_seconds=600)
+    await store.put("state", _login_data())
+    
+    real_time = time.time
+    monkeypatch.setattr(time, "time", lambda: real_time() + 601)
+    
+    assert store.sweep() == 1
+    assert await store.pop("state") is None
@@ -0,0 +1,52 @@
+"""
+Tests for seeding dispatcher jobs from persisted last runs
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("pydantic_settings")
+pytest.importorskip("apscheduler")
+
+from src.database.models import SessionLocal, ActivityLog, TargetAccount, create_tables
+from src.services.scheduler_service import SchedulerService, _load_last_runs
+
+
+@pytest.fixture
+def last_runs():
+    create_tables()
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        db.query(ActivityLog).delete()
+        db.query(TargetAccount).delete()
+        db.add_all([
+            ActivityLog(user_id=0, activity_type="post", description="Scheduled post", created_at=now - timedelta(hours=3)),
+            ActivityLog(user_id=0, activity_type="post", description="Scheduled post", created_at=now - timedelta(minutes=30)),
+            ActivityLog(user_id=0, activity_type="post", description="Manual post", created_at=now - timedelta(minutes=5)),
+            TargetAccount(user_id=7, target_username="someone", last_checked_at=now - timedelta(hours=5)),
+        ])
+        db.commit()
+    finally:
+        db.close()
+    return _load_last_runs()
+
+
+def test_last_runs_are_keyed_by_job_id(last_runs):
+    assert set(last_runs) == {"content_posting_default", "account_monitoring_7"}
+    age = datetime.utcnow() - last_runs["content_posting_default"]
+    assert age.total_seconds() == pytest.approx(1800, abs=5)
+
+
+def test_first_run_keeps_cadence_across_restarts(last_runs):
+    service = SchedulerService()
+    service._last_runs = last_runs
+    
+    # Posted 30 minutes ago on a 2 hour interval
+    assert service._first_run_delay("content_posting_default", 7200, 60) == pytest.approx(5400, abs=5)
+    # Overdue monitoring runs right away
+    assert service._first_run_delay("account_monitoring_7", 7200, 120) == 0
+    # No history, or already consumed, falls back to the startup delay
+    assert service._first_run_delay("content_posting_default", 7200, 60) == 60
+    assert service._first_run_delay("account_monitoring_3", 7200, 120) == 120
@@ -0,0 +1,78 @@
+"""
+Tests for resuming partially posted threads
+"""
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("tweepy")
+pytest.importorskip("sqlalchemy")
+
+from src.database.models import create_tables
+from src.services.thread_store import ThreadStore
+from src.services.twitter_service import TwitterService, comparable_text
+
+
+def _tweet(tweet_id, text, created_at, replied_to=None):
+    refs = [SimpleNamespace(type="replied_to", id=replied_to)] if replied_to else []
+    return SimpleNamespace(id=tweet_id, text=text, created_at=created_at, referenced_tweets=refs)
+
+
+@pytest.fixture
+def service(monkeypatch):
+    service = TwitterService(access_token="test", access_token_secret="test")
+    timeline = []
+    
+    async def request(method, **kwargs):
+        return SimpleNamespace(data=timeline)
+    
+    async def user_id():
+        return "1"
+    
+    monkeypatch.setattr(service, "_request", request)
+    monkeypatch.setattr(service, "get_authenticated_user_id", user_id)
+    service.timeline = timeline
+    return service
+
+
+def test_comparable_text_ignores_shortened_links_and_entities():
+    posted = "Read this & share https://example.com/a/very/long/path"
+    returned = "Read this &amp; share https://t.co/AbCdEf123"
+    
+    assert comparable_text(posted) == comparable_text(returned)
+
+
+@pytest.mark.asyncio
+async def test_root_only_matches_tweets_after_the_thread(service):
+    started = datetime.utcnow()
+    service.timeline += [
+        _tweet(10, "Hello world", (started - timedelta(days=1)).replace(tzinfo=timezone.utc)),
+    ]
+    assert await service._find_posted_reply("Hello world", None, started) is None
+    
+    service.timeline.insert(0, _tweet(11, "Hello world", (started + timedelta(seconds=2)).replace(tzinfo=timezone.utc)))
+    assert await service._find_posted_reply("Hello world", None, started) == "11"
+
+
+@pytest.mark.asyncio
+async def test_reply_matches_on_parent_and_normalised_text(service):
+    service.timeline.append(_tweet(21, "Part 2 https://t.co/xyz", None, replied_to=20))
+    
+    assert await service._find_posted_reply("Part 2 https://example.com", "20") == "21"
+    assert await service._find_posted_reply("Part 2 https://example.com", "19") is None
+
+
+@pytest.mark.asyncio
+async def test_only_one_claim_wins():
+    create_tables()
+    store = ThreadStore()
+    thread = await store.create("default", ["one", "two"])
+    
+    claimed = await store.claim(thread["id"])
+    assert claimed["status"] == "posting"
+    assert await store.claim(thread["id"]) is None
+    
+    await store.finish(thread["id"], ["1"], "boom")
+    assert await store.claim(thread["id"]) is not None
@@ -0,0 +1,129 @@
+"""
+Tests for token refresh in the Twitter client pool
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("pydantic_settings")
+pytest.importorskip("tweepy")
+pytest.importorskip("cryptography")
+
+from src.database.models import SessionLocal, User, create_tables
+from src.services import twitter_client_pool
+from src.services.twitter_client_pool import TwitterClientPool, TokenCipher
+
+
+class FakeResponse:
+    def __init__(self, status, payload):
+        self.status = status
+        self._payload = payload
+    
+    async def json(self):
+        return self._payload
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc):
+        return False
+
+
+class RotatingTokenEndpoint:
+    """Token endpoint that accepts each refresh token once, like Twitter's"""
+    
+    def __init__(self, current="refresh-0"):
+        self.current = current
+        self.exchanges = 0
+    
+    def post(self, url, data=None, headers=None):
+        return self._exchange(data["refresh_token"])
+    
+    def _exchange(self, refresh_token):
+        endpoint = self
+        
+        class Exchange(FakeResponse):
+            async def __aenter__(self):
+                # Let the other pool's request start before this one is answered
+                await asyncio.sleep(0.01)
+                if refresh_token != endpoint.current:
+                    self.status, self._payload = 400, {"error": "invalid_request"}
+                    return self
+                endpoint.exchanges += 1
+                endpoint.current = f"refresh-{endpoint.exchanges}"
+                self.status, self._payload = 200, {
+                    "access_token": f"access-{endpoint.exchanges}",
+                    "refresh_token": endpoint.current,
+                    "expires_in": 7200
+                }
+                return self
+        
+        return Exchange(0, {})
+
+
+def _stored_user(expires_at, refresh_token="refresh-0"):
+    create_tables()
+    db = SessionLocal()
+    try:
+        db.query(User).filter(User.twitter_user_id == "pool-test").delete()
+        user = User(
+            twitter_user_id="pool-test",
+            username="pooltest",
+            access_token="access-0",
+            refresh_token=refresh_token,
+            token_expires_at=expires_at
+        )
+        db.add(user)
+        db.commit()
+        return str(user.id)
+    finally:
+        db.close()
+
+
+def _pool():
+    return TwitterClientPool(cipher=TokenCipher(key=None))
+
+
+@pytest.mark.asyncio
+async def test_concurrent_refreshes_agree_on_one_rotation(monkeypatch):
+    endpoint = RotatingTokenEndpoint()
+    monkeypatch.setattr(twitter_client_pool, "get_http_session", lambda: endpoint)
+    user_id = _stored_user(datetime.utcnow() - timedelta(minutes=1))
+    
+    first, second = _pool(), _pool()
+    await asyncio.gather(first.get(user_id), second.get(user_id))
+    
+    assert endpoint.exchanges == 1
+    owner = int(user_id)
+    assert first._entries[owner]["refresh_token"] == second._entries[owner]["refresh_token"] == "refresh-1"
+    db = SessionLocal()
+    try:
+        assert db.query(User.refresh_token).filter(User.id == owner).scalar() == "refresh-1"
+    finally:
+        db.close()
+
+
+@pytest.mark.asyncio
+async def test_expired_token_that_cannot_refresh_raises(monkeypatch):
+    monkeypatch.setattr(twitter_client_pool, "get_http_session", lambda: RotatingTokenEndpoint("revoked"))
+    monkeypatch.setattr(twitter_client_pool, "ROTATION_CHECK_SECONDS", 0)
+    user_id = _stored_user(datetime.utcnow() - timedelta(minutes=1))
+    
+    pool = _pool()
+    with pytest.raises(Exception, match="expired"):
+        await pool.get(user_id)
+    assert pool.refresh_failures == 1
+    assert not pool._entries
+
+
+@pytest.mark.asyncio
+async def test_expiring_token_keeps_serving_when_refresh_fails(monkeypatch):
+    monkeypatch.setattr(twitter_client_pool, "get_http_session", lambda: RotatingTokenEndpoint("revoked"))
+    monkeypatch.setattr(twitter_client_pool, "ROTATION_CHECK_SECONDS", 0)
+    user_id = _stored_user(datetime.utcnow() + timedelta(minutes=5))
+    
+    pool = _pool()
+    assert await pool.get(user_id) is not None
+    assert pool.refresh_failures == 1
@@ -0,0 +1,55 @@
+"""
+Tests that TwitterService calls match the real tweepy AsyncClient signatures
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("tweepy")
+pytest.importorskip("pydantic_settings")
+
+from src.services import twitter_service as twitter_module
+from src.services.twitter_service import IdentityCache, TwitterService
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(twitter_module, "identity_cache", IdentityCache())
+    service = TwitterService(oauth2_token="user-token", credential_key="test-user")
+    requests = []
+    
+    # Only the HTTP layer is replaced; like() and follow_user() run as shipped
+    async def make_request(method, route, params={}, endpoint_parameters=(), json=None, data_type=None, user_auth=False):
+        requests.append((method, route, json))
+        if route == "/2/users/me":
+            return SimpleNamespace(data=SimpleNamespace(id=42))
+        return SimpleNamespace(data={"liked": True, "following": True})
+    
+    monkeypatch.setattr(service.client_v2, "_make_request", make_request)
+    service.requests = requests
+    return service
+
+
+@pytest.mark.asyncio
+async def test_like_tweet_uses_real_signature(service):
+    result = await service.like_tweet("100")
+    
+    assert result == {"success": True, "liked": True}
+    assert service.requests[-1] == ("POST", "/2/users/42/likes", {"tweet_id": "100"})
+
+
+@pytest.mark.asyncio
+async def test_follow_user_uses_real_signature(service):
+    result = await service.follow_user("7")
+    
+    assert result == {"success": True, "following": True}
+    assert service.requests[-1] == ("POST", "/2/users/42/following", {"target_user_id": "7"})
+
+
+@pytest.mark.asyncio
+async def test_bulk_likes_resolve_identity_once(service):
+    result = await service.like_tweets(["1", "2", "3"])
+    
+    assert result["success"]
+    assert [route for _, route, _ in service.requests].count("/2/users/me") == 1
@@ -0,0 +1,164 @@
+"""
+Worker processes that run queued posting and monitoring jobs outside the API process
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+
+# Add src to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from config.settings import get_settings
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(processName)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# Items whose worker stopped heartbeating are checked for on this cadence
+STALE_CHECK_SECONDS = 60
+
+
+async def _renew_lease(queue, item_id: int, worker_id: str, job: asyncio.Task):
+    """Heartbeat a running item, cancelling the job if its lease was taken away"""
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(settings.work_item_heartbeat_seconds)
+        try:
+            renewed = await loop.run_in_executor(None, queue.heartbeat, item_id, worker_id)
+        except Exception as e:
+            logger.error(f"Failed to renew lease on work item {item_id}: {e}")
+            continue
+        if not renewed:
+            # Requeued for another worker; stop rather than run it twice
+            logger.warning(f"Lost lease on work item {item_id}, cancelling")
+            job.cancel()
+            return
+
+
+async def run_worker(job_type: str):
+    """Claim and run items of one job type until told to stop"""
+    from src.services.activity_recorder import get_activity_recorder
+    from src.services.claude_service import close_claude_client
+    from src.services.twitter_service import close_http_session
+    from src.services.scheduler_service import post_content_job, monitor_accounts_job
+    from src.services.twitter_client_pool import get_twitter_client_pool
+    from src.services.work_queue import get_work_queue
+    
+    job_funcs = {
+        "post": post_content_job,
+        "monitor": monitor_accounts_job
+    }
+    func = job_funcs[job_type]
+    queue = get_work_queue()
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    loop = asyncio.get_running_loop()
+    
+    stop = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    
+    recorder = get_activity_recorder()
+    recorder.start()
+    twitter_clients = get_twitter_client_pool()
+    twitter_clients.start()
+    logger.info(f"Worker {worker_id} consuming {job_type} jobs")
+    
+    last_stale_check = 0.0
+    try:
+        while not stop.is_set():
+            if loop.time() - last_stale_check > STALE_CHECK_SECONDS:
+                await loop.run_in_executor(None, queue.requeue_stale)
+                last_stale_check = loop.time()
+            
+            item = await loop.run_in_executor(None, queue.claim, job_type, worker_id)
+            if item is None:
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=settings.worker_poll_interval_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            
+            # One item at a time per process; pending items wait in the table
+            job = loop.create_task(
+                asyncio.wait_for(func(*item["args"]), timeout=settings.work_item_timeout_seconds)
+            )
+            heartbeat = loop.create_task(_renew_lease(queue, item["id"], worker_id, job))
+            error = None
+            try:
+                await job
+            except asyncio.CancelledError:
+                error = "Lease lost"
+            except asyncio.TimeoutError:
+                error = f"Timed out after {settings.work_item_timeout_seconds} seconds"
+                logger.error(f"Work item {item['id']} timed out")
+            except Exception as e:
+                error = str(e)
+                logger.error(f"Work item {item['id']} failed: {e}")
+            finally:
+                heartbeat.cancel()
+            await loop.run_in_executor(None, queue.complete, item["id"], error, worker_id)
+    finally:
+        await recorder.stop()
+        await twitter_clients.stop()
+        await close_claude_client()
+        await close_http_session()
+        logger.info(f"Worker {worker_id} stopped")
+
+
+def worker_process(job_type: str):
+    """Process entry point"""
+    asyncio.run(run_worker(job_type))
+
+
+def main():
+    """Start the configured number of worker processes per job type"""
+    from src.database.models import create_tables, engine
+    create_tables()
+    # Children open their own connections; don't share the parent's pooled sockets
+    engine.dispose()
+    # Spawn rather than fork so no event loop, client session or DB connection is inherited
+    context = multiprocessing.get_context("spawn")
+    
+    counts = {
+        "post": settings.worker_post_processes,
+        "monitor": settings.worker_monitor_processes
+    }
+    processes = []
+    for job_type, count in counts.items():
+        for index in range(count):
+            process = context.Process(
+                target=worker_process,
+                args=(job_type,),
+                name=f"{job_type}-worker-{index}"
+            )
+            process.start()
+            processes.append(process)
+    
+    logger.info(f"Started {len(processes)} worker processes")
+    
+    def forward_sigterm(signum, frame):
+        for process in processes:
+            process.terminate()
+    
+    # Ctrl+C reaches the children directly; a supervisor's SIGTERM is forwarded
+    signal.signal(signal.SIGTERM, forward_sigterm)
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.join()
+
+
+if __name__ == "__main__":
+    main()